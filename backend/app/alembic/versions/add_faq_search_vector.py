@@ -0,0 +1,45 @@
+"""add faqs.search_vector generated column and GIN index
+
+Revision ID: l2m3n4o5p6q7
+Revises: k1l2m3n4o5p6
+Create Date: 2026-03-12
+
+FAQ search matched question/answer with ILIKE '%term%', a sequential scan with
+no ranking. search_vector is a stored tsvector generated by PostgreSQL from the
+question (weight A) and answer (weight B), so it never goes stale when FAQs
+change; the GIN index serves the @@ match and ts_rank_cd orders the results.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "l2m3n4o5p6q7"
+down_revision = "k1l2m3n4o5p6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "faqs",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(question, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(answer, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_faqs_search_vector", "faqs", ["search_vector"], unique=False, postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_faqs_search_vector", table_name="faqs")
+    op.drop_column("faqs", "search_vector")
@@ -0,0 +1,50 @@
+"""add hubspot_outbox table
+
+Revision ID: h8i9j0k1l2m3
+Revises: g7h8i9j0k1l2
+Create Date: 2026-03-07
+
+Transactional outbox for HubSpot contact syncs. Registration and onboarding
+write a row instead of calling HubSpot on the request path; the scheduler
+drains pending rows through the batch upsert API. The (status,
+next_attempt_at) index serves the drain query.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "h8i9j0k1l2m3"
+down_revision = "g7h8i9j0k1l2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "hubspot_outbox",
+        sa.Column("id", sa.UUID(), server_default=sa.text("uuid_generate_v4()"), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("event_type", sa.String(length=50), nullable=False),
+        sa.Column("properties", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=20), server_default="pending", nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("next_attempt_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("sent_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_hubspot_outbox_status_next_attempt_at",
+        "hubspot_outbox",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_hubspot_outbox_status_next_attempt_at", table_name="hubspot_outbox")
+    op.drop_table("hubspot_outbox")
@@ -0,0 +1,30 @@
+"""add last_calculated_at index to user_lead_scores
+
+Revision ID: n4o5p6q7r8s9
+Revises: m3n4o5p6q7r8
+Create Date: 2026-03-14
+
+The admin dashboard cache is keyed on max(last_calculated_at), read on every
+dashboard request; the index turns it into a single index lookup.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "n4o5p6q7r8s9"
+down_revision = "m3n4o5p6q7r8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_user_lead_scores_last_calculated_at",
+        "user_lead_scores",
+        ["last_calculated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_lead_scores_last_calculated_at", table_name="user_lead_scores")
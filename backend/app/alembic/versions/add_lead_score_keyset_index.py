@@ -0,0 +1,30 @@
+"""add (composite_score, user_id) index to user_lead_scores
+
+Revision ID: g7h8i9j0k1l2
+Revises: f6g7h8i9j0k1
+Create Date: 2026-03-06
+
+Supports keyset pagination and streaming export of /analytics/leads ordered by
+(composite_score DESC, user_id DESC).
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "g7h8i9j0k1l2"
+down_revision = "f6g7h8i9j0k1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_user_lead_scores_composite_score_user_id",
+        "user_lead_scores",
+        ["composite_score", "user_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_lead_scores_composite_score_user_id", table_name="user_lead_scores")
@@ -0,0 +1,67 @@
+"""add notification_broadcasts table and notifications.broadcast_id
+
+Revision ID: j0k1l2m3n4o5
+Revises: i9j0k1l2m3n4
+Create Date: 2026-03-10
+
+Admin broadcasts fan out with one INSERT ... SELECT per users.id chunk. The
+partial unique index on (broadcast_id, user_id) makes the fan-out idempotent:
+re-running a chunk inserts nothing for users that already have the broadcast.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "j0k1l2m3n4o5"
+down_revision = "i9j0k1l2m3n4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_broadcasts",
+        sa.Column("id", sa.UUID(), server_default=sa.text("uuid_generate_v4()"), nullable=False),
+        sa.Column("notification_type", sa.String(length=50), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("priority", sa.String(length=20), server_default="normal", nullable=False),
+        sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("segment", sa.JSON(), nullable=True),
+        sa.Column("status", sa.String(length=20), server_default="pending", nullable=False),
+        sa.Column("total_recipients", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("processed_users", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("delivered_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_user_id", sa.UUID(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_by", sa.UUID(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("started_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.add_column("notifications", sa.Column("broadcast_id", sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        "notifications_broadcast_id_fkey",
+        "notifications",
+        "notification_broadcasts",
+        ["broadcast_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        "ux_notifications_broadcast_id_user_id",
+        "notifications",
+        ["broadcast_id", "user_id"],
+        unique=True,
+        postgresql_where=sa.text("broadcast_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_notifications_broadcast_id_user_id", table_name="notifications")
+    op.drop_constraint("notifications_broadcast_id_fkey", "notifications", type_="foreignkey")
+    op.drop_column("notifications", "broadcast_id")
+    op.drop_table("notification_broadcasts")
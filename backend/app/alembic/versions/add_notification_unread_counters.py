@@ -0,0 +1,48 @@
+"""add user_notification_counters table and notification indexes
+
+Revision ID: i9j0k1l2m3n4
+Revises: h8i9j0k1l2m3
+Create Date: 2026-03-09
+
+The unread-count poll now reads a per-user counter maintained by
+NotificationManager instead of counting notifications. Counter rows are created
+lazily on first read. The (user_id, is_read) index serves the counter rebuild
+and the partial unread index serves the unread_only list, newest first.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "i9j0k1l2m3n4"
+down_revision = "h8i9j0k1l2m3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_notification_counters",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("unread_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("next_expiry_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        "ix_notifications_user_id_is_read", "notifications", ["user_id", "is_read"], unique=False
+    )
+    op.create_index(
+        "ix_notifications_user_unread_created_at",
+        "notifications",
+        ["user_id", sa.text("created_at DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_read = false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notifications_user_unread_created_at", table_name="notifications")
+    op.drop_index("ix_notifications_user_id_is_read", table_name="notifications")
+    op.drop_table("user_notification_counters")
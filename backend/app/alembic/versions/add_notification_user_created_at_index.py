@@ -0,0 +1,32 @@
+"""add (user_id, created_at DESC) index to notifications
+
+Revision ID: k1l2m3n4o5p6
+Revises: j0k1l2m3n4o5
+Create Date: 2026-03-11
+
+The notification list and the recent summary filter by user_id and a
+created_at window and read newest first; this index serves both as a range
+scan, so heavy users cost the same as new ones.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "k1l2m3n4o5p6"
+down_revision = "j0k1l2m3n4o5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_notifications_user_id_created_at",
+        "notifications",
+        ["user_id", sa.text("created_at DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notifications_user_id_created_at", table_name="notifications")
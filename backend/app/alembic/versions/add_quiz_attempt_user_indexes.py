@@ -0,0 +1,27 @@
+"""add user_id indexes to quiz attempt tables
+
+Revision ID: f6g7h8i9j0k1
+Revises: e5f6g7h8i9j0
+Create Date: 2026-03-05
+
+Quiz and mini-game statistics are now single aggregate queries filtered by
+user_id; index the foreign key so they no longer scan every user's attempts.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "f6g7h8i9j0k1"
+down_revision = "e5f6g7h8i9j0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_user_quiz_attempts_user_id"), "user_quiz_attempts", ["user_id"], unique=False)
+    op.create_index(op.f("ix_user_module_quiz_attempts_user_id"), "user_module_quiz_attempts", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_user_module_quiz_attempts_user_id"), table_name="user_module_quiz_attempts")
+    op.drop_index(op.f("ix_user_quiz_attempts_user_id"), table_name="user_quiz_attempts")
@@ -0,0 +1,51 @@
+"""add quiz_leaderboard materialized view
+
+Revision ID: e5f6g7h8i9j0
+Revises: d4e5f6g7h8i9
+Create Date: 2026-03-04
+
+Precomputed quiz leaderboard (average lesson quiz score per user) with a
+unique 1-based rank; ties are broken by attempt count, then user id. Unique
+indexes on rank and user_id make top-N pages, rank lookups and windows around
+a user index range scans, and allow REFRESH MATERIALIZED VIEW CONCURRENTLY
+from the scheduler.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e5f6g7h8i9j0"
+down_revision = "d4e5f6g7h8i9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW quiz_leaderboard AS
+        SELECT
+            ROW_NUMBER() OVER (
+                ORDER BY AVG(a.score) DESC, COUNT(a.id) DESC, u.id
+            ) AS rank,
+            u.id AS user_id,
+            u.first_name,
+            u.last_name,
+            ROUND(AVG(a.score), 2) AS average_score,
+            COUNT(a.id) AS total_attempts,
+            SUM(CASE WHEN a.passed THEN 1 ELSE 0 END) AS total_passed,
+            now() AS refreshed_at
+        FROM users u
+        JOIN user_quiz_attempts a ON a.user_id = u.id
+        GROUP BY u.id, u.first_name, u.last_name
+        WITH DATA
+        """
+    )
+    op.create_index("ix_quiz_leaderboard_rank", "quiz_leaderboard", ["rank"], unique=True)
+    op.create_index("ix_quiz_leaderboard_user_id", "quiz_leaderboard", ["user_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quiz_leaderboard_user_id", table_name="quiz_leaderboard")
+    op.drop_index("ix_quiz_leaderboard_rank", table_name="quiz_leaderboard")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS quiz_leaderboard")
@@ -0,0 +1,51 @@
+"""add user_data_wipes table
+
+Revision ID: m3n4o5p6q7r8
+Revises: l2m3n4o5p6q7
+Create Date: 2026-03-13
+
+POST /auth/wipe-data used to delete a dozen tables in one request
+transaction. It now records a wipe job that is processed in the background,
+one table at a time in bounded batches. The partial unique index allows one
+pending or running wipe per user.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "m3n4o5p6q7r8"
+down_revision = "l2m3n4o5p6q7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_data_wipes",
+        sa.Column("id", sa.UUID(), server_default=sa.text("uuid_generate_v4()"), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("status", sa.String(length=20), server_default="pending", nullable=False),
+        sa.Column("current_step", sa.String(length=50), nullable=True),
+        sa.Column("rows_deleted", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("rows_detached", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("started_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("completed_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ux_user_data_wipes_user_id_active",
+        "user_data_wipes",
+        ["user_id"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_user_data_wipes_user_id_active", table_name="user_data_wipes")
+    op.drop_table("user_data_wipes")
@@ -0,0 +1,45 @@
+"""add user_stats table
+
+Revision ID: d4e5f6g7h8i9
+Revises: c3d4e5f6g7h8
+Create Date: 2026-03-02
+
+Per-user dashboard summary row maintained by the progress, coin, badge and quiz
+writers. Rows are created lazily on first dashboard read; run
+scripts/rebuild_user_stats.py to backfill or verify them against the raw tables.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d4e5f6g7h8i9"
+down_revision = "c3d4e5f6g7h8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("coins_current", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("coins_lifetime_earned", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("coins_lifetime_spent", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("badges_earned", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("lessons_completed", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("modules_completed", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("quizzes_taken", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("quizzes_passed", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("quiz_score_total", sa.DECIMAL(precision=12, scale=2), server_default="0", nullable=False),
+        sa.Column("daily_activity", sa.JSON(), nullable=True),
+        sa.Column("recent_activity", sa.JSON(), nullable=True),
+        sa.Column("rebuilt_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
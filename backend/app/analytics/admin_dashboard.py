@@ -2,42 +2,146 @@
 Analytics Dashboard for Admin Interface
 
 Custom dashboard page showing lead analytics, distributions, and insights.
+All distributions and averages are computed with SQL aggregates, and the
+assembled payload is cached in-process for a short TTL; the hourly score
+recalculation refreshes it (see AnalyticsScheduler.recalculate_all_scores).
+Recalculations usually run in another process (Celery / the scheduler), so the
+cached payload is also keyed on the newest UserLeadScore.last_calculated_at
+and rebuilt as soon as any process writes new scores. Activity-based figures
+(events, module progress) can still lag by up to the TTL.
 """
-from typing import Dict, Any
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from models import UserLeadScore, UserBehaviorEvent, User, UserModuleProgress, UserLessonProgress
 from analytics.classifier import BulkClassifier
 
+# Seconds a computed dashboard payload is served before being rebuilt
+DASHBOARD_CACHE_TTL_SECONDS = int(os.getenv("ANALYTICS_DASHBOARD_CACHE_TTL", "300"))
+
+_dashboard_cache: Dict[str, Any] = {"payload": None, "expires_at": 0.0, "scores_as_of": None}
+_dashboard_cache_lock = threading.Lock()
+
 
 class AnalyticsDashboard:
     """Analytics dashboard data provider"""
     
     @staticmethod
-    def get_dashboard_data(db: Session) -> Dict[str, Any]:
+    def get_dashboard_data(db: Session, use_cache: bool = True) -> Dict[str, Any]:
         """
         Get comprehensive dashboard data for admin view.
         
+        Args:
+            use_cache: Serve the cached payload if it is younger than the TTL
+                and no scores were recalculated since it was built
+        
         Returns:
             Dictionary with all dashboard metrics and charts
         """
-        # Get all lead scores
-        lead_scores = db.query(UserLeadScore).all()
-        total_users = db.query(User).count()
+        scores_as_of = AnalyticsDashboard.scores_as_of(db)
+        if use_cache:
+            with _dashboard_cache_lock:
+                if (
+                    _dashboard_cache["payload"] is not None
+                    and time.monotonic() < _dashboard_cache["expires_at"]
+                    and _dashboard_cache["scores_as_of"] == scores_as_of
+                ):
+                    return _dashboard_cache["payload"]
+        
+        return AnalyticsDashboard.refresh_cached_dashboard(db, scores_as_of)
+    
+    @staticmethod
+    def scores_as_of(db: Session):
+        """Newest lead score calculation time (the cache's freshness marker)"""
+        return db.query(func.max(UserLeadScore.last_calculated_at)).scalar()
+    
+    @staticmethod
+    def refresh_cached_dashboard(db: Session, scores_as_of=None) -> Dict[str, Any]:
+        """Recompute the dashboard payload and store it in the cache"""
+        if scores_as_of is None:
+            # Read before the payload, so scores written meanwhile trigger a rebuild
+            scores_as_of = AnalyticsDashboard.scores_as_of(db)
+        payload = AnalyticsDashboard._build_dashboard_data(db)
+        payload["generated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        with _dashboard_cache_lock:
+            _dashboard_cache["payload"] = payload
+            _dashboard_cache["expires_at"] = time.monotonic() + DASHBOARD_CACHE_TTL_SECONDS
+            _dashboard_cache["scores_as_of"] = scores_as_of
+        return payload
+    
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Drop the cached payload (e.g. after a manual recalculation)"""
+        with _dashboard_cache_lock:
+            _dashboard_cache["payload"] = None
+            _dashboard_cache["expires_at"] = 0.0
+            _dashboard_cache["scores_as_of"] = None
+    
+    @staticmethod
+    def get_lead_aggregates(db: Session) -> Dict[str, Any]:
+        """
+        Lead counts per temperature and intent plus score/completion sums,
+        from a single GROUP BY over (lead_temperature, intent_band).
+        The result size is bounded by the number of bands, not the user count.
         
-        if not lead_scores:
+        Returns:
+            {"total", "temperature_counts", "intent_counts", "score_sum", "completion_sum"}
+            (None keys in the count dicts are leads with no classification)
+        """
+        rows = db.query(
+            UserLeadScore.lead_temperature,
+            UserLeadScore.intent_band,
+            func.count(UserLeadScore.user_id),
+            func.coalesce(func.sum(UserLeadScore.composite_score), 0),
+            func.coalesce(func.sum(UserLeadScore.profile_completion_pct), 0)
+        ).group_by(UserLeadScore.lead_temperature, UserLeadScore.intent_band).all()
+        
+        temperature_counts: Dict[Optional[str], int] = {}
+        intent_counts: Dict[Optional[str], int] = {}
+        total = 0
+        score_sum = 0.0
+        completion_sum = 0.0
+        
+        for temperature, intent, count, group_score, group_completion in rows:
+            temperature_counts[temperature] = temperature_counts.get(temperature, 0) + count
+            intent_counts[intent] = intent_counts.get(intent, 0) + count
+            total += count
+            score_sum += float(group_score)
+            completion_sum += float(group_completion)
+        
+        return {
+            "total": total,
+            "temperature_counts": temperature_counts,
+            "intent_counts": intent_counts,
+            "score_sum": score_sum,
+            "completion_sum": completion_sum
+        }
+    
+    @staticmethod
+    def _build_dashboard_data(db: Session) -> Dict[str, Any]:
+        """Compute the dashboard payload from aggregate queries"""
+        aggregates = AnalyticsDashboard.get_lead_aggregates(db)
+        total_users = db.query(func.count(User.id)).scalar()
+        scored_users = aggregates["total"]
+        
+        if not scored_users:
             return AnalyticsDashboard._empty_dashboard(total_users)
         
         # Calculate distributions
-        temp_dist = AnalyticsDashboard._calculate_temperature_distribution(lead_scores)
-        intent_dist = AnalyticsDashboard._calculate_intent_distribution(lead_scores)
+        temp_dist = AnalyticsDashboard._calculate_temperature_distribution(
+            aggregates["temperature_counts"], scored_users
+        )
+        intent_dist = AnalyticsDashboard._calculate_intent_distribution(
+            aggregates["intent_counts"], scored_users
+        )
         
         # Calculate averages
-        total_score = sum(float(s.composite_score) for s in lead_scores)
-        total_completion = sum(float(s.profile_completion_pct) for s in lead_scores)
-        avg_score = total_score / len(lead_scores)
-        avg_completion = total_completion / len(lead_scores)
+        avg_score = aggregates["score_sum"] / scored_users
+        avg_completion = aggregates["completion_sum"] / scored_users
         
         # Get recent high-value events
         recent_events = AnalyticsDashboard._get_recent_high_value_events(db, limit=10)
@@ -51,8 +155,8 @@ class AnalyticsDashboard:
         return {
             "overview": {
                 "total_users": total_users,
-                "scored_users": len(lead_scores),
-                "unscored_users": total_users - len(lead_scores),
+                "scored_users": scored_users,
+                "unscored_users": total_users - scored_users,
                 "average_composite_score": round(avg_score, 2),
                 "average_profile_completion": round(avg_completion, 2)
             },
@@ -95,8 +199,8 @@ class AnalyticsDashboard:
         }
     
     @staticmethod
-    def _calculate_temperature_distribution(lead_scores: list) -> Dict[str, Any]:
-        """Calculate temperature distribution"""
+    def _calculate_temperature_distribution(counts: Dict[Optional[str], int], total: int) -> Dict[str, Any]:
+        """Calculate temperature distribution from aggregated counts"""
         temp_counts = {
             "hot_lead": 0,
             "warm_lead": 0,
@@ -104,12 +208,9 @@ class AnalyticsDashboard:
             "dormant": 0
         }
         
-        for score in lead_scores:
-            temp = score.lead_temperature
+        for temp, count in counts.items():
             if temp in temp_counts:
-                temp_counts[temp] += 1
-        
-        total = len(lead_scores)
+                temp_counts[temp] += count
         
         return {
             temp: {
@@ -126,8 +227,8 @@ class AnalyticsDashboard:
         }
     
     @staticmethod
-    def _calculate_intent_distribution(lead_scores: list) -> Dict[str, Any]:
-        """Calculate intent distribution"""
+    def _calculate_intent_distribution(counts: Dict[Optional[str], int], total: int) -> Dict[str, Any]:
+        """Calculate intent distribution from aggregated counts"""
         intent_counts = {
             "very_high_intent": 0,
             "high_intent": 0,
@@ -135,12 +236,9 @@ class AnalyticsDashboard:
             "low_intent": 0
         }
         
-        for score in lead_scores:
-            intent = score.intent_band
+        for intent, count in counts.items():
             if intent in intent_counts:
-                intent_counts[intent] += 1
-        
-        total = len(lead_scores)
+                intent_counts[intent] += count
         
         return {
             intent: {
@@ -204,19 +302,18 @@ class AnalyticsDashboard:
     @staticmethod
     def _calculate_engagement_metrics(db: Session) -> Dict[str, Any]:
         """Calculate overall engagement metrics"""
-        # Total lessons and modules completed across all users
-        total_lessons_completed = db.query(UserLessonProgress).filter(
+        # Total lessons and modules completed across all users, in one round trip
+        lessons_completed = db.query(func.count(UserLessonProgress.id)).filter(
             UserLessonProgress.status == 'completed'
-        ).count()
-        
-        total_modules_completed = db.query(UserModuleProgress).filter(
+        ).scalar_subquery()
+        modules_completed = db.query(func.count(UserModuleProgress.id)).filter(
             UserModuleProgress.status == 'completed'
-        ).count()
-        
-        # Total behavior events
-        total_events = db.query(UserBehaviorEvent).count()
+        ).scalar_subquery()
+        total_lessons_completed, total_modules_completed = db.query(
+            lessons_completed, modules_completed
+        ).one()
         
-        # Events by category
+        # Events by category (the total is the sum of the groups)
         events_by_category = db.query(
             UserBehaviorEvent.event_category,
             func.count(UserBehaviorEvent.id)
@@ -229,6 +326,6 @@ class AnalyticsDashboard:
         return {
             "total_lessons_completed": total_lessons_completed,
             "total_modules_completed": total_modules_completed,
-            "total_behavior_events": total_events,
+            "total_behavior_events": sum(category_counts.values()),
             "events_by_category": category_counts
         }
@@ -0,0 +1,247 @@
+"""
+Lead Listing & Export
+
+Keyset (cursor) pagination over leads ordered by (composite_score DESC, user_id DESC),
+and constant-memory CSV / NDJSON export streamed from a server-side cursor.
+
+Ordering: scored users first (by score, then user id), followed by users that have
+no UserLeadScore row yet (by user id). The cursor encodes the last row's
+(composite_score, user_id); a null score means the cursor is in the unscored tail.
+"""
+import base64
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import desc, tuple_
+from sqlalchemy.orm import Session
+
+from models import User, UserLeadScore
+from responses import dumps as json_dumps
+from analytics.classifier import LeadClassifier, LeadTemperature, IntentBand
+
+# Rows fetched per round trip from the server-side cursor during export
+EXPORT_YIELD_PER = 1000
+
+EXPORT_COLUMNS = [
+    "user_id",
+    "email",
+    "first_name",
+    "last_name",
+    "composite_score",
+    "lead_temperature",
+    "temperature_label",
+    "intent_band",
+    "intent_label",
+    "profile_completion_pct",
+    "last_activity_at",
+    "created_at",
+]
+
+# Label lookups resolved once instead of per row
+TEMPERATURE_LABELS = {t.value: LeadClassifier._get_temperature_label(t) for t in LeadTemperature}
+INTENT_LABELS = {i.value: LeadClassifier._get_intent_label(i) for i in IntentBand}
+
+
+class InvalidLeadCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_lead_cursor(composite_score: Optional[Decimal], user_id: UUID) -> str:
+    """Opaque cursor for the row (composite_score, user_id)"""
+    payload = {
+        "s": str(composite_score) if composite_score is not None else None,
+        "u": str(user_id),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_lead_cursor(cursor: str) -> Tuple[Optional[Decimal], UUID]:
+    """Inverse of encode_lead_cursor; raises InvalidLeadCursor on malformed input"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        score = Decimal(payload["s"]) if payload["s"] is not None else None
+        return score, UUID(payload["u"])
+    except (ValueError, KeyError, TypeError, InvalidOperation) as e:
+        raise InvalidLeadCursor(f"Invalid cursor: {cursor}") from e
+
+
+def _has_score_filters(filters: Dict[str, Any]) -> bool:
+    return any(v is not None for v in filters.values())
+
+
+def _scored_query(db: Session, filters: Dict[str, Any]):
+    query = db.query(User, UserLeadScore).join(
+        UserLeadScore, User.id == UserLeadScore.user_id
+    )
+
+    if filters.get("temperature"):
+        query = query.filter(UserLeadScore.lead_temperature == filters["temperature"])
+
+    if filters.get("intent"):
+        query = query.filter(UserLeadScore.intent_band == filters["intent"])
+
+    if filters.get("min_score") is not None:
+        query = query.filter(UserLeadScore.composite_score >= filters["min_score"])
+
+    if filters.get("max_score") is not None:
+        query = query.filter(UserLeadScore.composite_score <= filters["max_score"])
+
+    if filters.get("min_completion") is not None:
+        query = query.filter(UserLeadScore.profile_completion_pct >= filters["min_completion"])
+
+    return query.order_by(desc(UserLeadScore.composite_score), desc(UserLeadScore.user_id))
+
+
+def _unscored_query(db: Session):
+    return db.query(User).outerjoin(
+        UserLeadScore, User.id == UserLeadScore.user_id
+    ).filter(UserLeadScore.user_id.is_(None)).order_by(desc(User.id))
+
+
+def fetch_lead_page(
+    db: Session,
+    filters: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Tuple[User, Optional[UserLeadScore]]], Optional[str]]:
+    """
+    Fetch one page of leads after `cursor`.
+
+    Returns:
+        (rows, next_cursor) where rows are (User, UserLeadScore or None) and
+        next_cursor is None when there are no more rows.
+    """
+    after_score, after_user_id = decode_lead_cursor(cursor) if cursor else (None, None)
+    in_unscored_tail = cursor is not None and after_score is None
+
+    rows: List[Tuple[User, Optional[UserLeadScore]]] = []
+
+    if not in_unscored_tail:
+        query = _scored_query(db, filters)
+        if cursor:
+            query = query.filter(
+                tuple_(UserLeadScore.composite_score, UserLeadScore.user_id)
+                < tuple_(after_score, after_user_id)
+            )
+        rows.extend(query.limit(limit + 1).all())
+
+    # Users without a score only match when no score filter is applied
+    if len(rows) <= limit and not _has_score_filters(filters):
+        query = _unscored_query(db)
+        if in_unscored_tail:
+            query = query.filter(User.id < after_user_id)
+        rows.extend((user, None) for user in query.limit(limit + 1 - len(rows)).all())
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last_user, last_score = rows[-1]
+        next_cursor = encode_lead_cursor(
+            last_score.composite_score if last_score else None, last_user.id
+        )
+
+    return rows, next_cursor
+
+
+def fetch_lead_offset_page(
+    db: Session,
+    filters: Dict[str, Any],
+    limit: int,
+    offset: int
+) -> List[Tuple[User, Optional[UserLeadScore]]]:
+    """
+    Legacy OFFSET page in the same order as fetch_lead_page. Cost grows with the
+    offset; kept for existing clients, new clients should follow the cursor.
+    """
+    if _has_score_filters(filters):
+        query = _scored_query(db, filters)
+    else:
+        query = db.query(User, UserLeadScore).outerjoin(
+            UserLeadScore, User.id == UserLeadScore.user_id
+        ).order_by(desc(UserLeadScore.composite_score).nullslast(), desc(User.id))
+    return query.offset(offset).limit(limit).all()
+
+
+def lead_row_to_dict(user: User, lead_score: Optional[UserLeadScore]) -> Dict[str, Any]:
+    """Flatten a (User, UserLeadScore) pair into LeadSummary fields"""
+    if lead_score:
+        return {
+            "user_id": user.id,
+            "email": user.email,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "composite_score": float(lead_score.composite_score),
+            "lead_temperature": lead_score.lead_temperature,
+            "temperature_label": TEMPERATURE_LABELS.get(lead_score.lead_temperature),
+            "intent_band": lead_score.intent_band,
+            "intent_label": INTENT_LABELS.get(lead_score.intent_band),
+            "profile_completion_pct": float(lead_score.profile_completion_pct),
+            "last_activity_at": lead_score.last_activity_at,
+            "created_at": user.created_at,
+        }
+
+    # User with no score yet
+    return {
+        "user_id": user.id,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "composite_score": 0.0,
+        "lead_temperature": None,
+        "temperature_label": None,
+        "intent_band": None,
+        "intent_label": None,
+        "profile_completion_pct": 0.0,
+        "last_activity_at": None,
+        "created_at": user.created_at,
+    }
+
+
+def _export_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, UUID):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def iter_lead_rows(db: Session, filters: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield every matching lead in list order, streaming from a server-side cursor"""
+    scored = _scored_query(db, filters).execution_options(yield_per=EXPORT_YIELD_PER)
+    for user, lead_score in scored:
+        yield lead_row_to_dict(user, lead_score)
+
+    if not _has_score_filters(filters):
+        unscored = _unscored_query(db).execution_options(yield_per=EXPORT_YIELD_PER)
+        for user in unscored:
+            yield lead_row_to_dict(user, None)
+
+
+def iter_csv_export(rows: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Render lead rows as CSV, one chunk per row (header first)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerow({k: _export_value(row[k]) for k in EXPORT_COLUMNS})
+        yield buffer.getvalue()
+
+
+def iter_ndjson_export(rows: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Render lead rows as newline-delimited JSON"""
+    for row in rows:
+        yield (json_dumps({k: _export_value(row[k]) for k in EXPORT_COLUMNS}) + b"\n").decode()
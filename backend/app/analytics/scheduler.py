@@ -10,7 +10,7 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
-from database import SessionLocal
+from database import SessionLocal, read_session
 from models import User, UserLeadScore, LeadScoreHistory
 from analytics.scoring_engine import BatchScoringEngine
 
@@ -42,24 +42,25 @@ class AnalyticsScheduler:
         try:
             logger.info("Starting batch score recalculation...")
             
-            # Get users to recalculate
-            if force or max_age_hours is None:
-                # Recalculate all users
-                user_ids = [u.id for u in db.query(User.id).all()]
-            else:
-                # Only recalculate stale scores
-                cutoff_time = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
-                
-                # Users with no score or old score
-                users_no_score = db.query(User.id).outerjoin(
-                    UserLeadScore, User.id == UserLeadScore.user_id
-                ).filter(UserLeadScore.user_id.is_(None)).all()
-                
-                users_stale_score = db.query(User.id).join(
-                    UserLeadScore, User.id == UserLeadScore.user_id
-                ).filter(UserLeadScore.last_calculated_at < cutoff_time).all()
-                
-                user_ids = list(set([u.id for u in users_no_score] + [u.id for u in users_stale_score]))
+            # Get users to recalculate (read-only: replica when it is fresh enough)
+            with read_session() as read_db:
+                if force or max_age_hours is None:
+                    # Recalculate all users
+                    user_ids = [u.id for u in read_db.query(User.id).all()]
+                else:
+                    # Only recalculate stale scores
+                    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+                    
+                    # Users with no score or old score
+                    users_no_score = read_db.query(User.id).outerjoin(
+                        UserLeadScore, User.id == UserLeadScore.user_id
+                    ).filter(UserLeadScore.user_id.is_(None)).all()
+                    
+                    users_stale_score = read_db.query(User.id).join(
+                        UserLeadScore, User.id == UserLeadScore.user_id
+                    ).filter(UserLeadScore.last_calculated_at < cutoff_time).all()
+                    
+                    user_ids = list(set([u.id for u in users_no_score] + [u.id for u in users_stale_score]))
             
             if not user_ids:
                 logger.info("No users need recalculation")
@@ -75,13 +76,21 @@ class AnalyticsScheduler:
             
             # Batch calculate
             batch_engine = BatchScoringEngine(db)
-            result = batch_engine.calculate_scores_for_users(user_ids, update_database=True)
+            result = batch_engine.calculate_scores_for_users(
+                user_ids,
+                update_database=True,
+                replace_signal_store=force or max_age_hours is None
+            )
             
             successful = sum(1 for r in result.values() if "error" not in r)
             failed = len(user_ids) - successful
             
             logger.info(f"Recalculation complete: {successful} successful, {failed} failed")
             
+            # Pre-warm the admin dashboard with the fresh scores
+            from analytics.admin_dashboard import AnalyticsDashboard
+            AnalyticsDashboard.refresh_cached_dashboard(db)
+            
             return {
                 "status": "success",
                 "message": f"Recalculated {successful} of {len(user_ids)} users",
@@ -246,6 +255,183 @@ class AnalyticsScheduler:
             db.close()
 
 
+    @staticmethod
+    def refresh_quiz_leaderboard() -> dict:
+        """
+        Refresh the quiz_leaderboard materialized view.
+        Runs every few minutes; readers are never blocked (CONCURRENTLY).
+        
+        Returns:
+            Summary of the refresh
+        """
+        db = SessionLocal()
+        try:
+            from utils import LeaderboardManager
+            
+            LeaderboardManager.refresh(db)
+            total_ranked = LeaderboardManager.get_total_ranked(db)
+            
+            logger.info(f"Refreshed quiz leaderboard ({total_ranked} ranked users)")
+            
+            return {
+                "status": "success",
+                "message": f"Refreshed quiz leaderboard ({total_ranked} ranked users)",
+                "total_ranked": total_ranked,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error refreshing quiz leaderboard: {e}", exc_info=True)
+            db.rollback()
+            return {
+                "status": "error",
+                "message": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+        finally:
+            db.close()
+
+    
+    @staticmethod
+    def sync_hubspot_contacts() -> dict:
+        """
+        Drain the HubSpot outbox (batched contact upserts with retry/backoff).
+        Runs every minute; a no-op when HubSpot is not configured.
+        
+        Returns:
+            Summary of sent / retried / failed entries
+        """
+        db = SessionLocal()
+        try:
+            from services.hubspot import drain_outbox
+            
+            totals = drain_outbox(db)
+            
+            if totals["sent"] or totals["retried"] or totals["failed"]:
+                logger.info(f"HubSpot outbox drained: {totals}")
+            
+            return {
+                "status": "success",
+                "message": f"Synced {totals['sent']} HubSpot contact update(s)",
+                **totals,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error draining HubSpot outbox: {e}", exc_info=True)
+            db.rollback()
+            return {
+                "status": "error",
+                "message": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+        finally:
+            db.close()
+
+    
+    @staticmethod
+    def compact_notifications(time_budget_seconds: int = 60) -> dict:
+        """
+        Compact the notifications table: delete expired notifications, roll old
+        read coin notifications up into monthly digests and cap each user's
+        read history. Works in bounded batches and stops when the time budget
+        is spent; the next run continues where this one stopped.
+        
+        Args:
+            time_budget_seconds: Wall-clock budget for the whole run
+        
+        Returns:
+            Summary of rows reclaimed per step
+        """
+        db = SessionLocal()
+        try:
+            import time
+            from utils import NotificationCompactionManager
+            
+            started = time.monotonic()
+            deadline = started + time_budget_seconds
+            
+            expired_deleted = NotificationCompactionManager.delete_expired(db, deadline)
+            digested_rows, digests_created = NotificationCompactionManager.roll_up_coin_notifications(db, deadline)
+            capped_deleted = NotificationCompactionManager.cap_user_history(db, deadline)
+            
+            reclaimed = expired_deleted + digested_rows - digests_created + capped_deleted
+            elapsed = time.monotonic() - started
+            
+            logger.info(
+                f"Compacted notifications: {reclaimed} rows reclaimed in {elapsed:.1f}s "
+                f"(expired={expired_deleted}, digested={digested_rows}, capped={capped_deleted})"
+            )
+            
+            return {
+                "status": "success",
+                "message": f"Reclaimed {reclaimed} notification rows",
+                "expired_deleted": expired_deleted,
+                "digested_rows": digested_rows,
+                "digests_created": digests_created,
+                "capped_deleted": capped_deleted,
+                "rows_reclaimed": reclaimed,
+                "budget_exhausted": time.monotonic() >= deadline,
+                "elapsed_seconds": round(elapsed, 2),
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error compacting notifications: {e}", exc_info=True)
+            db.rollback()
+            return {
+                "status": "error",
+                "message": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+        finally:
+            db.close()
+    
+    @staticmethod
+    def resume_user_data_wipes() -> dict:
+        """
+        Continue user data wipes that ran out of their time budget or whose
+        background task stopped. Runs every minute.
+        
+        Returns:
+            Summary of resumed / completed wipes
+        """
+        db = SessionLocal()
+        try:
+            from utils import UserDataWipeManager
+            
+            wipe_ids = UserDataWipeManager.resumable_wipe_ids(db)
+            completed = 0
+            for wipe_id in wipe_ids:
+                try:
+                    wipe = UserDataWipeManager.run_wipe(db, wipe_id)
+                    if wipe is not None and wipe.status == "completed":
+                        completed += 1
+                except Exception as e:
+                    logger.error(f"User data wipe {wipe_id} failed: {e}", exc_info=True)
+            
+            if wipe_ids:
+                logger.info(f"Resumed {len(wipe_ids)} user data wipe(s), {completed} completed")
+            
+            return {
+                "status": "success",
+                "message": f"Resumed {len(wipe_ids)} user data wipe(s)",
+                "resumed": len(wipe_ids),
+                "completed": completed,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error resuming user data wipes: {e}", exc_info=True)
+            db.rollback()
+            return {
+                "status": "error",
+                "message": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+        finally:
+            db.close()
+
 # ================================
 # CELERY TASKS (Production)
 # ================================
@@ -281,6 +467,22 @@ try:
             'cleanup-old-events-weekly': {
                 'task': 'analytics.scheduler.celery_cleanup_events',
                 'schedule': crontab(day_of_week=0, hour=3, minute=0),  # Sunday at 3 AM
+            },
+            'refresh-quiz-leaderboard': {
+                'task': 'analytics.scheduler.celery_refresh_quiz_leaderboard',
+                'schedule': crontab(minute='*/5'),  # Every 5 minutes
+            },
+            'sync-hubspot-contacts': {
+                'task': 'analytics.scheduler.celery_sync_hubspot_contacts',
+                'schedule': crontab(),  # Every minute
+            },
+            'compact-notifications-daily': {
+                'task': 'analytics.scheduler.celery_compact_notifications',
+                'schedule': crontab(hour=4, minute=0),  # Daily at 4 AM
+            },
+            'resume-user-data-wipes': {
+                'task': 'analytics.scheduler.celery_resume_user_data_wipes',
+                'schedule': crontab(),  # Every minute
             }
         }
     )
@@ -309,6 +511,55 @@ try:
         logger.info(f"Celery task complete: {result}")
         return result
     
+    @celery_app.task(name='analytics.scheduler.celery_refresh_quiz_leaderboard')
+    def celery_refresh_quiz_leaderboard():
+        """Celery task: Refresh quiz leaderboard"""
+        logger.info("Celery task: Refreshing quiz leaderboard")
+        result = AnalyticsScheduler.refresh_quiz_leaderboard()
+        logger.info(f"Celery task complete: {result}")
+        return result
+    
+    @celery_app.task(name='analytics.scheduler.celery_sync_hubspot_contacts')
+    def celery_sync_hubspot_contacts():
+        """Celery task: Drain the HubSpot outbox"""
+        logger.info("Celery task: Syncing HubSpot contacts")
+        result = AnalyticsScheduler.sync_hubspot_contacts()
+        logger.info(f"Celery task complete: {result}")
+        return result
+    
+    @celery_app.task(name='analytics.scheduler.celery_compact_notifications')
+    def celery_compact_notifications():
+        """Celery task: Compact the notifications table"""
+        logger.info("Celery task: Compacting notifications")
+        result = AnalyticsScheduler.compact_notifications()
+        logger.info(f"Celery task complete: {result}")
+        return result
+    
+    @celery_app.task(name='analytics.scheduler.celery_resume_user_data_wipes')
+    def celery_resume_user_data_wipes():
+        """Celery task: Resume unfinished user data wipes"""
+        logger.info("Celery task: Resuming user data wipes")
+        result = AnalyticsScheduler.resume_user_data_wipes()
+        logger.info(f"Celery task complete: {result}")
+        return result
+    
+    @celery_app.task(
+        name='analytics.scheduler.celery_send_email',
+        bind=True,
+        max_retries=4,
+        acks_late=True
+    )
+    def celery_send_email(self, kind, to_email, params):
+        """Celery task: Send a queued transactional email (see services.email_dispatch)"""
+        from services.email import deliver_email, EmailDeliveryError
+        try:
+            return deliver_email(kind, to_email, params)
+        except EmailDeliveryError as e:
+            if not e.retryable:
+                logger.error(f"Celery task: {kind} email to {to_email} failed: {e}")
+                return False
+            raise self.retry(exc=e, countdown=min(2 ** self.request.retries, 60))
+    
     CELERY_AVAILABLE = True
     logger.info("Celery tasks registered successfully")
 
@@ -370,6 +621,42 @@ class APSchedulerManager:
                 kwargs={'days_to_keep': 90}
             )
             
+            # Refresh quiz leaderboard every 5 minutes
+            self.scheduler.add_job(
+                func=AnalyticsScheduler.refresh_quiz_leaderboard,
+                trigger=CronTrigger(minute='*/5'),  # Every 5 minutes
+                id='refresh_quiz_leaderboard',
+                name='Refresh Quiz Leaderboard',
+                replace_existing=True
+            )
+            
+            # Drain the HubSpot outbox every minute
+            self.scheduler.add_job(
+                func=AnalyticsScheduler.sync_hubspot_contacts,
+                trigger=CronTrigger(minute='*'),  # Every minute
+                id='sync_hubspot_contacts',
+                name='Sync HubSpot Contacts',
+                replace_existing=True
+            )
+            
+            # Compact notifications daily at 4 AM
+            self.scheduler.add_job(
+                func=AnalyticsScheduler.compact_notifications,
+                trigger=CronTrigger(hour=4, minute=0),  # Daily at 4 AM
+                id='compact_notifications',
+                name='Compact Notifications',
+                replace_existing=True
+            )
+            
+            # Resume unfinished user data wipes every minute
+            self.scheduler.add_job(
+                func=AnalyticsScheduler.resume_user_data_wipes,
+                trigger=CronTrigger(minute='*'),  # Every minute
+                id='resume_user_data_wipes',
+                name='Resume User Data Wipes',
+                replace_existing=True
+            )
+            
             self.initialized = True
             logger.info("APScheduler initialized successfully")
             
@@ -16,6 +16,14 @@ from analytics.scoring_signals import SignalAvailabilityChecker
 from analytics.classifier import LeadClassifier
 
 
+# Extraction method per signal id, resolved once instead of by name for every user x signal
+SIGNAL_EXTRACTORS = {
+    signal.signal_id: getattr(SignalExtractor, signal.extraction_func)
+    for signal in ScoringSignalsCatalog.ALL_SIGNALS
+    if hasattr(SignalExtractor, signal.extraction_func)
+}
+
+
 class ScoringEngine:
     """
     Main scoring engine with partial data handling.
@@ -159,19 +167,18 @@ class ScoringEngine:
         Returns:
             Float value (0-100) or None if not available
         """
-        # Get the extraction method from SignalExtractor
-        method_name = signal.extraction_func
+        # Get the extraction method from the precompiled dispatch table
+        method = SIGNAL_EXTRACTORS.get(signal.signal_id)
         
-        if hasattr(self.extractor, method_name):
-            method = getattr(self.extractor, method_name)
+        if method is not None:
             try:
-                return method()
+                return method(self.extractor)
             except Exception as e:
                 # Log error but don't fail entire scoring
                 print(f"Error extracting signal {signal.signal_id}: {e}")
                 return None
         else:
-            print(f"Warning: Extraction method {method_name} not found")
+            print(f"Warning: Extraction method {signal.extraction_func} not found")
             return None
     
     def _calculate_composite_score(
@@ -274,14 +281,17 @@ class BatchScoringEngine:
     def calculate_scores_for_users(
         self, 
         user_ids: List[UUID],
-        update_database: bool = True
+        update_database: bool = True,
+        replace_signal_store: bool = False
     ) -> Dict[UUID, Dict[str, Any]]:
         """
         Calculate scores for multiple users.
         
         Args:
             user_ids: List of user IDs to score
-            update_database: Whether to save to database
+            update_database: Whether to save to database (and the signal store)
+            replace_signal_store: user_ids is the whole population; rewrite the
+                signal store instead of updating these users' rows
         
         Returns:
             Dictionary mapping user_id to score results
@@ -301,6 +311,9 @@ class BatchScoringEngine:
                 print(f"Error scoring user {user_id}: {e}")
                 results[user_id] = {"error": str(e)}
         
+        if update_database:
+            self._save_signals_to_store(results, replace_signal_store)
+        
         return results
     
     def calculate_all_users(self, update_database: bool = True) -> Dict[str, Any]:
@@ -320,7 +333,9 @@ class BatchScoringEngine:
         
         print(f"Scoring {len(user_ids)} users...")
         
-        results = self.calculate_scores_for_users(user_ids, update_database)
+        results = self.calculate_scores_for_users(
+            user_ids, update_database, replace_signal_store=True
+        )
         
         # Generate summary
         successful = sum(1 for r in results.values() if "error" not in r)
@@ -333,6 +348,17 @@ class BatchScoringEngine:
             "results": results
         }
     
+    def _save_signals_to_store(self, results: Dict[UUID, Dict[str, Any]], replace: bool):
+        """
+        Persist raw signal values for the re-weighting simulator.
+        A store failure is logged and never fails the scoring run.
+        """
+        try:
+            from analytics.signal_store import SignalStore
+            SignalStore.record_results(results, replace=replace)
+        except Exception as e:
+            print(f"Error writing signal store: {e}")
+    
     def _save_scores_to_db(self, user_id: UUID, scores: Dict[str, Any]):
         """
         Save calculated scores to database.
@@ -4,7 +4,7 @@ Scoring Signals Catalog
 Defines all data points used for lead scoring, their dimensions,
 and availability rules.
 """
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
@@ -28,7 +28,7 @@ class ScoreDimension(Enum):
     REWARDS = "rewards"
 
 
-@dataclass
+@dataclass(frozen=True)
 class ScoringSignal:
     """Represents a single scoring signal"""
     signal_id: str
@@ -473,36 +473,42 @@ class ScoringSignalsCatalog:
         ),
     ]
     
+    # Compiled once at import; the lists above stay the source of truth
+    ALL_SIGNALS: Tuple[ScoringSignal, ...] = tuple(
+        ENGAGEMENT_SIGNALS +
+        TIMELINE_URGENCY_SIGNALS +
+        HELP_SEEKING_SIGNALS +
+        LEARNING_VELOCITY_SIGNALS +
+        REWARDS_SIGNALS
+    )
+    SIGNALS_BY_DIMENSION: Dict[ScoreDimension, Tuple[ScoringSignal, ...]] = {
+        ScoreDimension.ENGAGEMENT: tuple(ENGAGEMENT_SIGNALS),
+        ScoreDimension.TIMELINE_URGENCY: tuple(TIMELINE_URGENCY_SIGNALS),
+        ScoreDimension.HELP_SEEKING: tuple(HELP_SEEKING_SIGNALS),
+        ScoreDimension.LEARNING_VELOCITY: tuple(LEARNING_VELOCITY_SIGNALS),
+        ScoreDimension.REWARDS: tuple(REWARDS_SIGNALS),
+    }
+    SIGNALS_BY_ID: Dict[str, ScoringSignal] = {s.signal_id: s for s in ALL_SIGNALS}
+    
     @classmethod
-    def get_all_signals(cls) -> List[ScoringSignal]:
+    def get_all_signals(cls) -> Tuple[ScoringSignal, ...]:
         """Get all scoring signals"""
-        return (
-            cls.ENGAGEMENT_SIGNALS +
-            cls.TIMELINE_URGENCY_SIGNALS +
-            cls.HELP_SEEKING_SIGNALS +
-            cls.LEARNING_VELOCITY_SIGNALS +
-            cls.REWARDS_SIGNALS
-        )
+        return cls.ALL_SIGNALS
     
     @classmethod
-    def get_signals_by_dimension(cls, dimension: ScoreDimension) -> List[ScoringSignal]:
+    def get_signals_by_dimension(cls, dimension: ScoreDimension) -> Tuple[ScoringSignal, ...]:
         """Get signals for a specific dimension"""
-        all_signals = cls.get_all_signals()
-        return [s for s in all_signals if s.dimension == dimension]
+        return cls.SIGNALS_BY_DIMENSION.get(dimension, ())
     
     @classmethod
     def get_total_signal_count(cls) -> int:
         """Total number of signals"""
-        return len(cls.get_all_signals())
+        return len(cls.ALL_SIGNALS)
     
     @classmethod
     def get_signal_by_id(cls, signal_id: str) -> Optional[ScoringSignal]:
         """Get a specific signal by ID"""
-        all_signals = cls.get_all_signals()
-        for signal in all_signals:
-            if signal.signal_id == signal_id:
-                return signal
-        return None
+        return cls.SIGNALS_BY_ID.get(signal_id)
 
 
 class SignalAvailabilityChecker:
@@ -517,6 +523,7 @@ class SignalAvailabilityChecker:
         self._user = None
         self._onboarding = None
         self._cached_data = {}
+        self._availability: Dict[str, bool] = {}
     
     @property
     def user(self):
@@ -539,17 +546,19 @@ class SignalAvailabilityChecker:
         """
         Check if a signal is available for this user.
         Returns True if we have the data to calculate this signal.
+        Each check runs at most once per checker (they may query the database).
         """
-        method_name = f"_check_{signal.extraction_func}"
-        if hasattr(self, method_name):
-            return getattr(self, method_name)()
-        return False
+        available = self._availability.get(signal.signal_id)
+        if available is None:
+            check = AVAILABILITY_CHECKS.get(signal.signal_id)
+            available = bool(check(self)) if check else False
+            self._availability[signal.signal_id] = available
+        return available
     
     def get_available_signals(self) -> List[ScoringSignal]:
         """Get list of all available signals for this user"""
-        all_signals = ScoringSignalsCatalog.get_all_signals()
         available = []
-        for signal in all_signals:
+        for signal in ScoringSignalsCatalog.ALL_SIGNALS:
             if self.check_signal_availability(signal):
                 available.append(signal)
         return available
@@ -563,11 +572,13 @@ class SignalAvailabilityChecker:
         dimension_counts = {}
         for dimension in ScoreDimension:
             dimension_signals = ScoringSignalsCatalog.get_signals_by_dimension(dimension)
-            available_dimension = [s for s in available_signals if s.dimension == dimension]
+            available_dimension = sum(
+                1 for s in dimension_signals if self.check_signal_availability(s)
+            )
             dimension_counts[dimension.value] = {
-                "available": len(available_dimension),
+                "available": available_dimension,
                 "total": len(dimension_signals),
-                "percentage": (len(available_dimension) / len(dimension_signals) * 100) if dimension_signals else 0
+                "percentage": (available_dimension / len(dimension_signals) * 100) if dimension_signals else 0
             }
         
         return {
@@ -869,3 +880,11 @@ class SignalAvailabilityChecker:
         return (self._check_extract_coins_earned() or 
                 self._check_extract_badges_count() or
                 self._check_extract_coupons_redeemed())
+
+
+# Availability check per signal id, resolved once instead of by name on every call
+AVAILABILITY_CHECKS: Dict[str, Callable[[SignalAvailabilityChecker], bool]] = {
+    signal.signal_id: getattr(SignalAvailabilityChecker, f"_check_{signal.extraction_func}")
+    for signal in ScoringSignalsCatalog.ALL_SIGNALS
+    if hasattr(SignalAvailabilityChecker, f"_check_{signal.extraction_func}")
+}
@@ -0,0 +1,202 @@
+"""
+Signal Store
+
+Columnar snapshot of every user's raw signal values, written by the batch
+scoring run so the population can be re-scored without touching PostgreSQL.
+
+The store is a single uncompressed .npz file holding:
+- signals:    float32 (n_users, n_signals) matrix, NaN = signal not available
+- user_ids:   (n_users,) 16-byte UUIDs
+- signal_ids: column order used when the file was written
+
+Writes go to a temporary file that is renamed into place, so readers always
+see a complete snapshot. Writers (e.g. the scheduled run and a manual
+recalculation) take an exclusive flock on a sidecar "<path>.lock" file around
+the read-merge-replace, so concurrent runs do not lose each other's rows
+(the storage must support file locks, as local disks and NFSv4 / EFS do). ANALYTICS_SIGNAL_STORE_PATH should point at storage
+shared by the batch worker and the API (e.g. a mounted volume in production).
+"""
+import fcntl
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from analytics.vectorized_scoring import VectorizedScoringEngine
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_STORE_PATH = os.getenv(
+    "ANALYTICS_SIGNAL_STORE_PATH",
+    os.path.join(tempfile.gettempdir(), "analytics_signal_store.npz")
+)
+
+
+class SignalStoreNotFound(FileNotFoundError):
+    """Raised when no signal store has been written yet"""
+
+
+@contextmanager
+def write_lock(path: str = None) -> Iterator[None]:
+    """Exclusive lock on "<path>.lock" serialising writers across processes"""
+    path = path or SIGNAL_STORE_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SignalStore:
+    """
+    Read/write access to the signal store file.
+
+    Loaded snapshots are cached in-process and reloaded when the file changes.
+    """
+
+    _cache: Optional[Tuple[int, Dict[str, Any]]] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def write(user_ids: np.ndarray, signals: np.ndarray, path: str = None) -> Dict[str, Any]:
+        """
+        Replace the store with the given matrix.
+
+        Args:
+            user_ids: (n_users,) array of 16-byte UUIDs (dtype S16)
+            signals: (n_users, n_signals) matrix in VectorizedScoringEngine column order
+            path: Store location (default SIGNAL_STORE_PATH)
+
+        Returns:
+            Summary with path, user count and write timestamp
+        """
+        path = path or SIGNAL_STORE_PATH
+        written_at = datetime.now(timezone.utc).isoformat()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    signals=np.asarray(signals, dtype=np.float32),
+                    user_ids=np.asarray(user_ids, dtype="S16"),
+                    signal_ids=np.array(VectorizedScoringEngine.SIGNAL_IDS),
+                    written_at=np.array(written_at)
+                )
+            os.replace(tmp_path, path)
+            SignalStore._cache = None
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        logger.info(f"Wrote signal store with {len(user_ids)} users to {path}")
+        return {"path": path, "total_users": len(user_ids), "written_at": written_at}
+
+    @staticmethod
+    def load(path: str = None) -> Dict[str, Any]:
+        """
+        Load the current snapshot (cached until the file changes).
+
+        Columns are realigned to the current signal catalog: signals added since
+        the file was written come back as NaN, removed signals are dropped.
+
+        Returns:
+            Dict with "signals" (float32 matrix), "user_ids" (S16 array) and "written_at"
+
+        Raises:
+            SignalStoreNotFound: if the store has not been written yet
+        """
+        path = path or SIGNAL_STORE_PATH
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            raise SignalStoreNotFound(f"Signal store not found at {path}")
+
+        with SignalStore._lock:
+            cached = SignalStore._cache
+            if cached and cached[0] == mtime and cached[1]["path"] == path:
+                return cached[1]
+
+            with np.load(path) as data:
+                signals = data["signals"]
+                stored_ids = [str(s) for s in data["signal_ids"]]
+                snapshot = {
+                    "path": path,
+                    "signals": SignalStore._align_columns(signals, stored_ids),
+                    "user_ids": data["user_ids"],
+                    "written_at": str(data["written_at"]),
+                }
+
+            SignalStore._cache = (mtime, snapshot)
+            return snapshot
+
+    @staticmethod
+    def _align_columns(signals: np.ndarray, stored_ids: list) -> np.ndarray:
+        if tuple(stored_ids) == VectorizedScoringEngine.SIGNAL_IDS:
+            return signals
+
+        stored_index = {signal_id: i for i, signal_id in enumerate(stored_ids)}
+        aligned = VectorizedScoringEngine.empty_matrix(signals.shape[0], dtype=np.float32)
+        for column, signal_id in enumerate(VectorizedScoringEngine.SIGNAL_IDS):
+            if signal_id in stored_index:
+                aligned[:, column] = signals[:, stored_index[signal_id]]
+        return aligned
+
+    @staticmethod
+    def record_results(
+        results: Dict[UUID, Dict[str, Any]],
+        replace: bool = False,
+        path: str = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Persist signal rows from BatchScoringEngine results.
+
+        Args:
+            results: user_id -> ScoringEngine.calculate_all_scores() result
+                (entries with an "error" key are skipped)
+            replace: Write only these users (full run); otherwise update their
+                rows in the existing store and keep everyone else (under
+                write_lock, so a concurrent run's rows are not dropped)
+            path: Store location (default SIGNAL_STORE_PATH)
+
+        Returns:
+            write() summary, or None if there was nothing to record
+        """
+        scored = {
+            user_id: scores for user_id, scores in results.items() if "error" not in scores
+        }
+        if not scored:
+            return None
+
+        new_ids = np.array([user_id.bytes for user_id in scored], dtype="S16")
+        new_rows = VectorizedScoringEngine.rows_from_scores(list(scored.values()))
+
+        with write_lock(path):
+            if not replace:
+                try:
+                    existing = SignalStore.load(path)
+                except SignalStoreNotFound:
+                    existing = None
+
+                if existing is not None and len(existing["user_ids"]):
+                    keep = ~np.isin(existing["user_ids"], new_ids)
+                    new_ids = np.concatenate([existing["user_ids"][keep], new_ids])
+                    new_rows = np.concatenate([existing["signals"][keep], new_rows])
+
+            return SignalStore.write(new_ids, new_rows, path)
+
+    @staticmethod
+    def decode_user_id(raw: bytes) -> UUID:
+        """UUID from a stored 16-byte id (numpy strips trailing NUL bytes)"""
+        return UUID(bytes=raw.ljust(16, b"\0"))
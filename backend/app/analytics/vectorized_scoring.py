@@ -0,0 +1,323 @@
+"""
+Vectorized Scoring Engine
+
+Columnar counterpart of ScoringEngine for scoring a whole population at once.
+
+Input is a users x signals float matrix whose columns follow
+ScoringSignalsCatalog.get_all_signals() order; NaN marks a signal that is not
+available for that user (or whose extractor returned None). Dimension scores are
+masked weighted averages, the composite is the weighted average of dimensions
+with at least one available signal, and temperature / intent bands are derived
+with np.select over the same rule chain as LeadClassifier.
+
+Results match ScoringEngine + LeadClassifier.classify_lead exactly: signals are
+accumulated in catalog order (the same floating-point sequence as the per-user
+loop) and rounding reproduces Python's round(x, 2).
+"""
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from analytics.scoring_signals import ScoringSignalsCatalog, ScoreDimension
+from analytics.classifier import LeadClassifier, LeadTemperature, IntentBand
+
+# Band codes returned by classify(); index into these tuples to get the value
+TEMPERATURE_CODES: Tuple[str, ...] = tuple(t.value for t in LeadTemperature)
+INTENT_CODES: Tuple[str, ...] = tuple(i.value for i in IntentBand)
+
+# Result keys per dimension, in ScoringEngine.calculate_all_scores order
+DIMENSION_SCORE_KEYS = {
+    ScoreDimension.ENGAGEMENT: "engagement_score",
+    ScoreDimension.TIMELINE_URGENCY: "timeline_urgency_score",
+    ScoreDimension.HELP_SEEKING: "help_seeking_score",
+    ScoreDimension.LEARNING_VELOCITY: "learning_velocity_score",
+    ScoreDimension.REWARDS: "rewards_score",
+}
+
+# Rows scored per block; keeps the per-column temporaries cache-sized
+SCORE_CHUNK_ROWS = 8192
+
+# Matrix column layout
+_SIGNALS = tuple(ScoringSignalsCatalog.get_all_signals())
+
+
+def round2(values: np.ndarray) -> np.ndarray:
+    """
+    Element-wise equivalent of Python's round(x, 2).
+
+    np.round scales by 100 before rounding, which can land on the wrong side of
+    a .5 boundary; the few values that sit that close to a boundary are rounded
+    with Python's correctly-rounded round() instead.
+    """
+    scaled = values * 100.0
+    result = np.rint(scaled) / 100.0
+    ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-7
+    if ambiguous.any():
+        idx = np.nonzero(ambiguous)
+        result[idx] = [round(float(v), 2) for v in values[idx]]
+    return result
+
+
+class VectorizedScoringEngine:
+    """
+    Population-wide scoring over a signal matrix.
+
+    Column layout is fixed by the signal catalog; use SIGNAL_IDS / column_index()
+    to place values when building the matrix.
+    """
+
+    SIGNALS = _SIGNALS
+    SIGNAL_IDS: Tuple[str, ...] = tuple(s.signal_id for s in _SIGNALS)
+    DIMENSIONS: Tuple[ScoreDimension, ...] = tuple(DIMENSION_SCORE_KEYS)
+    # Column indices per dimension, in catalog order
+    DIMENSION_COLUMNS: Dict[ScoreDimension, Tuple[int, ...]] = {
+        dimension: tuple(i for i, s in enumerate(_SIGNALS) if s.dimension == dimension)
+        for dimension in DIMENSION_SCORE_KEYS
+    }
+    _COLUMN_BY_ID = {s.signal_id: i for i, s in enumerate(_SIGNALS)}
+
+    @classmethod
+    def column_index(cls, signal_id: str) -> int:
+        """Matrix column for a signal id"""
+        return cls._COLUMN_BY_ID[signal_id]
+
+    @classmethod
+    def empty_matrix(cls, n_users: int, dtype=np.float64) -> np.ndarray:
+        """All-NaN (nothing available) matrix for n_users"""
+        return np.full((n_users, len(cls.SIGNALS)), np.nan, dtype=dtype)
+
+    @classmethod
+    def signal_weights(cls, overrides: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Signal weight vector in column order, optionally overriding weights by signal id"""
+        overrides = overrides or {}
+        return np.array(
+            [float(overrides.get(s.signal_id, s.weight)) for s in cls.SIGNALS],
+            dtype=np.float64
+        )
+
+    @classmethod
+    def dimension_weights(cls, overrides: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Dimension weight vector (DIMENSIONS order), overrides keyed by dimension value"""
+        from analytics.scoring_engine import ScoringEngine
+
+        overrides = overrides or {}
+        return np.array(
+            [
+                float(overrides.get(d.value, ScoringEngine.DIMENSION_WEIGHTS.get(d, 0.0)))
+                for d in cls.DIMENSIONS
+            ],
+            dtype=np.float64
+        )
+
+    @classmethod
+    def score(
+        cls,
+        values: np.ndarray,
+        signal_weights: Optional[np.ndarray] = None,
+        dimension_weights: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Score every row of the signal matrix.
+
+        Args:
+            values: (n_users, n_signals) matrix, NaN = unavailable
+            signal_weights: per-column weights (default: catalog weights)
+            dimension_weights: per-dimension weights (default: ScoringEngine.DIMENSION_WEIGHTS)
+
+        Returns:
+            Dict of 1-D arrays: the five dimension score keys, "composite_score",
+            "available_signals_count", "profile_completion_pct" and
+            "<dimension>_available" counts.
+        """
+        values = np.asarray(values)
+        if values.ndim != 2 or values.shape[1] != len(cls.SIGNALS):
+            raise ValueError(
+                f"Expected a (n_users, {len(cls.SIGNALS)}) matrix, got {values.shape}"
+            )
+        if signal_weights is None:
+            signal_weights = cls.signal_weights()
+        if dimension_weights is None:
+            dimension_weights = cls.dimension_weights()
+
+        n_users = values.shape[0]
+        result: Dict[str, np.ndarray] = {
+            key: np.empty(n_users) for key in DIMENSION_SCORE_KEYS.values()
+        }
+        for dimension in cls.DIMENSIONS:
+            result[f"{dimension.value}_available"] = np.empty(n_users, dtype=np.int64)
+        result["composite_score"] = np.empty(n_users)
+        result["available_signals_count"] = np.empty(n_users, dtype=np.int64)
+
+        for start in range(0, n_users, SCORE_CHUNK_ROWS):
+            cls._score_chunk(
+                values[start:start + SCORE_CHUNK_ROWS],
+                signal_weights,
+                dimension_weights,
+                result,
+                slice(start, start + SCORE_CHUNK_ROWS)
+            )
+
+        result["profile_completion_pct"] = (
+            result["available_signals_count"] / len(cls.SIGNALS) * 100
+        )
+        return result
+
+    @classmethod
+    def _score_chunk(
+        cls,
+        values: np.ndarray,
+        signal_weights: np.ndarray,
+        dimension_weights: np.ndarray,
+        result: Dict[str, np.ndarray],
+        rows: slice
+    ) -> None:
+        """Score a block of rows into result[...][rows]"""
+        # Stored matrices may be float32; score in float64 like the per-user engine
+        values = values.astype(np.float64, copy=False)
+
+        # Signal-major copies so each column is contiguous; unavailable values
+        # become 0.0, which adds nothing to the running sums. fmax drops NaN
+        # without a masked write; it only equals the mask for non-negative values
+        signals = values.T
+        available = np.isnan(signals, order="C")
+        np.logical_not(available, out=available)
+        if np.any(signals < 0):
+            filled = np.where(available, signals, 0.0)
+        else:
+            filled = np.fmax(signals, 0.0, order="C")
+
+        present = available.view(np.uint8)
+
+        n_rows = values.shape[0]
+        signal_count = np.zeros(n_rows, dtype=np.uint8)
+        composite_sum = np.zeros(n_rows)
+        composite_weight = np.zeros(n_rows)
+        term = np.empty(n_rows)
+
+        for k, dimension in enumerate(cls.DIMENSIONS):
+            columns = cls.DIMENSION_COLUMNS[dimension]
+            weighted_sum = np.zeros(n_rows)
+            total_weight = np.zeros(n_rows)
+            available_count = np.zeros(n_rows, dtype=np.uint8)
+
+            # Column by column so the float additions happen in catalog order
+            for j in columns:
+                np.multiply(filled[j], signal_weights[j], out=term)
+                weighted_sum += term
+                np.multiply(available[j], signal_weights[j], out=term)
+                total_weight += term
+                available_count += present[j]
+            signal_count += available_count
+
+            has_weight = total_weight > 0
+            score = round2(np.where(
+                has_weight, weighted_sum / np.where(has_weight, total_weight, 1.0), 0.0
+            ))
+
+            result[DIMENSION_SCORE_KEYS[dimension]][rows] = score
+            result[f"{dimension.value}_available"][rows] = available_count
+
+            has_signals = available_count > 0
+            composite_sum += np.where(has_signals, score * dimension_weights[k], 0.0)
+            composite_weight += np.where(has_signals, dimension_weights[k], 0.0)
+
+        has_weight = composite_weight > 0
+        normalized = np.where(
+            has_weight, composite_sum / np.where(has_weight, composite_weight, 1.0), 0.0
+        )
+        result["composite_score"][rows] = round2(normalized * 10)
+        result["available_signals_count"][rows] = signal_count
+
+    @classmethod
+    def classify(
+        cls,
+        scores: Dict[str, np.ndarray],
+        temperature_thresholds: Optional[Dict[str, float]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Temperature and intent band codes for every user.
+
+        Args:
+            scores: Output of score()
+            temperature_thresholds: Overrides keyed by temperature value
+                (default: LeadClassifier.TEMPERATURE_THRESHOLDS)
+
+        Returns:
+            (temperature_codes, intent_codes) int8 arrays indexing
+            TEMPERATURE_CODES / INTENT_CODES
+        """
+        thresholds = {t.value: v for t, v in LeadClassifier.TEMPERATURE_THRESHOLDS.items()}
+        thresholds.update(temperature_thresholds or {})
+
+        composite = scores["composite_score"]
+        engagement = scores["engagement_score"]
+        urgency = scores["timeline_urgency_score"]
+        help_seeking = scores["help_seeking_score"]
+        velocity = scores["learning_velocity_score"]
+
+        hot, warm, cold, dormant = range(4)
+        temperature = np.select(
+            [
+                composite >= thresholds[LeadTemperature.HOT_LEAD.value],
+                composite >= thresholds[LeadTemperature.WARM_LEAD.value],
+                composite >= thresholds[LeadTemperature.COLD_LEAD.value],
+            ],
+            [hot, warm, cold],
+            default=dormant
+        ).astype(np.int8)
+
+        # Same rule order as LeadClassifier._classify_intent: first match wins
+        very_high, high, medium, low = range(4)
+        intent = np.select(
+            [
+                (urgency >= 80) & (help_seeking >= 70),
+                (composite >= 750) & (urgency >= 70),
+                help_seeking >= 85,
+                (urgency >= 65) & (help_seeking >= 50),
+                composite >= 650,
+                help_seeking >= 70,
+                (urgency >= 50) & (engagement >= 40),
+                (engagement >= 60) & (velocity >= 50),
+                composite >= 400,
+                help_seeking >= 40,
+            ],
+            [very_high, very_high, very_high, high, high, high, medium, medium, medium, medium],
+            default=low
+        ).astype(np.int8)
+
+        return temperature, intent
+
+    @classmethod
+    def distribution(cls, codes: np.ndarray, labels: Tuple[str, ...]) -> Dict[str, Dict[str, Any]]:
+        """Count / percentage per band for an array of band codes"""
+        counts = np.bincount(codes.astype(np.int64), minlength=len(labels))
+        total = int(codes.size)
+        return {
+            label: {
+                "count": int(counts[i]),
+                "percentage": round(float(counts[i]) / total * 100, 2) if total else 0.0
+            }
+            for i, label in enumerate(labels)
+        }
+
+    @classmethod
+    def row_from_scores(cls, scores: Dict[str, Any]) -> np.ndarray:
+        """
+        Signal row from a ScoringEngine.calculate_all_scores() result, using the
+        per-signal values in dimension_details (NaN where not available).
+        """
+        row = np.full(len(cls.SIGNALS), np.nan)
+        for details in scores.get("dimension_details", {}).values():
+            for signal_value in details.get("signal_values", []):
+                column = cls._COLUMN_BY_ID.get(signal_value["signal_id"])
+                if column is not None:
+                    row[column] = float(signal_value["value"])
+        return row
+
+    @classmethod
+    def rows_from_scores(cls, score_results: List[Dict[str, Any]]) -> np.ndarray:
+        """Stack row_from_scores() for many results into a matrix"""
+        matrix = cls.empty_matrix(len(score_results))
+        for i, scores in enumerate(score_results):
+            matrix[i] = cls.row_from_scores(scores)
+        return matrix
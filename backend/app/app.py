@@ -7,28 +7,60 @@ from mangum import Mangum
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from starlette.concurrency import run_in_threadpool
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from admin import setup_admin
+import importlib
 import logging
 import os
 
-from database import get_db, engine
-from models import Base
-from routers import (
-    auth, onboarding, dashboard, learning,
-    quiz, rewards, materials, help_support, notifications,
-    analytics, grow_your_nest
+from database import (
+    get_db, engine, pool_status, async_pool_status, dispose_async_engine, replica_router
 )
-from analytics.scheduler import start_scheduler, stop_scheduler
+from services.email_dispatch import email_dispatcher, EMAIL_DISPATCH_BACKEND, EMAIL_DISPATCH_BACKENDS
+from services.counters import counter_buffer, COUNTER_FLUSH_MODE, COUNTER_FLUSH_MODES
+from rate_limit import limiter
+from responses import default_response_class
+from services.notification_stream import notification_hub
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Deployment profile: "server" (uvicorn / docker) or "lambda" (Mangum handler,
+# detected from the Lambda runtime). The lambda profile keeps cold starts short:
+# no schema creation, admin interface or in-process scheduler. Each setting
+# below can still be overridden on its own.
+APP_PROFILE = os.getenv(
+    "APP_PROFILE", "lambda" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "server"
+).lower()
+
+
+def _profile_setting(name: str) -> bool:
+    default = "true" if APP_PROFILE == "server" else "false"
+    return os.getenv(name, default).lower() == "true"
+
+
+# Base.metadata.create_all on startup (otherwise the schema comes from Alembic, see migrate.sh)
+CREATE_TABLES_ON_STARTUP = _profile_setting("CREATE_TABLES_ON_STARTUP")
+# sqladmin interface at /admin
+ENABLE_ADMIN = _profile_setting("ENABLE_ADMIN")
+# APScheduler jobs in this process (Celery Beat runs them otherwise)
+ENABLE_SCHEDULER = _profile_setting("ENABLE_SCHEDULER")
+
+if EMAIL_DISPATCH_BACKEND not in EMAIL_DISPATCH_BACKENDS:
+    raise RuntimeError(
+        f"Unknown EMAIL_DISPATCH_BACKEND: {EMAIL_DISPATCH_BACKEND} "
+        f"(expected one of {', '.join(EMAIL_DISPATCH_BACKENDS)})"
+    )
+if APP_PROFILE == "lambda" and EMAIL_DISPATCH_BACKEND == "thread":
+    # Sender threads are frozen with the container once a response is returned
+    raise RuntimeError("EMAIL_DISPATCH_BACKEND=thread cannot be used with the lambda profile (use inline or celery)")
+if COUNTER_FLUSH_MODE not in COUNTER_FLUSH_MODES:
+    raise RuntimeError(
+        f"Unknown COUNTER_FLUSH_MODE: {COUNTER_FLUSH_MODE} "
+        f"(expected one of {', '.join(COUNTER_FLUSH_MODES)})"
+    )
 
 # Create FastAPI app
 app = FastAPI(
@@ -36,7 +68,9 @@ app = FastAPI(
     description="Backend API for the NestNavigate platform",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson rendering (JSON_RESPONSE_BACKEND=json for the stdlib encoder), see responses.py
+    default_response_class=default_response_class()
 )
 
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
@@ -64,6 +98,17 @@ class ProxyHeadersMiddleware(BaseHTTPMiddleware):
 # Proxy middleware FIRST (before all others)
 app.add_middleware(ProxyHeadersMiddleware)
 
+# View / download counts without a flusher thread (lambda profile, see services/counters.py)
+class CounterFlushMiddleware(BaseHTTPMiddleware):
+    """Write the request's buffered counter increments before the response is returned"""
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        await run_in_threadpool(counter_buffer.flush_request)
+        return response
+
+if COUNTER_FLUSH_MODE == "request":
+    app.add_middleware(CounterFlushMiddleware)
+
 # Trusted Hosts
 if ENVIRONMENT == "production":
     ALLOWED_HOSTS = os.getenv(
@@ -128,20 +173,35 @@ app.add_middleware(
     https_only=(ENVIRONMENT == "production"),
 )
 
-# Rate Limiting Configuration
-limiter = Limiter(key_func=get_remote_address)
+# Rate Limiting Configuration (shared limiter, see rate_limit.py)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 logger.info("Rate limiting enabled for high-volume endpoints")
 
 # Setup admin interface
-setup_admin(app)
+if ENABLE_ADMIN:
+    from admin import setup_admin
+    setup_admin(app)
+
 
-# Startup event: Initialize scheduler
+def create_tables():
+    """Create missing tables (development; production schema is managed by Alembic)"""
+    from models import Base
+    Base.metadata.create_all(bind=engine)
+
+
+# Startup event: Create tables and initialize scheduler
 @app.on_event("startup")
 async def startup_event():
-    """Initialize background scheduler on application startup"""
+    """Create tables and initialize background scheduler on application startup"""
+    if CREATE_TABLES_ON_STARTUP:
+        create_tables()
+    if not ENABLE_SCHEDULER:
+        logger.info(f"Analytics scheduler disabled ({APP_PROFILE} profile)")
+        return
     try:
+        from analytics.scheduler import start_scheduler
+
         logger.info("Starting analytics scheduler...")
         # Use APScheduler for development, Celery for production
         use_apscheduler = os.getenv("USE_APSCHEDULER", "true").lower() == "true"
@@ -153,33 +213,66 @@ async def startup_event():
 # Shutdown event: Stop scheduler gracefully
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Stop scheduler on application shutdown"""
+    """Stop background work on application shutdown; one failing step does not skip the rest"""
+    if ENABLE_SCHEDULER:
+        try:
+            from analytics.scheduler import stop_scheduler
+
+            logger.info("Stopping analytics scheduler...")
+            stop_scheduler()
+            logger.info("Analytics scheduler stopped")
+        except Exception as e:
+            logger.error(f"Error stopping scheduler: {e}", exc_info=True)
     try:
-        logger.info("Stopping analytics scheduler...")
-        stop_scheduler()
-        logger.info("Analytics scheduler stopped")
+        # Send queued emails before the process exits
+        email_dispatcher.shutdown(timeout=10.0)
     except Exception as e:
-        logger.error(f"Error stopping scheduler: {e}", exc_info=True)
+        logger.error(f"Error draining email queue: {e}", exc_info=True)
+    try:
+        notification_hub.stop_listener()
+    except Exception as e:
+        logger.error(f"Error stopping notification listener: {e}", exc_info=True)
+    try:
+        # Write buffered view / download counts
+        counter_buffer.shutdown()
+    except Exception as e:
+        logger.error(f"Error flushing counters: {e}", exc_info=True)
+    try:
+        await dispose_async_engine()
+    except Exception as e:
+        logger.error(f"Error disposing async engine: {e}", exc_info=True)
 
 # Include routers
 API_ROUTE_GROW_YOUR_NEST = "grow-your-nest"
 ROUTE_TAG_GROW_YOUR_NEST = "Grow Your Nest"
 
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(onboarding.router, prefix="/api/onboarding", tags=["Onboarding"])
-app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
-app.include_router(learning.router, prefix="/api/learning", tags=["Learning"])
-app.include_router(quiz.router, prefix="/api/quiz", tags=["Quiz"])
-app.include_router(rewards.router, prefix="/api/rewards", tags=["Rewards"])
-app.include_router(materials.router, prefix="/api/materials", tags=["Materials"])
-app.include_router(help_support.router, prefix="/api/help", tags=["Help & Support"])
-app.include_router(notifications.router, prefix="/api/notifications", tags=["Notifications"])
-app.include_router(
-    grow_your_nest.router,
-    prefix=f"/api/{API_ROUTE_GROW_YOUR_NEST}",
-    tags=[ROUTE_TAG_GROW_YOUR_NEST],
-)
-app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
+# Router module -> (prefix, tag). API_ROUTERS=auth,learning,... limits a
+# deployment (e.g. one Lambda function per area) to the routers it serves;
+# the others are never imported.
+ROUTERS = {
+    "auth": ("/api/auth", "Authentication"),
+    "onboarding": ("/api/onboarding", "Onboarding"),
+    "dashboard": ("/api/dashboard", "Dashboard"),
+    "learning": ("/api/learning", "Learning"),
+    "quiz": ("/api/quiz", "Quiz"),
+    "rewards": ("/api/rewards", "Rewards"),
+    "materials": ("/api/materials", "Materials"),
+    "help_support": ("/api/help", "Help & Support"),
+    "notifications": ("/api/notifications", "Notifications"),
+    "grow_your_nest": (f"/api/{API_ROUTE_GROW_YOUR_NEST}", ROUTE_TAG_GROW_YOUR_NEST),
+    "analytics": ("/api/analytics", "Analytics"),
+}
+ENABLED_ROUTERS = [
+    name.strip() for name in os.getenv("API_ROUTERS", ",".join(ROUTERS)).split(",") if name.strip()
+]
+
+for router_name in ENABLED_ROUTERS:
+    if router_name not in ROUTERS:
+        raise ValueError(f"Unknown router in API_ROUTERS: {router_name}")
+    prefix, tag = ROUTERS[router_name]
+    app.include_router(
+        importlib.import_module(f"routers.{router_name}").router, prefix=prefix, tags=[tag]
+    )
 
 @app.get("/")
 def read_root():
@@ -200,7 +293,13 @@ def health_check(db: Session = Depends(get_db)):
         return {
             "status": "healthy",
             "database": "connected",
-            "timestamp": "2024-01-01T00:00:00Z"
+            "timestamp": "2024-01-01T00:00:00Z",
+            # Connection pool state, checkout wait, overflow and invalidations
+            "pool": pool_status(),
+            # asyncpg engine of the async endpoints (null until first used)
+            "async_pool": async_pool_status(),
+            # Read replica lag, routed reads and fallbacks to the primary
+            "replica": replica_router.status()
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
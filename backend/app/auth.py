@@ -9,9 +9,10 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_db, get_async_db
 from models import User
 from schemas import UserResponse
 
@@ -145,39 +146,21 @@ class AuthManager:
         return ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32))
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user"""
+def _access_token_user_id(credentials: HTTPAuthorizationCredentials) -> UUID:
+    """User id (sub) of a valid access token; raises 401 otherwise"""
+    payload = AuthManager.verify_token(credentials.credentials)
+    user_id: str = payload.get("sub")
+    token_type: str = payload.get("token_type")
+    
+    if user_id is None or token_type != "access":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     try:
-        payload = AuthManager.verify_token(credentials.credentials)
-        user_id: str = payload.get("sub")
-        token_type: str = payload.get("token_type")
-        
-        if user_id is None or token_type != "access":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        user = AuthManager.get_user_by_id(db, UUID(user_id))
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Inactive user"
-            )
-        
-        return user
-        
+        return UUID(user_id)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -186,6 +169,41 @@ def get_current_user(
         )
 
 
+def _require_active_user(user: Optional[User]) -> User:
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    return user
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get the current authenticated user"""
+    user_id = _access_token_user_id(credentials)
+    return _require_active_user(AuthManager.get_user_by_id(db, user_id))
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get the current authenticated user through the async session (async def endpoints)"""
+    user_id = _access_token_user_id(credentials)
+    return _require_active_user(await db.get(User, user_id))
+
+
 def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
     db: Session = Depends(get_db)
@@ -7,6 +7,10 @@ import os
 from celery import Celery
 from celery.schedules import crontab
 
+# Worker processes import the tasks (and database.py) after this module:
+# give them the worker connection pool unless configured otherwise
+os.environ.setdefault('DB_POOL_PROFILE', 'worker')
+
 # Get broker and backend URLs from environment
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
@@ -63,6 +67,42 @@ celery_app.conf.update(
             'options': {
                 'expires': 7200,  # Task expires after 2 hours
             }
+        },
+        
+        # Refresh quiz leaderboard materialized view every 5 minutes
+        'refresh-quiz-leaderboard': {
+            'task': 'analytics.scheduler.celery_refresh_quiz_leaderboard',
+            'schedule': crontab(minute='*/5'),
+            'options': {
+                'expires': 240,  # Task expires after 4 minutes
+            }
+        },
+        
+        # Drain the HubSpot contact outbox every minute
+        'sync-hubspot-contacts': {
+            'task': 'analytics.scheduler.celery_sync_hubspot_contacts',
+            'schedule': crontab(),
+            'options': {
+                'expires': 55,  # Task expires after 55 seconds
+            }
+        },
+        
+        # Compact the notifications table daily at 4 AM UTC
+        'compact-notifications-daily': {
+            'task': 'analytics.scheduler.celery_compact_notifications',
+            'schedule': crontab(hour=4, minute=0),
+            'options': {
+                'expires': 7200,  # Task expires after 2 hours
+            }
+        },
+        
+        # Resume user data wipes that ran out of time or were interrupted
+        'resume-user-data-wipes': {
+            'task': 'analytics.scheduler.celery_resume_user_data_wipes',
+            'schedule': crontab(),
+            'options': {
+                'expires': 55,  # Task expires after 55 seconds
+            }
         }
     }
 )
@@ -1,11 +1,22 @@
+import logging
 import os
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, make_url, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Database configuration
 POSTGRES_DB = os.getenv("POSTGRES_DB", "homebuyer_db")
 POSTGRES_USER = os.getenv("POSTGRES_USER", "admin")
@@ -15,15 +26,261 @@ POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
 # Create database URL
 DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+# Same database through asyncpg, for the async read endpoints (get_async_db)
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+# ================================
+# POOL PROFILES
+# ================================
+
+# Connection pool settings per process type. DB_POOL_PROFILE selects one
+# (Lambda containers default to "lambda"); DB_POOL_SIZE / DB_MAX_OVERFLOW /
+# DB_POOL_TIMEOUT / DB_POOL_RECYCLE / DB_POOL_PRE_PING override single values.
+# "async_pool" sizes the async engine (get_async_db) of the same process,
+# overridden by DB_ASYNC_POOL_SIZE / DB_ASYNC_MAX_OVERFLOW; both pools count
+# against the database's max_connections, so they share one budget.
+POOL_PROFILES: Dict[str, Dict[str, Any]] = {
+    # uvicorn API server. The hot reads run on the async pool; the sync pool
+    # serves writes, the remaining sync endpoints and background threads.
+    # 5+10 sync plus 10+10 async: at most 35 connections per process
+    "api": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": 3600,  # Recycle connections after 1 hour
+        "pool_pre_ping": True,  # Verify connections before using them
+        "async_pool": {"pool_size": 10, "max_overflow": 10},
+    },
+    # One request at a time per container: keep a single warm connection
+    # (overflow only covers a background task running next to the request).
+    # No pre-ping (a round trip per checkout); a short recycle stays under
+    # the idle timeout of RDS Proxy / PgBouncer instead.
+    "lambda": {
+        "pool_size": 1,
+        "max_overflow": 2,
+        "pool_timeout": 10,
+        "pool_recycle": 300,
+        "pool_pre_ping": False,
+        "async_pool": {"pool_size": 1, "max_overflow": 0},
+    },
+    # Behind a transaction-mode pooler (PgBouncer, RDS Proxy): no local pool,
+    # every checkout opens a connection to the pooler
+    "external": {
+        "poolclass": "null",
+        "pool_pre_ping": False,
+    },
+    # Celery workers running batch scoring, compaction and wipes: long
+    # transactions, so more connections and a longer checkout wait
+    "worker": {
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 120,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "async_pool": {"pool_size": 1, "max_overflow": 0},
+    },
+    # Scheduler process (APScheduler / Celery Beat): one job at a time
+    "scheduler": {
+        "pool_size": 2,
+        "max_overflow": 2,
+        "pool_timeout": 60,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "async_pool": {"pool_size": 1, "max_overflow": 0},
+    },
+}
+
+DB_POOL_PROFILE = os.getenv(
+    "DB_POOL_PROFILE", "lambda" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "api"
+).lower()
+
+_POOL_OVERRIDES = {
+    "pool_size": ("DB_POOL_SIZE", int),
+    "max_overflow": ("DB_MAX_OVERFLOW", int),
+    "pool_timeout": ("DB_POOL_TIMEOUT", int),
+    "pool_recycle": ("DB_POOL_RECYCLE", int),
+    "pool_pre_ping": ("DB_POOL_PRE_PING", lambda value: value.lower() == "true"),
+}
+# Async engine sizes (the other overrides above apply to both engines)
+_ASYNC_POOL_OVERRIDES = {
+    "pool_size": ("DB_ASYNC_POOL_SIZE", int),
+    "max_overflow": ("DB_ASYNC_MAX_OVERFLOW", int),
+}
+
+
+class PoolMetrics:
+    """Checkout wait time, overflow and invalidation counters for one engine"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_wait_total = 0.0
+            self.checkout_wait_max = 0.0
+            self.checkout_timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.soft_invalidations = 0
+            self.peak_checked_out = 0
+            self.peak_overflow = 0
+
+    def record_checkout(self, wait_seconds: float, pool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_total += wait_seconds
+            self.checkout_wait_max = max(self.checkout_wait_max, wait_seconds)
+            if isinstance(pool, QueuePool):
+                self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+                self.peak_overflow = max(self.peak_overflow, pool.overflow())
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self, soft: bool = False) -> None:
+        with self._lock:
+            if soft:
+                self.soft_invalidations += 1
+            else:
+                self.invalidations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_wait_ms_avg": round(self.checkout_wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "checkout_wait_ms_max": round(self.checkout_wait_max * 1000, 3),
+                "checkout_timeouts": self.checkout_timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+            }
+
+
+class _TimedCheckout:
+    """Pool mixin: times getting a connection (queue wait or new connect)"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started, self)
+        return record
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
 
-# Create engine with production-ready settings
-engine = create_engine(
+
+class MeteredQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class MeteredNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+class MeteredAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_settings(profile: str = DB_POOL_PROFILE, async_: bool = False) -> Dict[str, Any]:
+    """create_engine() / create_async_engine() pool keyword arguments for a profile, with env overrides"""
+    if profile not in POOL_PROFILES:
+        raise ValueError(f"Unknown DB_POOL_PROFILE: {profile} (expected one of {', '.join(POOL_PROFILES)})")
+    settings = dict(POOL_PROFILES[profile])
+    null_pool = settings.pop("poolclass", None) == "null"
+    async_sizes = settings.pop("async_pool", {})
+    overrides = dict(_POOL_OVERRIDES)
+    if async_:
+        settings.update(async_sizes)
+        overrides.update(_ASYNC_POOL_OVERRIDES)
+    for key, (env_name, parse) in overrides.items():
+        value = os.getenv(env_name)
+        if value is None or (null_pool and key != "pool_pre_ping"):
+            continue  # NullPool takes no size / timeout / recycle settings
+        settings[key] = parse(value)
+    if null_pool:
+        settings["poolclass"] = MeteredNullPool
+    else:
+        settings["poolclass"] = MeteredAsyncQueuePool if async_ else MeteredQueuePool
+    return settings
+
+
+def create_metered_engine(url: str, profile: str = DB_POOL_PROFILE, async_: bool = False, **kwargs):
+    """
+    Engine with the profile's pool and PoolMetrics attached (engine.pool.metrics,
+    or engine.sync_engine.pool.metrics for an AsyncEngine).
+    """
+    if async_:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        if profile == "external":
+            # Transaction-mode poolers cannot keep prepared statements across transactions
+            url = make_url(url).update_query_dict({"prepared_statement_cache_size": "0"})
+        engine = create_async_engine(url, **pool_settings(profile, async_=True), **kwargs)
+        sync_engine = engine.sync_engine
+    else:
+        engine = sync_engine = create_engine(url, **pool_settings(profile), **kwargs)
+
+    metrics = PoolMetrics()
+    sync_engine.pool.metrics = metrics
+    sync_engine.pool_profile = profile
+
+    event.listen(sync_engine.pool, "connect", lambda dbapi_connection, record: metrics.record_connect())
+    event.listen(
+        sync_engine.pool, "invalidate", lambda dbapi_connection, record, exception: metrics.record_invalidation()
+    )
+    event.listen(
+        sync_engine.pool, "soft_invalidate",
+        lambda dbapi_connection, record, exception: metrics.record_invalidation(soft=True)
+    )
+    return engine
+
+
+def pool_status(engine_to_check=None) -> Dict[str, Any]:
+    """Current pool state plus cumulative metrics (health endpoint)"""
+    engine_to_check = getattr(engine_to_check, "sync_engine", engine_to_check) or engine
+    pool = engine_to_check.pool
+    status = {
+        "profile": getattr(engine_to_check, "pool_profile", None),
+        "pool_class": type(pool).__name__,
+    }
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
+
+
+# Create engine with the pool profile of this process
+engine = create_metered_engine(
     DATABASE_URL,
     echo=False,  # Disable SQL query logging for production
-    pool_pre_ping=True,  # Verify connections before using them
-    pool_size=10,  # Connection pool size
-    max_overflow=20,  # Max overflow connections
-    pool_recycle=3600  # Recycle connections after 1 hour
 )
 
 # Create session factory
@@ -35,4 +292,215 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ================================
+# READ REPLICA
+# ================================
+
+# Replica DSN for read-only work (get_read_db / read_session). Unset: all reads
+# use the primary. Locally it can point at a second instance or the primary.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+# A replica further behind than this is skipped and reads go to the primary
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+# How long one lag measurement is reused before the replica is asked again
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5"))
+# Request header pinning a request's reads to the primary (read-your-writes),
+# e.g. sent by the client right after it saved progress
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+# Seconds since the last replayed transaction; 0 on a primary and on a replica
+# that has replayed everything it received (an idle primary sends nothing new).
+# NULL (treated as unreachable) when the replica is not streaming from the
+# primary: a disconnected replica has replayed all it received too, yet falls
+# further behind. Reading pg_stat_wal_receiver.status needs pg_read_all_stats
+# for the replica user; without it the replica is never used.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def _reject_read_only_flush(session, flush_context, instances) -> None:
+    if session.info.get("read_only"):
+        raise RuntimeError("Write attempted on a read-only session (use get_db for writes)")
+
+
+event.listen(Session, "before_flush", _reject_read_only_flush)
+
+
+class ReplicaRouter:
+    """
+    Hands out read-only sessions: on the replica while its lag is within
+    max_lag_seconds, otherwise (lag too high, replica unreachable, not
+    configured or read-your-writes requested) on the primary.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = DATABASE_REPLICA_URL,
+        primary_sessions: sessionmaker = SessionLocal,
+        max_lag_seconds: float = REPLICA_MAX_LAG_SECONDS,
+        check_interval_seconds: float = REPLICA_LAG_CHECK_SECONDS
+    ):
+        self.url = url
+        self.primary_sessions = primary_sessions
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.engine = None
+        self._replica_sessions = None
+        self._lock = threading.Lock()
+        self._lag: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self.reads = {"replica": 0, "primary": 0}
+        self.fallbacks = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.url)
+
+    def _sessions(self) -> sessionmaker:
+        with self._lock:
+            if self._replica_sessions is None:
+                self.engine = create_metered_engine(self.url, echo=False)
+                self._replica_sessions = sessionmaker(
+                    autocommit=False, autoflush=False, bind=self.engine, info={"read_only": True}
+                )
+            return self._replica_sessions
+
+    def _measure_lag(self) -> Optional[float]:
+        self._sessions()
+        try:
+            with self.engine.connect() as conn:
+                lag = conn.execute(REPLICA_LAG_SQL).scalar()
+        except Exception as e:
+            logger.warning(f"Replica lag check failed, reading from primary: {e}")
+            return None
+        if lag is None:
+            logger.warning("Replica is not streaming from the primary, reading from primary")
+            return None
+        return float(lag)
+
+    def replica_lag(self) -> Optional[float]:
+        """Cached lag in seconds; None when the replica could not be reached"""
+        now = time.monotonic()
+        with self._lock:
+            due = self._checked_at is None or now - self._checked_at >= self.check_interval_seconds
+            if due:
+                # Claim the check; concurrent callers keep using the previous value
+                self._checked_at = now
+        if due:
+            lag = self._measure_lag()
+            with self._lock:
+                self._lag = lag
+        return self._lag
+
+    def use_replica(self) -> bool:
+        if not self.configured:
+            return False
+        lag = self.replica_lag()
+        return lag is not None and lag <= self.max_lag_seconds
+
+    def session(self, read_your_writes: bool = False) -> Session:
+        """New read-only session; flushing it raises"""
+        if not read_your_writes and self.use_replica():
+            target = "replica"
+            db = self._sessions()()
+        else:
+            target = "primary"
+            db = self.primary_sessions(info={"read_only": True})
+        with self._lock:
+            self.reads[target] += 1
+            if target == "primary" and self.configured and not read_your_writes:
+                self.fallbacks += 1
+        return db
+
+    def status(self) -> Dict[str, Any]:
+        """Replica routing state for the health endpoint"""
+        with self._lock:
+            status = {
+                "configured": self.configured,
+                "lag_seconds": self._lag,
+                "max_lag_seconds": self.max_lag_seconds,
+                "reads": dict(self.reads),
+                "fallbacks": self.fallbacks,
+            }
+        if self.engine is not None:
+            status["pool"] = pool_status(self.engine)
+        return status
+
+
+# Global router (one per process)
+replica_router = ReplicaRouter()
+
+
+def _wants_read_your_writes(request: Request) -> bool:
+    return request.headers.get(READ_YOUR_WRITES_HEADER, "").lower() in ("1", "true", "yes")
+
+
+# Dependency for read-only endpoints (replica when fresh enough, else primary)
+def get_read_db(request: Request):
+    db = replica_router.session(read_your_writes=_wants_read_your_writes(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def read_session(read_your_writes: bool = False) -> Iterator[Session]:
+    """Read-only session outside a request (streams, scheduler, scripts)"""
+    db = replica_router.session(read_your_writes=read_your_writes)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ================================
+# ASYNC ENGINE
+# ================================
+
+# Created on first use, so processes that never serve an async endpoint
+# (workers, scripts, Lambda functions without them) do not load asyncpg
+_async_engine = None
+_async_session_factory = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine():
+    """AsyncEngine (asyncpg) with this process's pool profile"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker
+
+                _async_engine = create_metered_engine(ASYNC_DATABASE_URL, async_=True, echo=False)
+                _async_session_factory = async_sessionmaker(
+                    _async_engine, autoflush=False, expire_on_commit=False
+                )
+    return _async_engine
+
+
+def async_pool_status() -> Optional[Dict[str, Any]]:
+    """pool_status() of the async engine, None until it is created"""
+    return pool_status(_async_engine) if _async_engine is not None else None
+
+
+# Dependency to get an async database session (async def endpoints)
+async def get_async_db():
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's connections (application shutdown)"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
@@ -18,9 +18,11 @@ from sqlalchemy import (
     text,
     Enum,
     Float,
+    Index,
+    Computed,
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column, declarative_base
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID, INET
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, INET, TSVECTOR
 
 Base = declarative_base()
 
@@ -141,6 +143,9 @@ class User(Base):
     lead_score_history: Mapped[List["LeadScoreHistory"]] = relationship(
         back_populates="user", cascade="all, delete-orphan"
     )
+    stats: Mapped[Optional["UserStats"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan", uselist=False
+    )
 
     def __str__(self):
         return f"{self.email} ({self.first_name} {self.last_name})"
@@ -650,7 +655,9 @@ class UserQuizAttempt(Base):
     id: Mapped[UUID] = mapped_column(
         PG_UUID(as_uuid=True), primary_key=True, default=text("uuid_generate_v4()")
     )
-    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), index=True
+    )
     lesson_id: Mapped[UUID] = mapped_column(
         ForeignKey("lessons.id", ondelete="CASCADE")
     )
@@ -710,7 +717,9 @@ class UserModuleQuizAttempt(Base):
     id: Mapped[UUID] = mapped_column(
         PG_UUID(as_uuid=True), primary_key=True, default=text("uuid_generate_v4()")
     )
-    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), index=True
+    )
     module_id: Mapped[UUID] = mapped_column(ForeignKey("modules.id", ondelete="CASCADE"))
     
     attempt_number: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -765,6 +774,51 @@ class UserCouponRedemption(Base):
     coupon: Mapped["RewardCoupon"] = relationship(back_populates="user_redemptions")
 
 
+class UserStats(Base):
+    """
+    Per-user dashboard summary, maintained by the progress/coin/badge/quiz writers
+    so the dashboard statistics and activity endpoints are a single row read.
+    Can always be reconstructed from the raw tables (StatsManager.rebuild_user_stats).
+    """
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    # Mirrored coin balance
+    coins_current: Mapped[int] = mapped_column(Integer, default=0)
+    coins_lifetime_earned: Mapped[int] = mapped_column(Integer, default=0)
+    coins_lifetime_spent: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Learning
+    badges_earned: Mapped[int] = mapped_column(Integer, default=0)
+    lessons_completed: Mapped[int] = mapped_column(Integer, default=0)
+    modules_completed: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Quizzes (average = quiz_score_total / quizzes_taken)
+    quizzes_taken: Mapped[int] = mapped_column(Integer, default=0)
+    quizzes_passed: Mapped[int] = mapped_column(Integer, default=0)
+    quiz_score_total: Mapped[Decimal] = mapped_column(DECIMAL(12, 2), default=0)
+
+    # {"YYYY-MM-DD": {"lessons": n, "coins_earned": n}} for the last 31 days
+    daily_activity: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Most recent lesson/badge/coin activity items (max 5 per type)
+    recent_activity: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)
+
+    rebuilt_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        default=datetime.datetime.now,
+        onupdate=datetime.datetime.now,
+    )
+
+    # Relationships
+    user: Mapped["User"] = relationship(back_populates="stats")
+
+
 # ================================
 # CALCULATORS & TOOLS
 # ================================
@@ -798,6 +852,12 @@ class CalculatorUsage(Base):
 
 class UserLeadScore(Base):
     __tablename__ = "user_lead_scores"
+    __table_args__ = (
+        # Keyset pagination / export order for /analytics/leads
+        Index("ix_user_lead_scores_composite_score_user_id", "composite_score", "user_id"),
+        # max(last_calculated_at): freshness marker of the admin dashboard cache
+        Index("ix_user_lead_scores_last_calculated_at", "last_calculated_at"),
+    )
 
     user_id: Mapped[UUID] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
@@ -931,6 +991,24 @@ class UserActivityLog(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id_is_read", "user_id", "is_read"),
+        # Notification list and recent summary, newest first
+        Index("ix_notifications_user_id_created_at", "user_id", text("created_at DESC")),
+        # Unread list (unread_only=true), newest first
+        Index(
+            "ix_notifications_user_unread_created_at",
+            "user_id", text("created_at DESC"),
+            postgresql_where=text("is_read = false"),
+        ),
+        # One notification per user per broadcast (fan-out is idempotent)
+        Index(
+            "ux_notifications_broadcast_id_user_id",
+            "broadcast_id", "user_id",
+            unique=True,
+            postgresql_where=text("broadcast_id IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(
         PG_UUID(as_uuid=True), primary_key=True, default=text("uuid_generate_v4()")
@@ -944,6 +1022,9 @@ class Notification(Base):
     expires_at: Mapped[Optional[datetime.datetime]] = mapped_column(
         TIMESTAMP(timezone=True), nullable=True
     )
+    broadcast_id: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey("notification_broadcasts.id", ondelete="SET NULL"), nullable=True
+    )
     created_at: Mapped[datetime.datetime] = mapped_column(
         TIMESTAMP(timezone=True), default=datetime.datetime.now
     )
@@ -952,13 +1033,158 @@ class Notification(Base):
     user: Mapped["User"] = relationship(back_populates="notifications")
 
 
+class NotificationBroadcast(Base):
+    """
+    Admin announcement fanned out to a user segment with set-based inserts,
+    one users.id keyset chunk per transaction. last_user_id records progress so
+    re-submitting the same broadcast id resumes instead of duplicating.
+    """
+    __tablename__ = "notification_broadcasts"
+
+    id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), primary_key=True, default=text("uuid_generate_v4()")
+    )
+    notification_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    priority: Mapped[str] = mapped_column(String(20), default="normal")
+    expires_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+    segment: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, running, completed, failed
+    total_recipients: Mapped[int] = mapped_column(Integer, default=0)
+    processed_users: Mapped[int] = mapped_column(Integer, default=0)
+    delivered_count: Mapped[int] = mapped_column(Integer, default=0)
+    last_user_id: Mapped[Optional[UUID]] = mapped_column(PG_UUID(as_uuid=True), nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_by: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.datetime.now
+    )
+    started_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+    completed_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+
+
+class UserNotificationCounter(Base):
+    """
+    Per-user unread notification count, maintained by NotificationManager so the
+    unread-count poll is a primary key read. next_expiry_at is the earliest
+    expires_at among the counted notifications; once it passes the counter is
+    recounted on the next read. Can always be rebuilt from notifications.
+    """
+    __tablename__ = "user_notification_counters"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    unread_count: Mapped[int] = mapped_column(Integer, default=0)
+    next_expiry_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        default=datetime.datetime.now,
+        onupdate=datetime.datetime.now,
+    )
+
+
+class HubSpotOutbox(Base):
+    """
+    Pending HubSpot contact syncs, written in the same transaction as the change
+    that triggered them and drained in batches by the scheduler.
+    """
+    __tablename__ = "hubspot_outbox"
+    __table_args__ = (
+        Index("ix_hubspot_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), primary_key=True, default=text("uuid_generate_v4()")
+    )
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    email: Mapped[str] = mapped_column(String(255), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(50), nullable=False)  # register, onboarding_complete
+    properties: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, sent, failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.datetime.now
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.datetime.now
+    )
+    sent_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+
+
+class UserDataWipe(Base):
+    """
+    Background reset of a user's progress and activity (POST /auth/wipe-data).
+    UserDataWipeManager clears one table at a time in bounded batches;
+    current_step records progress so an interrupted wipe resumes where it stopped.
+    """
+    __tablename__ = "user_data_wipes"
+    __table_args__ = (
+        # At most one active wipe per user
+        Index(
+            "ux_user_data_wipes_user_id_active",
+            "user_id",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+
+    id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), primary_key=True, default=text("uuid_generate_v4()")
+    )
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, running, completed, failed
+    current_step: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    rows_deleted: Mapped[int] = mapped_column(Integer, default=0)
+    rows_detached: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.datetime.now
+    )
+    started_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        default=datetime.datetime.now,
+        onupdate=datetime.datetime.now,
+    )
+    completed_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+
+
 # ================================
 # HELP & SUPPORT SYSTEM
 # ================================
 
 
+# Weighted search document for FAQ search: question matches rank above answer matches
+FAQ_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(question, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(answer, '')), 'B')"
+)
+
+
 class FAQ(Base):
     __tablename__ = "faqs"
+    __table_args__ = (
+        Index("ix_faqs_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[UUID] = mapped_column(
         PG_UUID(as_uuid=True), primary_key=True, default=text("uuid_generate_v4()")
@@ -969,6 +1195,10 @@ class FAQ(Base):
     order_index: Mapped[int] = mapped_column(Integer, default=0)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     view_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Maintained by PostgreSQL (generated column), never written by the app
+    search_vector = mapped_column(
+        TSVECTOR, Computed(FAQ_SEARCH_VECTOR_SQL, persisted=True), nullable=True, deferred=True
+    )
     created_at: Mapped[datetime.datetime] = mapped_column(
         TIMESTAMP(timezone=True), default=datetime.datetime.now
     )
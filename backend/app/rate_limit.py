@@ -0,0 +1,120 @@
+"""
+Shared rate limiter.
+
+One slowapi Limiter for the whole API (app.state.limiter and every router):
+
+- Key: the user id from a valid Bearer access token ("user:<id>"), falling
+  back to the client address ("ip:<addr>") for anonymous requests, so users
+  behind one NAT / load balancer no longer share a bucket.
+- Storage: RATE_LIMIT_STORAGE_URI ("memory://" by default and in tests,
+  "redis://host:6379/1" in production so all workers share counters). If Redis
+  is unreachable the limiter falls back to per-process memory.
+- Strategy: RATE_LIMIT_STRATEGY, "moving-window" by default: a request is
+  allowed while fewer than N were accepted in the trailing period, so bursts
+  are capped at N and capacity returns as old requests age out.
+- Per-route limits: ROUTE_LIMITS, each overridable with RATE_LIMIT_<NAME>
+  (e.g. RATE_LIMIT_MINIGAME_SUBMIT=20/minute).
+- Metrics: hits and rejections per route via limiter.metrics().
+"""
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+
+from jose import JWTError, jwt
+from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+from starlette.requests import Request
+
+from auth import SECRET_KEY, ALGORITHM
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "moving-window")
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+# Route name -> default limit (slowapi / limits notation)
+ROUTE_LIMITS = {
+    "learning_milestone": "30/minute",
+    "learning_progress_batch": "20/minute",
+    "minigame_submit": "10/minute",
+    "grow_your_nest_submit": "10/minute",
+}
+
+
+def route_limit(name: str) -> str:
+    """Limit for a route: RATE_LIMIT_<NAME> if set, else the ROUTE_LIMITS default"""
+    return os.getenv(f"RATE_LIMIT_{name.upper()}", ROUTE_LIMITS[name])
+
+
+def rate_limit_key(request: Request) -> str:
+    """Authenticated user id, or the client address for anonymous requests"""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            if payload.get("token_type") == "access" and payload.get("sub"):
+                return f"user:{payload['sub']}"
+        except JWTError:
+            pass
+    return f"ip:{get_remote_address(request)}"
+
+
+class MeteredLimiter(Limiter):
+    """slowapi Limiter that counts checked and rejected requests per route"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._rejections: Dict[str, int] = defaultdict(int)
+
+    def _check_request_limit(
+        self,
+        request: Request,
+        endpoint_func: Optional[Callable[..., Any]],
+        in_middleware: bool = True,
+    ) -> None:
+        route = endpoint_func.__name__ if endpoint_func else request["path"]
+        try:
+            super()._check_request_limit(request, endpoint_func, in_middleware)
+        except RateLimitExceeded:
+            with self._metrics_lock:
+                self._hits[route] += 1
+                self._rejections[route] += 1
+            raise
+        with self._metrics_lock:
+            self._hits[route] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            routes = {
+                route: {"hits": hits, "rejected": self._rejections.get(route, 0)}
+                for route, hits in sorted(self._hits.items())
+            }
+        return {
+            "enabled": self.enabled,
+            "storage": RATE_LIMIT_STORAGE_URI.split("://", 1)[0],
+            "strategy": RATE_LIMIT_STRATEGY,
+            "limits": {name: route_limit(name) for name in ROUTE_LIMITS},
+            "routes": routes,
+        }
+
+    def reset_metrics(self) -> None:
+        with self._metrics_lock:
+            self._hits.clear()
+            self._rejections.clear()
+
+
+# Global limiter shared by app.py and the routers
+limiter = MeteredLimiter(
+    key_func=rate_limit_key,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+    in_memory_fallback_enabled=not RATE_LIMIT_STORAGE_URI.startswith("memory://"),
+    enabled=RATE_LIMIT_ENABLED,
+)
@@ -0,0 +1,78 @@
+"""
+Fast JSON responses.
+
+- FastJSONResponse renders with orjson instead of the stdlib json module. It
+  is the app's default_response_class, so every route that returns a dict or
+  a response_model gets it without changes. Decimal (used for scores and
+  percentages) is encoded as a float, as jsonable_encoder does.
+- json_model_response() is the direct path for large response_model payloads.
+  It serializes the value straight to JSON bytes with pydantic-core
+  (TypeAdapter.dump_json). That skips FastAPI's validate -> dict -> encode
+  round trip. Routes that use it keep response_model for the OpenAPI schema.
+
+JSON_RESPONSE_BACKEND=json switches the default back to the stdlib
+JSONResponse. See scripts/benchmark_serialization.py for timings.
+"""
+import os
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Optional, Type
+
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import TypeAdapter
+
+JSON_RESPONSE_BACKEND = os.getenv("JSON_RESPONSE_BACKEND", "orjson").lower()
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _orjson_default(value: Any) -> Any:
+    """Types orjson does not encode natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also encodes Decimal and sets"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def default_response_class() -> Type[JSONResponse]:
+    """Response class for FastAPI(default_response_class=...)"""
+    return JSONResponse if JSON_RESPONSE_BACKEND == "json" else FastJSONResponse
+
+
+@lru_cache(maxsize=None)
+def _adapter(model_type: Any) -> TypeAdapter:
+    return TypeAdapter(model_type)
+
+
+def json_model_response(
+    content: Any,
+    model_type: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Serialize content as model_type (a model or e.g. List[Model]) directly to
+    JSON bytes. Model instances are not re-validated; ORM objects and dicts are
+    validated first (from_attributes).
+    """
+    adapter = _adapter(model_type)
+    value = adapter.validate_python(content, from_attributes=True)
+    return Response(
+        content=adapter.dump_json(value),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
@@ -10,25 +10,30 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc, func
 
-from database import get_db
+from database import get_db, get_read_db, read_session
+from responses import json_model_response
 from auth import get_current_user, get_current_admin_user
 from models import (
     User, UserLeadScore, LeadScoreHistory, UserOnboarding,
-    UserLessonProgress, UserModuleProgress, UserBadge, UserCoinBalance,
-    LeadTemperature, IntentBand
+    UserLessonProgress, UserModuleProgress, UserBadge, UserCoinBalance
 )
 from schemas import (
     LeadScoreResponse, LeadSummary, LeadDetailResponse,
     LeadScoreHistoryResponse, AnalyticsInsightsResponse,
     UserProgressResponse, RecalculationRequest, RecalculationResponse,
-    SuccessResponse
+    SuccessResponse, WeightSimulationRequest
 )
 from analytics.scoring_engine import ScoringEngine, BatchScoringEngine
 from analytics.classifier import LeadClassifier, BulkClassifier
 from analytics.admin_dashboard import AnalyticsDashboard
+from analytics.lead_export import (
+    InvalidLeadCursor, fetch_lead_page, fetch_lead_offset_page, lead_row_to_dict,
+    iter_lead_rows, iter_csv_export, iter_ndjson_export
+)
 
 router = APIRouter()
 
@@ -116,116 +121,108 @@ def get_my_progress(
 @router.get("/leads", response_model=List[LeadSummary])
 def get_all_leads(
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     temperature: Optional[str] = Query(None, description="Filter by temperature (hot_lead, warm_lead, cold_lead, dormant)"),
     intent: Optional[str] = Query(None, description="Filter by intent (very_high_intent, high_intent, medium_intent, low_intent)"),
     min_score: Optional[float] = Query(None, ge=0, le=1000, description="Minimum composite score"),
     max_score: Optional[float] = Query(None, ge=0, le=1000, description="Maximum composite score"),
     min_completion: Optional[float] = Query(None, ge=0, le=100, description="Minimum profile completion %"),
     limit: int = Query(50, ge=1, le=500),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page")
 ):
     """
-    Get all leads with filtering options.
+    Get all leads with filtering options, ordered by composite score.
     Admin only.
-    """
-    # Build query
-    query = db.query(User, UserLeadScore).outerjoin(
-        UserLeadScore, User.id == UserLeadScore.user_id
-    )
-    
-    # Apply filters
-    if temperature:
-        query = query.filter(UserLeadScore.lead_temperature == temperature)
-    
-    if intent:
-        query = query.filter(UserLeadScore.intent_band == intent)
-    
-    if min_score is not None:
-        query = query.filter(UserLeadScore.composite_score >= min_score)
     
-    if max_score is not None:
-        query = query.filter(UserLeadScore.composite_score <= max_score)
-    
-    if min_completion is not None:
-        query = query.filter(UserLeadScore.profile_completion_pct >= min_completion)
-    
-    # Order by composite score descending
-    query = query.order_by(desc(UserLeadScore.composite_score))
+    Pagination is keyset-based: pass the X-Next-Cursor response header back as
+    `cursor` to fetch the next page (header absent on the last page).
+    """
+    filters = {
+        "temperature": temperature,
+        "intent": intent,
+        "min_score": min_score,
+        "max_score": max_score,
+        "min_completion": min_completion,
+    }
     
-    # Paginate
-    results = query.offset(offset).limit(limit).all()
+    headers = {}
+    if offset and not cursor:
+        results = fetch_lead_offset_page(db, filters, limit, offset)
+    else:
+        try:
+            results, next_cursor = fetch_lead_page(db, filters, limit, cursor)
+        except InvalidLeadCursor as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+    
+    return json_model_response(
+        [LeadSummary(**lead_row_to_dict(user, lead_score)) for user, lead_score in results],
+        List[LeadSummary],
+        headers=headers
+    )
+
+
+@router.get("/leads/export")
+def export_leads(
+    current_user: User = Depends(get_current_admin_user),
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    temperature: Optional[str] = Query(None),
+    intent: Optional[str] = Query(None),
+    min_score: Optional[float] = Query(None, ge=0, le=1000),
+    max_score: Optional[float] = Query(None, ge=0, le=1000),
+    min_completion: Optional[float] = Query(None, ge=0, le=100)
+):
+    """
+    Stream every matching lead as CSV or NDJSON in list order.
+    Rows are read from a server-side cursor, so memory stays constant.
+    Admin only.
+    """
+    filters = {
+        "temperature": temperature,
+        "intent": intent,
+        "min_score": min_score,
+        "max_score": max_score,
+        "min_completion": min_completion,
+    }
     
-    # Format response
-    leads = []
-    for user, lead_score in results:
-        if lead_score:
-            # Get temperature and intent labels
-            classification = {
-                "temperature": lead_score.lead_temperature,
-                "intent_band": lead_score.intent_band
-            }
-            temp_label = LeadClassifier._get_temperature_label(
-                LeadTemperature(lead_score.lead_temperature)
-            ) if lead_score.lead_temperature else None
-            intent_label = LeadClassifier._get_intent_label(
-                IntentBand(lead_score.intent_band)
-            ) if lead_score.intent_band else None
-            
-            leads.append(LeadSummary(
-                user_id=user.id,
-                email=user.email,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                composite_score=float(lead_score.composite_score),
-                lead_temperature=lead_score.lead_temperature,
-                temperature_label=temp_label,
-                intent_band=lead_score.intent_band,
-                intent_label=intent_label,
-                profile_completion_pct=float(lead_score.profile_completion_pct),
-                last_activity_at=lead_score.last_activity_at,
-                created_at=user.created_at
-            ))
-        else:
-            # User with no score yet
-            leads.append(LeadSummary(
-                user_id=user.id,
-                email=user.email,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                composite_score=0.0,
-                lead_temperature=None,
-                temperature_label=None,
-                intent_band=None,
-                intent_label=None,
-                profile_completion_pct=0.0,
-                last_activity_at=None,
-                created_at=user.created_at
-            ))
-    
-    return leads
+    def generate():
+        # Own session: it must outlive the request dependency while the body streams
+        with read_session() as db:
+            rows = iter_lead_rows(db, filters)
+            if format == "ndjson":
+                yield from iter_ndjson_export(rows)
+            else:
+                yield from iter_csv_export(rows)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=leads_{timestamp}.{format}"}
+    )
 
 
 @router.get("/leads/hot", response_model=List[LeadSummary])
 def get_hot_leads(
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = Query(20, ge=1, le=100)
 ):
     """
     Quick access to hot leads (score >= 800).
     Admin only.
     """
-    return get_all_leads(
-        current_user=current_user,
-        db=db,
-        temperature="hot_lead",
-        intent=None,
-        min_score=None,
-        max_score=None,
-        min_completion=None,
-        limit=limit,
-        offset=0
+    results, _ = fetch_lead_page(db, {"temperature": "hot_lead"}, limit)
+    return json_model_response(
+        [LeadSummary(**lead_row_to_dict(user, lead_score)) for user, lead_score in results],
+        List[LeadSummary]
     )
 
 
@@ -334,7 +331,7 @@ def get_lead_detail(
 def get_lead_history(
     user_id: UUID,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = Query(30, ge=1, le=365)
 ):
     """
@@ -360,16 +357,16 @@ def get_lead_history(
 @router.get("/insights", response_model=AnalyticsInsightsResponse)
 def get_analytics_insights(
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get aggregate analytics insights across all leads.
     Admin only.
     """
-    # Get all lead scores
-    lead_scores = db.query(UserLeadScore).all()
+    aggregates = AnalyticsDashboard.get_lead_aggregates(db)
+    total = aggregates["total"]
     
-    if not lead_scores:
+    if not total:
         return AnalyticsInsightsResponse(
             total_leads=0,
             temperature_distribution={},
@@ -380,26 +377,12 @@ def get_analytics_insights(
             actionable_leads=0
         )
     
-    # Calculate distributions
-    temp_counts = {}
-    intent_counts = {}
-    total_score = 0.0
-    total_completion = 0.0
-    
-    for score in lead_scores:
-        # Temperature
-        temp = score.lead_temperature or "unknown"
-        temp_counts[temp] = temp_counts.get(temp, 0) + 1
-        
-        # Intent
-        intent = score.intent_band or "unknown"
-        intent_counts[intent] = intent_counts.get(intent, 0) + 1
-        
-        # Averages
-        total_score += float(score.composite_score)
-        total_completion += float(score.profile_completion_pct)
-    
-    total = len(lead_scores)
+    temp_counts = {
+        (temp or "unknown"): count for temp, count in aggregates["temperature_counts"].items()
+    }
+    intent_counts = {
+        (intent or "unknown"): count for intent, count in aggregates["intent_counts"].items()
+    }
     
     # Format distributions
     temp_distribution = {
@@ -426,8 +409,8 @@ def get_analytics_insights(
         total_leads=total,
         temperature_distribution=temp_distribution,
         intent_distribution=intent_distribution,
-        average_composite_score=round(total_score / total, 2),
-        average_profile_completion=round(total_completion / total, 2),
+        average_composite_score=round(aggregates["score_sum"] / total, 2),
+        average_profile_completion=round(aggregates["completion_sum"] / total, 2),
         high_priority_leads=high_priority,
         actionable_leads=actionable
     )
@@ -436,14 +419,18 @@ def get_analytics_insights(
 @router.get("/dashboard")
 def get_analytics_dashboard(
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db),
+    refresh: bool = Query(False, description="Bypass the cached payload and recompute")
 ):
     """
     Get comprehensive analytics dashboard data.
     Includes distributions, top leads, recent events, and engagement metrics.
+    Served from a per-process cache: rebuilt once lead scores are recalculated
+    (by any process), otherwise after ANALYTICS_DASHBOARD_CACHE_TTL seconds, so
+    activity figures may lag by up to that TTL. ?refresh=true recomputes.
     Admin only.
     """
-    return AnalyticsDashboard.get_dashboard_data(db)
+    return AnalyticsDashboard.get_dashboard_data(db, use_cache=not refresh)
 
 
 @router.post("/recalculate", response_model=RecalculationResponse)
@@ -479,6 +466,8 @@ def recalculate_scores(
     successful = sum(1 for r in results.values() if "error" not in r)
     failed = total_users - successful
     
+    AnalyticsDashboard.invalidate_cache()
+    
     execution_time = time.time() - start_time
     
     return RecalculationResponse(
@@ -527,6 +516,41 @@ def calculate_user_score(
     )
 
 
+@router.post("/simulate-weights")
+def simulate_weights(
+    request: WeightSimulationRequest,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    What-if re-scoring of the whole population with candidate weights.
+    Admin only.
+    
+    Re-scores the signal values saved by the last batch run in memory (no
+    database access) and returns the current vs candidate temperature/intent
+    distributions and the users whose band would change.
+    """
+    from analytics.reweighting_simulator import ReweightingSimulator
+    from analytics.signal_store import SignalStoreNotFound
+    
+    try:
+        return ReweightingSimulator.simulate(
+            signal_weights=request.signal_weights,
+            dimension_weights=request.dimension_weights,
+            temperature_thresholds=request.temperature_thresholds,
+            changed_users_limit=request.changed_users_limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except SignalStoreNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No stored signals yet; run a batch recalculation first"
+        )
+
+
 # =======================================
 # SCHEDULER MANAGEMENT ENDPOINTS
 # =======================================
@@ -597,10 +621,13 @@ def get_scheduler_status(
     current_user: User = Depends(get_current_admin_user)
 ):
     """
-    Get scheduler status and configuration.
+    Get scheduler status and configuration, plus email dispatch queue and
+    rate limiter metrics.
     Admin only.
     """
     from analytics.scheduler import CELERY_AVAILABLE, apscheduler_manager
+    from services.email_dispatch import email_dispatcher
+    from rate_limit import limiter
     import os
     
     scheduler_type = "celery" if os.getenv("USE_APSCHEDULER", "true").lower() != "true" else "apscheduler"
@@ -610,7 +637,9 @@ def get_scheduler_status(
         "celery_available": CELERY_AVAILABLE,
         "apscheduler_initialized": apscheduler_manager.initialized,
         "apscheduler_running": apscheduler_manager.scheduler.running if apscheduler_manager.scheduler else False,
-        "scheduled_jobs": []
+        "scheduled_jobs": [],
+        "email_dispatch": email_dispatcher.metrics(),
+        "rate_limits": limiter.metrics()
     }
     
     # Get scheduled jobs info
@@ -1,33 +1,27 @@
+import logging
 import os
 from datetime import datetime, date, timedelta, timezone
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy import and_
 
-from database import get_db
+from database import get_db, SessionLocal
 from auth import AuthManager, create_tokens_for_user, refresh_access_token, get_current_user
-from models import (
-    User, UserCoinBalance, PendingEmailVerification,
-    # Wipe-data imports
-    UserLessonProgress, UserModuleProgress,
-    UserQuizAttempt, UserQuizAnswer, UserModuleQuizAttempt,
-    UserCoinTransaction, UserBadge, UserCouponRedemption,
-    UserOnboarding, Notification,
-    UserBehaviorEvent, LeadScoreHistory, UserLeadScore,
-    UserActivityLog, CalculatorUsage, MaterialDownload, SupportTicket,
-)
+from models import User, UserCoinBalance, PendingEmailVerification, UserDataWipe
 from schemas import (
     UserRegistration, UserLogin, UserResponse, TokenResponse,
     PasswordReset, PasswordResetConfirm, ProfileUpdate, SuccessResponse,
-    SendVerificationCodeRequest, VerifyEmailRequest,
+    SendVerificationCodeRequest, VerifyEmailRequest, UserDataWipeResponse,
 )
-from utils import NotificationManager
-from services.email import send_verification_email, send_password_reset_email
-from services.hubspot import sync_contact_on_register
+from utils import NotificationManager, UserDataWipeManager
+from services.email_dispatch import queue_verification_email, queue_password_reset_email
+from services.hubspot import queue_contact_on_register
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # How long after verify-email-code the user can complete register
 VERIFIED_EMAIL_VALID_MINUTES = 10
@@ -63,7 +57,7 @@ def send_verification_code(body: SendVerificationCodeRequest, db: Session = Depe
         db.add(pending)
     db.commit()
 
-    send_verification_email(email, code)
+    queue_verification_email(email, code)
     return SuccessResponse(message="Verification code sent")
 
 
@@ -118,7 +112,7 @@ def resend_verification_code(body: SendVerificationCodeRequest, db: Session = De
     pending.updated_at = now
     db.commit()
 
-    send_verification_email(email, code)
+    queue_verification_email(email, code)
     return SuccessResponse(message="Verification code sent")
 
 
@@ -180,6 +174,9 @@ def register_user(user_data: UserRegistration, db: Session = Depends(get_db)):
 
     # Consume pending verification so it can't be reused
     db.delete(pending)
+
+    # Queue HubSpot sync in the same transaction (sent by the scheduler)
+    queue_contact_on_register(db, user)
     db.commit()
 
     # Send welcome notification
@@ -192,12 +189,6 @@ def register_user(user_data: UserRegistration, db: Session = Depends(get_db)):
         "high"
     )
 
-    # Sync to HubSpot (non-blocking; failures are logged only)
-    try:
-        sync_contact_on_register(user)
-    except Exception:
-        pass  # Already logged in hubspot service
-
     tokens = create_tokens_for_user(user)
     return tokens
 
@@ -320,10 +311,10 @@ def request_password_reset(request: PasswordReset, db: Session = Depends(get_db)
     user.password_reset_expires_at = now + timedelta(hours=1)  # 1 hour expiry
     db.commit()
 
-    # Send password reset email (same SES as verification; don't reveal outcome)
+    # Queue password reset email (same SES as verification; don't reveal outcome)
     frontend_url = os.getenv("FRONTEND_URL", "https://app.nestnavigate.com").rstrip("/")
     reset_link = f"{frontend_url}/reset-password?token={reset_token}"
-    send_password_reset_email(user.email, reset_link)
+    queue_password_reset_email(user.email, reset_link)
 
     return SuccessResponse(message="If the email exists, a password reset link has been sent")
 
@@ -357,8 +348,20 @@ def confirm_password_reset(request: PasswordResetConfirm, db: Session = Depends(
 # FULL USER DATA WIPE — Settings page
 # ================================
 
-@router.post("/wipe-data", response_model=SuccessResponse)
+def _run_wipe(wipe_id: UUID) -> None:
+    """Background task: wipe the user's data with its own session"""
+    db = SessionLocal()
+    try:
+        UserDataWipeManager.run_wipe(db, wipe_id)
+    except Exception as e:
+        logger.error(f"User data wipe {wipe_id} failed: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+@router.post("/wipe-data", response_model=SuccessResponse, status_code=status.HTTP_202_ACCEPTED)
 def wipe_user_data(
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -367,64 +370,33 @@ def wipe_user_data(
     (email, password, profile info) but all learning progress, coins, badges,
     quiz history, analytics, notifications, and onboarding data are deleted.
     The user will appear as a fresh account after this operation.
+
+    The wipe runs in the background; poll GET /wipe-data/{wipe_id} for progress.
+    Calling this again while a wipe is in progress returns that wipe.
     """
-    user_id = current_user.id
-
-    # ── 1. Learning progress ──
-    # Delete quiz answers first (child of quiz attempts)
-    quiz_attempt_ids = [
-        a.id for a in db.query(UserQuizAttempt.id).filter(
-            UserQuizAttempt.user_id == user_id
-        ).all()
-    ]
-    if quiz_attempt_ids:
-        db.query(UserQuizAnswer).filter(
-            UserQuizAnswer.quiz_attempt_id.in_(quiz_attempt_ids)
-        ).delete(synchronize_session=False)
-
-    db.query(UserQuizAttempt).filter(UserQuizAttempt.user_id == user_id).delete(synchronize_session=False)
-    db.query(UserModuleQuizAttempt).filter(UserModuleQuizAttempt.user_id == user_id).delete(synchronize_session=False)
-    db.query(UserLessonProgress).filter(UserLessonProgress.user_id == user_id).delete(synchronize_session=False)
-    db.query(UserModuleProgress).filter(UserModuleProgress.user_id == user_id).delete(synchronize_session=False)
-
-    # ── 2. Rewards & economy ──
-    db.query(UserCoinTransaction).filter(UserCoinTransaction.user_id == user_id).delete(synchronize_session=False)
-    db.query(UserCoinBalance).filter(UserCoinBalance.user_id == user_id).delete(synchronize_session=False)
-    db.query(UserBadge).filter(UserBadge.user_id == user_id).delete(synchronize_session=False)
-    db.query(UserCouponRedemption).filter(UserCouponRedemption.user_id == user_id).delete(synchronize_session=False)
-
-    # ── 3. Onboarding ──
-    db.query(UserOnboarding).filter(UserOnboarding.user_id == user_id).delete(synchronize_session=False)
-
-    # ── 4. Notifications ──
-    db.query(Notification).filter(Notification.user_id == user_id).delete(synchronize_session=False)
-
-    # ── 5. Analytics & lead scoring ──
-    db.query(UserBehaviorEvent).filter(UserBehaviorEvent.user_id == user_id).delete(synchronize_session=False)
-    db.query(LeadScoreHistory).filter(LeadScoreHistory.user_id == user_id).delete(synchronize_session=False)
-    db.query(UserLeadScore).filter(UserLeadScore.user_id == user_id).delete(synchronize_session=False)
-
-    # ── 6. Activity & usage (SET NULL — don't delete rows, just disassociate) ──
-    db.query(UserActivityLog).filter(UserActivityLog.user_id == user_id).update(
-        {UserActivityLog.user_id: None}, synchronize_session=False
-    )
-    db.query(CalculatorUsage).filter(CalculatorUsage.user_id == user_id).update(
-        {CalculatorUsage.user_id: None}, synchronize_session=False
-    )
-    db.query(MaterialDownload).filter(MaterialDownload.user_id == user_id).update(
-        {MaterialDownload.user_id: None}, synchronize_session=False
-    )
-    db.query(SupportTicket).filter(SupportTicket.user_id == user_id).update(
-        {SupportTicket.user_id: None}, synchronize_session=False
-    )
+    wipe, _ = UserDataWipeManager.start_wipe(db, current_user.id)
+    background_tasks.add_task(_run_wipe, wipe.id)
 
-    # ── 7. Recreate fresh coin balance ──
-    fresh_balance = UserCoinBalance(user_id=user_id)
-    db.add(fresh_balance)
+    return SuccessResponse(
+        message="Your data wipe has started. Your account will be reset to a fresh state shortly.",
+        data={"wipe_id": str(wipe.id), "status": wipe.status}
+    )
 
-    # ── 8. Update user timestamp ──
-    current_user.updated_at = datetime.now(timezone.utc)
 
-    db.commit()
+@router.get("/wipe-data/{wipe_id}", response_model=UserDataWipeResponse)
+def get_wipe_status(
+    wipe_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the progress of one of the current user's data wipes"""
+    wipe = db.query(UserDataWipe).filter(
+        and_(UserDataWipe.id == wipe_id, UserDataWipe.user_id == current_user.id)
+    ).first()
+    if not wipe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wipe not found"
+        )
 
-    return SuccessResponse(message="All user data has been wiped successfully. Your account has been reset to a fresh state.")
\ No newline at end of file
+    return wipe
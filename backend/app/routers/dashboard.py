@@ -1,42 +1,34 @@
-from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, desc
 
-from database import get_db
-from auth import get_current_user
+from database import get_db, get_async_db
+from auth import get_current_user, get_current_user_async
 from models import (
     User, UserCoinBalance, UserBadge, Badge, UserModuleProgress, 
-    Module, UserLessonProgress, Lesson, UserCoinTransaction,
-    UserQuizAttempt, Notification
+    Module, UserLessonProgress, Lesson, UserCoinTransaction
 )
 from schemas import (
     DashboardOverview, ModuleProgress, ModuleResponse, 
     UserBadgeResponse, BadgeResponse, CoinBalanceResponse,
     CoinTransactionResponse, LessonResponse
 )
-from utils import DashboardManager, OnboardingManager
+from utils import DashboardManager, OnboardingManager, StatsManager
 
 router = APIRouter()
 
 
 @router.get("/overview", response_model=DashboardOverview)
-def get_dashboard_overview(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_dashboard_overview(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get dashboard overview with key metrics"""
-    # Check if onboarding is complete
-    if not OnboardingManager.is_onboarding_complete(db, current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Please complete onboarding first"
-        )
-    
-    stats = DashboardManager.get_user_stats(db, current_user.id)
+    stats = await db.run_sync(_overview_stats, current_user.id)
     
     return DashboardOverview(
         total_coins=stats["total_coins"],
@@ -49,6 +41,17 @@ def get_dashboard_overview(
     )
 
 
+def _overview_stats(db: Session, user_id: UUID) -> Dict[str, Any]:
+    # Check if onboarding is complete
+    if not OnboardingManager.is_onboarding_complete(db, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please complete onboarding first"
+        )
+    
+    return DashboardManager.get_user_stats(db, user_id)
+
+
 @router.get("/modules", response_model=List[ModuleProgress])
 def get_user_module_progress(
     current_user: User = Depends(get_current_user),
@@ -201,82 +204,46 @@ def get_coin_transactions(
 
 
 @router.get("/statistics")
-def get_user_statistics(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_user_statistics(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get comprehensive user statistics"""
-    # Basic stats
-    coin_balance = db.query(UserCoinBalance).filter(UserCoinBalance.user_id == current_user.id).first()
-    badge_count = db.query(UserBadge).filter(UserBadge.user_id == current_user.id).count()
-    
-    # Learning progress
-    total_modules = db.query(Module).filter(Module.is_active == True).count()
-    completed_modules = db.query(UserModuleProgress).filter(
-        and_(
-            UserModuleProgress.user_id == current_user.id,
-            UserModuleProgress.status == "completed"
-        )
-    ).count()
-    
-    total_lessons = db.query(Lesson).join(Module).filter(
-        and_(Lesson.is_active == True, Module.is_active == True)
-    ).count()
-    completed_lessons = db.query(UserLessonProgress).join(Lesson).join(Module).filter(
-        and_(
-            UserLessonProgress.user_id == current_user.id,
-            UserLessonProgress.status == "completed",
-            Lesson.is_active == True,
-            Module.is_active == True
-        )
-    ).count()
-    
-    # Quiz statistics
-    total_quizzes_taken = db.query(UserQuizAttempt).filter(
-        UserQuizAttempt.user_id == current_user.id
-    ).count()
-    
-    quizzes_passed = db.query(UserQuizAttempt).filter(
-        and_(
-            UserQuizAttempt.user_id == current_user.id,
-            UserQuizAttempt.passed == True
-        )
-    ).count()
+    """Get comprehensive user statistics (served from the user_stats summary row)"""
+    statistics = await db.run_sync(_user_statistics, current_user.id)
+    await db.commit()
+    return statistics
+
+
+def _user_statistics(db: Session, user_id: UUID) -> Dict[str, Any]:
+    stats = StatsManager.get_or_create_stats(db, user_id)
     
-    avg_quiz_score = db.query(func.avg(UserQuizAttempt.score)).filter(
-        UserQuizAttempt.user_id == current_user.id
-    ).scalar() or 0
+    # Catalog totals are global, not per user: one round trip for both
+    total_modules, total_lessons = db.query(
+        db.query(func.count(Module.id)).filter(Module.is_active == True).scalar_subquery(),
+        db.query(func.count(Lesson.id)).join(Module).filter(
+            and_(Lesson.is_active == True, Module.is_active == True)
+        ).scalar_subquery()
+    ).one()
     
-    # Time-based statistics
-    today = datetime.now().date()
-    week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
+    completed_modules = stats.modules_completed
+    completed_lessons = stats.lessons_completed
+    total_quizzes_taken = stats.quizzes_taken
+    quizzes_passed = stats.quizzes_passed
+    avg_quiz_score = (stats.quiz_score_total / total_quizzes_taken) if total_quizzes_taken > 0 else 0
     
-    lessons_this_week = db.query(UserLessonProgress).filter(
-        and_(
-            UserLessonProgress.user_id == current_user.id,
-            UserLessonProgress.completed_at >= week_ago,
-            UserLessonProgress.status == "completed"
-        )
-    ).count()
-    
-    coins_earned_this_month = db.query(func.sum(UserCoinTransaction.amount)).filter(
-        and_(
-            UserCoinTransaction.user_id == current_user.id,
-            UserCoinTransaction.transaction_type == "earned",
-            UserCoinTransaction.created_at >= month_ago
-        )
-    ).scalar() or 0
+    # Rolling windows from the per-day buckets
+    lessons_this_week = StatsManager.get_window_total(stats, "lessons", 7)
+    coins_earned_this_month = StatsManager.get_window_total(stats, "coins_earned", 30)
     
     return {
         "coin_balance": {
-            "current": coin_balance.current_balance if coin_balance else 0,
-            "lifetime_earned": coin_balance.lifetime_earned if coin_balance else 0,
-            "lifetime_spent": coin_balance.lifetime_spent if coin_balance else 0,
+            "current": stats.coins_current,
+            "lifetime_earned": stats.coins_lifetime_earned,
+            "lifetime_spent": stats.coins_lifetime_spent,
             "earned_this_month": coins_earned_this_month
         },
         "badges": {
-            "total": badge_count
+            "total": stats.badges_earned
         },
         "learning": {
             "modules": {
@@ -306,63 +273,8 @@ def get_recent_activity(
     db: Session = Depends(get_db),
     limit: int = 10
 ):
-    """Get recent user activity"""
-    activities = []
-    
-    # Recent lesson completions
-    recent_lessons = db.query(UserLessonProgress).join(Lesson).filter(
-        and_(
-            UserLessonProgress.user_id == current_user.id,
-            UserLessonProgress.status == "completed",
-            UserLessonProgress.completed_at.isnot(None)
-        )
-    ).order_by(desc(UserLessonProgress.completed_at)).limit(5).all()
-    
-    for lesson_progress in recent_lessons:
-        activities.append({
-            "type": "lesson_completed",
-            "title": f"Completed lesson: {lesson_progress.lesson.title}",
-            "timestamp": lesson_progress.completed_at,
-            "data": {
-                "lesson_id": lesson_progress.lesson_id,
-                "lesson_title": lesson_progress.lesson.title
-            }
-        })
-    
-    # Recent badge achievements
-    recent_badges = db.query(UserBadge).join(Badge).filter(
-        UserBadge.user_id == current_user.id
-    ).order_by(desc(UserBadge.earned_at)).limit(5).all()
-    
-    for user_badge in recent_badges:
-        activities.append({
-            "type": "badge_earned",
-            "title": f"Earned badge: {user_badge.badge.name}",
-            "timestamp": user_badge.earned_at,
-            "data": {
-                "badge_id": user_badge.badge_id,
-                "badge_name": user_badge.badge.name
-            }
-        })
-    
-    # Recent coin transactions
-    recent_transactions = db.query(UserCoinTransaction).filter(
-        UserCoinTransaction.user_id == current_user.id
-    ).order_by(desc(UserCoinTransaction.created_at)).limit(5).all()
-    
-    for transaction in recent_transactions:
-        activities.append({
-            "type": "coin_transaction",
-            "title": f"{'Earned' if transaction.amount > 0 else 'Spent'} {abs(transaction.amount)} coins",
-            "timestamp": transaction.created_at,
-            "data": {
-                "amount": transaction.amount,
-                "source_type": transaction.source_type,
-                "description": transaction.description
-            }
-        })
-    
-    # Sort all activities by timestamp and limit
-    activities.sort(key=lambda x: x["timestamp"], reverse=True)
+    """Get recent user activity (served from the user_stats summary row)"""
+    stats = StatsManager.get_or_create_stats(db, current_user.id)
+    db.commit()
     
-    return activities[:limit]
+    return StatsManager.get_recent_activity(stats, limit)
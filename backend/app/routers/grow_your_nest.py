@@ -13,14 +13,14 @@ from typing import List, Dict, Optional
 from uuid import UUID
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from rate_limit import limiter, route_limit
 
-from database import get_db
-from auth import get_current_user
+from database import get_db, get_async_db
+from auth import get_current_user, get_current_user_async
 from models import (
     User, Module, Lesson, UserModuleProgress, UserLessonProgress,
     QuizQuestion, QuizAnswer, UserModuleQuizAttempt,
@@ -32,11 +32,11 @@ from schemas import (
     ValidateAnswerRequest, ValidateAnswerResponse,
     FreeroamAnswerRequest, LessonSubmitRequest,
 )
-from utils import CoinManager, NotificationManager, QuizManager
+from utils import CoinManager, NotificationManager, QuizManager, StatsManager
 from analytics.event_tracker import EventTracker
+from services.question_bank import question_bank_cache, module_questions_response
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 # ================================
 # CONSTANTS
@@ -811,16 +811,21 @@ def get_tree_state(
 # ================================
 
 @router.get("/module/{module_id}", response_model=MiniGameQuestionsResponse)
-def get_module_questions(
+async def get_module_questions(
     module_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all quiz questions for Grow Your Nest module quiz.
     Returns consolidated questions from all lessons in the module.
     Requires all lessons in the module to be completed first.
     """
+    return await db.run_sync(_module_questions_response, module_id, current_user.id)
+
+
+def _module_questions_response(db: Session, module_id: UUID, user_id: UUID) -> Response:
+    """Lesson gate, cached question bank and user status (sync, via AsyncSession.run_sync)"""
     module = db.query(Module).filter(
         and_(Module.id == module_id, Module.is_active == True)
     ).first()
@@ -836,7 +841,7 @@ def get_module_questions(
     lesson_ids = [lesson.id for lesson in lessons]
     completed_lessons = db.query(UserLessonProgress).filter(
         and_(
-            UserLessonProgress.user_id == current_user.id,
+            UserLessonProgress.user_id == user_id,
             UserLessonProgress.lesson_id.in_(lesson_ids),
             UserLessonProgress.status == "completed"
         )
@@ -861,37 +866,20 @@ def get_module_questions(
             }
         )
 
-    all_questions = []
-    for lesson in lessons:
-        questions = db.query(QuizQuestion).filter(
-            and_(QuizQuestion.lesson_id == lesson.id, QuizQuestion.is_active == True)
-        ).order_by(QuizQuestion.order_index).all()
-        for question in questions:
-            answers = db.query(QuizAnswer).filter(QuizAnswer.question_id == question.id).order_by(QuizAnswer.order_index).all()
-            all_questions.append({
-                "id": str(question.id),
-                "lesson_id": str(lesson.id),
-                "lesson_title": lesson.title,
-                "question_text": question.question_text,
-                "question_type": question.question_type,
-                "order_index": question.order_index,
-                "answers": [
-                    {"id": str(a.id), "answer_text": a.answer_text, "order_index": a.order_index}
-                    for a in answers
-                ]
-            })
-    if not all_questions:
+    # Questions are the same for every user: cached and pre-encoded per module
+    bank = question_bank_cache.get(db, module, lessons)
+    if not bank.total_questions:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No questions found for this module")
 
     previous_attempts = db.query(UserModuleQuizAttempt).filter(
         and_(
-            UserModuleQuizAttempt.user_id == current_user.id,
+            UserModuleQuizAttempt.user_id == user_id,
             UserModuleQuizAttempt.module_id == module_id
         )
     ).order_by(desc(UserModuleQuizAttempt.attempt_number)).all()
     best_score = max(float(a.score) for a in previous_attempts) if previous_attempts else None
 
-    return {
+    return module_questions_response({
         "module": {
             "id": str(module.id),
             "title": module.title,
@@ -900,8 +888,7 @@ def get_module_questions(
         },
         "total_lessons": len(lessons),
         "completed_lessons": len(completed_lesson_ids),
-        "total_questions": len(all_questions),
-        "questions": all_questions,
+        "total_questions": bank.total_questions,
         "user_status": {
             "all_lessons_completed": True,
             "completed_lessons": len(completed_lesson_ids),
@@ -911,11 +898,11 @@ def get_module_questions(
             "best_score": best_score,
             "can_play": True
         }
-    }
+    }, bank)
 
 
 @router.post("/module/{module_id}/submit", response_model=MiniGameResult)
-@limiter.limit("10/minute")
+@limiter.limit(route_limit("grow_your_nest_submit"))
 def submit_module_quiz(
     request: Request,
     module_id: UUID,
@@ -1024,6 +1011,7 @@ def submit_module_quiz(
             module_progress.completion_percentage = Decimal("100.00")
             module_completed = True
             EventTracker.track_module_completed(db, current_user.id, module_id, module.title)
+            StatsManager.refresh_progress(db, current_user.id)
     db.commit()
 
     return MiniGameResult(
@@ -1073,37 +1061,9 @@ def get_module_quiz_stats(
     db: Session = Depends(get_db)
 ):
     """Get user's overall Grow Your Nest module quiz statistics."""
-    attempts = db.query(UserModuleQuizAttempt).filter(
-        UserModuleQuizAttempt.user_id == current_user.id
-    ).all()
-    if not attempts:
-        return {
-            "total_attempts": 0,
-            "total_passed": 0,
-            "total_failed": 0,
-            "pass_rate": 0.0,
-            "average_score": 0.0,
-            "best_score": 0.0,
-            "modules_completed": 0
-        }
-    total_attempts = len(attempts)
-    passed_attempts = [a for a in attempts if a.passed]
-    total_passed = len(passed_attempts)
-    total_failed = total_attempts - total_passed
-    pass_rate = (total_passed / total_attempts * 100) if total_attempts > 0 else 0
-    average_score = sum(float(a.score) for a in attempts) / len(attempts)
-    best_score = max(float(a.score) for a in attempts)
-    modules_completed = len(set(a.module_id for a in passed_attempts))
-    return {
-        "total_attempts": total_attempts,
-        "total_passed": total_passed,
-        "total_failed": total_failed,
-        "pass_rate": round(pass_rate, 2),
-        "average_score": round(average_score, 2),
-        "best_score": round(best_score, 2),
-        "modules_completed": modules_completed
-    }
-    
+    return QuizManager.get_module_quiz_summary(db, current_user.id)
+
+
 # ================================
 # TEMPORARY DEV RESET ENDPOINT — Remove before production
 # ================================
@@ -1210,6 +1170,7 @@ def reset_lesson_gyn_dev(
             module_progress.status = "in_progress"
         tree_was_reset = True
     
+    StatsManager.refresh_progress(db, current_user.id)
     db.commit()
     
     return {
@@ -13,10 +13,14 @@ from schemas import (
     FAQResponse, SupportTicketCreate, SupportTicketResponse, SuccessResponse
 )
 from analytics.event_tracker import EventTracker
+from services.counters import counter_buffer, record_faq_view
 
 router = APIRouter()
 
 
+FAQ_SNIPPET_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+
 @router.get("/faqs", response_model=List[FAQResponse])
 def get_faqs(
     db: Session = Depends(get_db),
@@ -24,30 +28,50 @@ def get_faqs(
     search: Optional[str] = None,
     limit: int = 50
 ):
-    """Get frequently asked questions"""
-    query = db.query(FAQ).filter(FAQ.is_active == True)
+    """
+    Get frequently asked questions.
     
+    With `search`, matches the indexed full-text document (question weighted
+    above answer) and returns the best matches first, each with a highlighted
+    answer snippet. Supports web-search syntax ("quoted phrases", -exclusions, or).
+    """
+    filters = [FAQ.is_active == True]
     if category:
-        query = query.filter(FAQ.category == category)
+        filters.append(FAQ.category == category)
     
-    if search:
-        query = query.filter(
-            FAQ.question.ilike(f"%{search}%") | FAQ.answer.ilike(f"%{search}%")
-        )
+    if not search or not search.strip():
+        faqs = db.query(FAQ).filter(and_(*filters)).order_by(FAQ.order_index, FAQ.question).limit(limit).all()
+        return [_faq_response(faq) for faq in faqs]
     
-    faqs = query.order_by(FAQ.order_index, FAQ.question).limit(limit).all()
+    ts_query = func.websearch_to_tsquery("english", search)
+    rank = func.ts_rank_cd(FAQ.search_vector, ts_query)
+    matches = db.query(FAQ.id, rank.label("rank")).filter(
+        and_(*filters, FAQ.search_vector.op("@@")(ts_query))
+    ).order_by(desc("rank"), FAQ.order_index, FAQ.question).limit(limit).subquery()
     
-    return [
-        FAQResponse(
-            id=faq.id,
-            question=faq.question,
-            answer=faq.answer,
-            category=faq.category,
-            order_index=faq.order_index,
-            view_count=faq.view_count
-        )
-        for faq in faqs
-    ]
+    # Highlighting is expensive, so it runs on the ranked page only
+    rows = db.query(
+        FAQ,
+        matches.c.rank,
+        func.ts_headline("english", FAQ.answer, ts_query, FAQ_SNIPPET_OPTIONS).label("snippet")
+    ).join(matches, FAQ.id == matches.c.id).order_by(
+        desc(matches.c.rank), FAQ.order_index, FAQ.question
+    ).all()
+    
+    return [_faq_response(faq, rank=float(faq_rank), snippet=snippet) for faq, faq_rank, snippet in rows]
+
+
+def _faq_response(faq: FAQ, rank: Optional[float] = None, snippet: Optional[str] = None) -> FAQResponse:
+    return FAQResponse(
+        id=faq.id,
+        question=faq.question,
+        answer=faq.answer,
+        category=faq.category,
+        order_index=faq.order_index,
+        view_count=faq.view_count,
+        rank=rank,
+        snippet=snippet
+    )
 
 
 @router.get("/faqs/{faq_id}", response_model=FAQResponse)
@@ -66,9 +90,8 @@ def get_faq(
             detail="FAQ not found"
         )
     
-    # Increment view count
-    faq.view_count += 1
-    db.commit()
+    # Count the view (buffered, flushed in batches by services.counters)
+    record_faq_view(faq.id)
     
     return FAQResponse(
         id=faq.id,
@@ -76,7 +99,7 @@ def get_faq(
         answer=faq.answer,
         category=faq.category,
         order_index=faq.order_index,
-        view_count=faq.view_count
+        view_count=faq.view_count + counter_buffer.pending("faq_views", faq.id)
     )
 
 
@@ -4,13 +4,13 @@ from uuid import UUID
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from rate_limit import limiter, route_limit
 
-from database import get_db
-from auth import get_current_user, get_current_admin_user
+from database import get_db, get_async_db
+from auth import get_current_user, get_current_user_async, get_current_admin_user
 from models import (
     User,
     Module,
@@ -35,127 +35,133 @@ from schemas import (
     LessonProgressResponse,
 )
 from utils import ProgressManager, OnboardingManager, CoinManager
+from responses import json_model_response
 from analytics.event_tracker import EventTracker
 import traceback
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 
 @router.get("/modules", response_model=List[ModuleResponse])
-def get_modules(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_modules(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        if not OnboardingManager.is_onboarding_complete(db, current_user.id):
-            raise HTTPException(
-                status_code=400, detail="Please complete onboarding first"
+        out = await db.run_sync(_module_responses, current_user.id)
+        return json_model_response(out, List[ModuleResponse])
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=500, detail=f"/modules failed: {type(e).__name__}: {e}"
+        )
+
+
+def _module_responses(db: Session, user_id: UUID) -> List[ModuleResponse]:
+    """Active modules with the user's progress and tree state (sync, via AsyncSession.run_sync)"""
+    if not OnboardingManager.is_onboarding_complete(db, user_id):
+        raise HTTPException(
+            status_code=400, detail="Please complete onboarding first"
+        )
+
+    modules = (
+        db.query(Module)
+        .filter(Module.is_active.is_(True))
+        .order_by(Module.order_index)
+        .all()
+    )
+
+    out: list[ModuleResponse] = []
+    for m in modules:
+        lesson_count = (
+            db.query(Lesson)
+            .filter(and_(Lesson.module_id == m.id, Lesson.is_active.is_(True)))
+            .count()
+        )
+
+        prog = (
+            db.query(UserModuleProgress)
+            .filter(
+                and_(
+                    UserModuleProgress.user_id == user_id,
+                    UserModuleProgress.module_id == m.id,
+                )
             )
+            .first()
+        )
+        pct = (
+            float(prog.completion_percentage)
+            if getattr(prog, "completion_percentage", None) is not None
+            else 0.0
+        )
 
-        modules = (
-            db.query(Module)
-            .filter(Module.is_active.is_(True))
-            .order_by(Module.order_index)
+        # Calculate module completion states
+        module_lessons = (
+            db.query(Lesson)
+            .filter(and_(Lesson.module_id == m.id, Lesson.is_active.is_(True)))
             .all()
         )
 
-        out: list[ModuleResponse] = []
-        for m in modules:
-            lesson_count = (
-                db.query(Lesson)
-                .filter(and_(Lesson.module_id == m.id, Lesson.is_active.is_(True)))
-                .count()
-            )
+        lesson_ids = [lesson.id for lesson in module_lessons]
 
-            prog = (
-                db.query(UserModuleProgress)
+        if lesson_ids:
+            lesson_progress_records = (
+                db.query(UserLessonProgress)
                 .filter(
                     and_(
-                        UserModuleProgress.user_id == current_user.id,
-                        UserModuleProgress.module_id == m.id,
+                        UserLessonProgress.user_id == user_id,
+                        UserLessonProgress.lesson_id.in_(lesson_ids)
                     )
                 )
-                .first()
-            )
-            pct = (
-                float(prog.completion_percentage)
-                if getattr(prog, "completion_percentage", None) is not None
-                else 0.0
+                .all()
             )
 
-            # Calculate module completion states
-            module_lessons = (
-                db.query(Lesson)
-                .filter(and_(Lesson.module_id == m.id, Lesson.is_active.is_(True)))
-                .all()
+            # Check if all lessons are completed (video watched)
+            completed_count = sum(
+                1 for lp in lesson_progress_records if lp.status == "completed"
             )
-            
-            lesson_ids = [lesson.id for lesson in module_lessons]
-            
-            if lesson_ids:
-                lesson_progress_records = (
-                    db.query(UserLessonProgress)
-                    .filter(
-                        and_(
-                            UserLessonProgress.user_id == current_user.id,
-                            UserLessonProgress.lesson_id.in_(lesson_ids)
-                        )
-                    )
-                    .all()
-                )
-                
-                # Check if all lessons are completed (video watched)
-                completed_count = sum(
-                    1 for lp in lesson_progress_records if lp.status == "completed"
-                )
-                all_lessons_completed = completed_count == lesson_count and lesson_count > 0
-            else:
-                all_lessons_completed = False
-            
-            # Free roam is available when all lessons (videos) are completed
-            free_roam_available = all_lessons_completed
-            
-            # Get tree state from module progress
-            tree_growth_points = getattr(prog, "tree_growth_points", 0) if prog else 0
-            tree_current_stage = getattr(prog, "tree_current_stage", 0) if prog else 0
-            tree_completed = getattr(prog, "tree_completed", False) if prog else False
-
-            out.append(
-                ModuleResponse(
-                    id=m.id,
-                    title=m.title,
-                    description=m.description,
-                    thumbnail_url=getattr(m, "thumbnail_url", None),
-                    order_index=getattr(m, "order_index", 0),
-                    is_active=bool(m.is_active),
-                    prerequisite_module_id=getattr(m, "prerequisite_module_id", None),
-                    estimated_duration_minutes=getattr(
-                        m, "estimated_duration_minutes", None
-                    ),
-                    difficulty_level=m.difficulty_level,
-                    created_at=m.created_at,
-                    lesson_count=lesson_count,
-                    progress_percentage=pct,
-                    all_lessons_completed=all_lessons_completed,
-                    free_roam_available=free_roam_available,
-                    tree_growth_points=tree_growth_points,
-                    tree_current_stage=tree_current_stage,
-                    tree_total_stages=5,
-                    tree_completed=tree_completed,
-                )
+            all_lessons_completed = completed_count == lesson_count and lesson_count > 0
+        else:
+            all_lessons_completed = False
+
+        # Free roam is available when all lessons (videos) are completed
+        free_roam_available = all_lessons_completed
+
+        # Get tree state from module progress
+        tree_growth_points = getattr(prog, "tree_growth_points", 0) if prog else 0
+        tree_current_stage = getattr(prog, "tree_current_stage", 0) if prog else 0
+        tree_completed = getattr(prog, "tree_completed", False) if prog else False
+
+        out.append(
+            ModuleResponse(
+                id=m.id,
+                title=m.title,
+                description=m.description,
+                thumbnail_url=getattr(m, "thumbnail_url", None),
+                order_index=getattr(m, "order_index", 0),
+                is_active=bool(m.is_active),
+                prerequisite_module_id=getattr(m, "prerequisite_module_id", None),
+                estimated_duration_minutes=getattr(
+                    m, "estimated_duration_minutes", None
+                ),
+                difficulty_level=m.difficulty_level,
+                created_at=m.created_at,
+                lesson_count=lesson_count,
+                progress_percentage=pct,
+                all_lessons_completed=all_lessons_completed,
+                free_roam_available=free_roam_available,
+                tree_growth_points=tree_growth_points,
+                tree_current_stage=tree_current_stage,
+                tree_total_stages=5,
+                tree_completed=tree_completed,
             )
-
-        return out
-
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=500, detail=f"/modules failed: {type(e).__name__}: {e}"
         )
 
+    return out
+
 
 @router.post("/modules", response_model=ModuleResponse, status_code=status.HTTP_201_CREATED)
 def create_module(
@@ -423,7 +429,7 @@ def get_module_lessons(
             )
         )
 
-    return lesson_responses
+    return json_model_response(lesson_responses, List[LessonResponse])
 
 
 @router.post("/modules/{module_id}/lessons", response_model=LessonResponse, status_code=status.HTTP_201_CREATED)
@@ -625,7 +631,7 @@ def update_lesson_progress(
 
 
 @router.post("/lessons/{lesson_id}/milestone", response_model=LessonProgressResponse)
-@limiter.limit("30/minute")  # Max 30 milestone calls per user per minute
+@limiter.limit(route_limit("learning_milestone"))  # Default 30 milestone calls per user per minute
 def track_lesson_milestone(
     request: Request,
     lesson_id: UUID,
@@ -870,7 +876,7 @@ def uncomplete_lesson(
 
 
 @router.post("/progress/batch", response_model=SuccessResponse)
-@limiter.limit("20/minute")  # Max 20 batch updates per user per minute
+@limiter.limit(route_limit("learning_progress_batch"))  # Default 20 batch updates per user per minute
 def update_progress_batch(
     request: Request,
     batch_data: BatchProgressUpdate,
@@ -15,6 +15,7 @@ from schemas import (
     MaterialResourceResponse, CalculatorInput, CalculatorResult, SuccessResponse
 )
 from analytics.event_tracker import EventTracker
+from services.counters import record_material_download
 
 router = APIRouter()
 
@@ -122,12 +123,11 @@ def download_material(
     )
     
     db.add(download_record)
-    
-    # Increment download count
-    material.download_count += 1
-    
     db.commit()
     
+    # Count the download (buffered, flushed in batches by services.counters)
+    record_material_download(material.id)
+    
     # Track material download event (only if user is logged in)
     if current_user:
         EventTracker.track_material_downloaded(
@@ -9,14 +9,14 @@ from typing import List
 from uuid import UUID
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from rate_limit import limiter, route_limit
 
-from database import get_db
-from auth import get_current_user
+from database import get_db, get_async_db
+from auth import get_current_user, get_current_user_async
 from models import (
     User, Module, Lesson, QuizQuestion, QuizAnswer,
     UserModuleProgress, UserLessonProgress, UserModuleQuizAttempt
@@ -25,18 +25,18 @@ from schemas import (
     MiniGameQuestionsResponse, MiniGameSubmission, MiniGameResult,
     MiniGameAttemptHistory
 )
-from utils import QuizManager, CoinManager, ProgressManager
+from utils import QuizManager, CoinManager, ProgressManager, StatsManager
 from analytics.event_tracker import EventTracker
+from services.question_bank import question_bank_cache, module_questions_response
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 
 @router.get("/module/{module_id}", response_model=MiniGameQuestionsResponse)
-def get_module_minigame(
+async def get_module_minigame(
     module_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all quiz questions for 'Grow Your Nest' mini-game.
@@ -47,6 +47,11 @@ def get_module_minigame(
     - Game presentation/flow
     - Score tracking within the game
     """
+    return await db.run_sync(_module_minigame_response, module_id, current_user.id)
+
+
+def _module_minigame_response(db: Session, module_id: UUID, user_id: UUID) -> Response:
+    """Lesson gate, cached question bank and user status (sync, via AsyncSession.run_sync)"""
     # Validate module
     module = db.query(Module).filter(
         and_(Module.id == module_id, Module.is_active == True)
@@ -76,7 +81,7 @@ def get_module_minigame(
     lesson_ids = [lesson.id for lesson in lessons]
     completed_lessons = db.query(UserLessonProgress).filter(
         and_(
-            UserLessonProgress.user_id == current_user.id,
+            UserLessonProgress.user_id == user_id,
             UserLessonProgress.lesson_id.in_(lesson_ids),
             UserLessonProgress.status == "completed"
         )
@@ -113,41 +118,10 @@ def get_module_minigame(
             }
         )
     
-    # Collect ALL questions from ALL lessons (flat list)
-    all_questions = []
-    
-    for lesson in lessons:
-        questions = db.query(QuizQuestion).filter(
-            and_(
-                QuizQuestion.lesson_id == lesson.id,
-                QuizQuestion.is_active == True
-            )
-        ).order_by(QuizQuestion.order_index).all()
-        
-        for question in questions:
-            answers = db.query(QuizAnswer).filter(
-                QuizAnswer.question_id == question.id
-            ).order_by(QuizAnswer.order_index).all()
-            
-            all_questions.append({
-                "id": str(question.id),
-                "lesson_id": str(lesson.id),
-                "lesson_title": lesson.title,
-                "question_text": question.question_text,
-                "question_type": question.question_type,
-                "order_index": question.order_index,
-                "answers": [
-                    {
-                        "id": str(answer.id),
-                        "answer_text": answer.answer_text,
-                        "order_index": answer.order_index
-                        # Note: is_correct is NOT included for security
-                    }
-                    for answer in answers
-                ]
-            })
+    # Questions are the same for every user: cached and pre-encoded per module
+    bank = question_bank_cache.get(db, module, lessons)
     
-    if not all_questions:
+    if not bank.total_questions:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No questions found for this module"
@@ -156,14 +130,15 @@ def get_module_minigame(
     # Get previous attempts
     previous_attempts = db.query(UserModuleQuizAttempt).filter(
         and_(
-            UserModuleQuizAttempt.user_id == current_user.id,
+            UserModuleQuizAttempt.user_id == user_id,
             UserModuleQuizAttempt.module_id == module_id
         )
     ).order_by(desc(UserModuleQuizAttempt.attempt_number)).all()
     
     best_score = max([float(attempt.score) for attempt in previous_attempts]) if previous_attempts else None
     
-    return {
+    # "questions" (FLAT LIST - client handles presentation) is spliced in from the bank
+    return module_questions_response({
         "module": {
             "id": str(module.id),
             "title": module.title,
@@ -172,8 +147,7 @@ def get_module_minigame(
         },
         "total_lessons": len(lessons),
         "completed_lessons": len(completed_lesson_ids),
-        "total_questions": len(all_questions),
-        "questions": all_questions,  # FLAT LIST - client handles presentation
+        "total_questions": bank.total_questions,
         "user_status": {
             "all_lessons_completed": len(completed_lesson_ids) == len(lessons),
             "completed_lessons": len(completed_lesson_ids),
@@ -183,11 +157,11 @@ def get_module_minigame(
             "best_score": best_score,
             "can_play": True  # Will only reach here if all lessons completed (gate passed)
         }
-    }
+    }, bank)
 
 
 @router.post("/module/{module_id}/submit", response_model=MiniGameResult)
-@limiter.limit("10/minute")  # Max 10 mini-game submissions per user per minute
+@limiter.limit(route_limit("minigame_submit"))  # Default 10 mini-game submissions per user per minute
 def submit_minigame(
     request: Request,
     module_id: UUID,
@@ -353,6 +327,7 @@ def submit_minigame(
                 "module_completion", module_id,
                 f"Completed module: {module.title}"
             )
+            StatsManager.refresh_progress(db, current_user.id)
     
     db.commit()
     
@@ -405,40 +380,4 @@ def get_minigame_statistics(
     db: Session = Depends(get_db)
 ):
     """Get user's overall mini-game statistics across all modules"""
-    
-    attempts = db.query(UserModuleQuizAttempt).filter(
-        UserModuleQuizAttempt.user_id == current_user.id
-    ).all()
-    
-    if not attempts:
-        return {
-            "total_attempts": 0,
-            "total_passed": 0,
-            "total_failed": 0,
-            "pass_rate": 0.0,
-            "average_score": 0.0,
-            "best_score": 0.0,
-            "modules_completed": 0
-        }
-    
-    total_attempts = len(attempts)
-    passed_attempts = [a for a in attempts if a.passed]
-    total_passed = len(passed_attempts)
-    total_failed = total_attempts - total_passed
-    pass_rate = (total_passed / total_attempts * 100) if total_attempts > 0 else 0
-    
-    average_score = sum(float(a.score) for a in attempts) / len(attempts)
-    best_score = max(float(a.score) for a in attempts)
-    
-    # Count unique modules completed (passed)
-    modules_completed = len(set(a.module_id for a in passed_attempts))
-    
-    return {
-        "total_attempts": total_attempts,
-        "total_passed": total_passed,
-        "total_failed": total_failed,
-        "pass_rate": round(pass_rate, 2),
-        "average_score": round(average_score, 2),
-        "best_score": round(best_score, 2),
-        "modules_completed": modules_completed
-    }
\ No newline at end of file
+    return QuizManager.get_module_quiz_summary(db, current_user.id)
\ No newline at end of file
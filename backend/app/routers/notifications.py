@@ -1,46 +1,62 @@
+import asyncio
+import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, desc, func, select
 
-from database import get_db
-from auth import get_current_user
-from models import User, Notification
-from schemas import NotificationResponse, NotificationUpdate, SuccessResponse
-from utils import NotificationManager
+from database import get_db, get_async_db, SessionLocal
+from auth import get_current_user, get_current_user_async, get_current_admin_user, optional_security
+from models import User, Notification, NotificationBroadcast
+from schemas import (
+    NotificationResponse, NotificationUpdate, SuccessResponse,
+    NotificationBroadcastRequest, NotificationBroadcastResponse
+)
+from utils import NotificationManager, NotificationBroadcastManager
+from services.notification_stream import (
+    notification_hub, resolve_cursor, fetch_after, format_event, notification_event, heartbeat,
+    StreamCursor, STREAM_BATCH_LIMIT, STREAM_HEARTBEAT_SECONDS, STREAM_RETRY_MS,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[NotificationResponse])
-def get_notifications(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_notifications(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     unread_only: bool = False,
     notification_type: Optional[str] = None,
     limit: int = 20,
     offset: int = 0
 ):
     """Get user notifications"""
-    query = db.query(Notification).filter(Notification.user_id == current_user.id)
+    query = select(Notification).where(Notification.user_id == current_user.id)
     
     if unread_only:
-        query = query.filter(Notification.is_read == False)
+        query = query.where(Notification.is_read == False)
     
     if notification_type:
-        query = query.filter(Notification.notification_type == notification_type)
+        query = query.where(Notification.notification_type == notification_type)
     
     # Filter out expired notifications
-    query = query.filter(
+    query = query.where(
         (Notification.expires_at.is_(None)) | (Notification.expires_at > datetime.now())
     )
     
-    notifications = query.order_by(
-        desc(Notification.created_at)
-    ).offset(offset).limit(limit).all()
+    result = await db.execute(
+        query.order_by(desc(Notification.created_at)).offset(offset).limit(limit)
+    )
+    notifications = result.scalars().all()
     
     return [
         NotificationResponse(
@@ -58,20 +74,172 @@ def get_notifications(
 
 
 @router.get("/unread-count")
-def get_unread_count(
-    current_user: User = Depends(get_current_user),
+async def get_unread_count(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get count of unread notifications (served from the per-user counter)"""
+    count = await db.run_sync(NotificationManager.get_unread_count, current_user.id)
+    await db.commit()
+    
+    return {"unread_count": count}
+
+
+def _authenticate_stream(token: str) -> UUID:
+    """Validate the access token with a short-lived session (streams hold none)"""
+    db = SessionLocal()
+    try:
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        return get_current_user(credentials, db).id
+    finally:
+        db.close()
+
+
+def _resolve_stream_cursor(user_id: UUID, last_event_id: Optional[str]) -> StreamCursor:
+    db = SessionLocal()
+    try:
+        return resolve_cursor(db, user_id, last_event_id)
+    finally:
+        db.close()
+
+
+def _read_stream(user_id: UUID, cursor: StreamCursor) -> Tuple[List[str], StreamCursor, int]:
+    """Events for notifications not sent yet, the advanced cursor and the unread count"""
+    db = SessionLocal()
+    try:
+        notifications = fetch_after(db, user_id, cursor)
+        unread_count = NotificationManager.get_unread_count(db, user_id)
+        db.commit()
+        events = []
+        for notification in notifications:
+            cursor.advance(notification)
+            events.append(notification_event(notification, event_id=cursor.event_id))
+        return events, cursor, unread_count
+    finally:
+        db.close()
+
+
+async def _notification_events(request: Request, user_id: UUID, last_event_id: Optional[str]):
+    wakeups = notification_hub.subscribe(user_id)
+    try:
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        cursor = await run_in_threadpool(_resolve_stream_cursor, user_id, last_event_id)
+        sent_unread_count = None
+        read = True
+        while True:
+            if read:
+                events, cursor, unread_count = await run_in_threadpool(_read_stream, user_id, cursor)
+                for event in events:
+                    yield event
+                if unread_count != sent_unread_count:
+                    yield format_event("unread_count", {"unread_count": unread_count})
+                    sent_unread_count = unread_count
+                if len(events) == STREAM_BATCH_LIMIT:
+                    continue
+            try:
+                await asyncio.wait_for(wakeups.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                read = True
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield heartbeat()
+                # Without LISTEN nothing wakes the stream, so re-read on each heartbeat
+                read = not notification_hub.listening
+    finally:
+        notification_hub.unsubscribe(user_id, wakeups)
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    access_token: Optional[str] = None,
+    last_event_id: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """
+    Server-Sent Events stream of new notifications (replaces polling the list
+    and unread-count endpoints).
+
+    Events: `notification` (id = newest notification id sent) and `unread_count`.
+    Authenticate with the Authorization header, or ?access_token= for
+    EventSource clients. Reconnects resume after the Last-Event-ID header
+    (or ?last_event_id=).
+    """
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_id = await run_in_threadpool(_authenticate_stream, token)
+    last_event_id = request.headers.get("last-event-id") or last_event_id
+    
+    return StreamingResponse(
+        _notification_events(request, user_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _run_broadcast(broadcast_id: UUID) -> None:
+    """Background task: fan the broadcast out with its own session"""
+    db = SessionLocal()
+    try:
+        NotificationBroadcastManager.run_broadcast(db, broadcast_id)
+    except Exception as e:
+        logger.error(f"Broadcast {broadcast_id} failed: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+@router.post(
+    "/broadcasts",
+    response_model=NotificationBroadcastResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def create_broadcast(
+    broadcast_data: NotificationBroadcastRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get count of unread notifications"""
-    count = db.query(Notification).filter(
-        and_(
-            Notification.user_id == current_user.id,
-            Notification.is_read == False,
-            (Notification.expires_at.is_(None)) | (Notification.expires_at > datetime.now())
+    """
+    Send a notification to every active user in a segment.
+    Admin only.
+    
+    The fan-out runs in the background; poll GET /broadcasts/{id} for progress.
+    Re-submitting the same broadcast_id never notifies a user twice and resumes
+    a broadcast that has not completed.
+    """
+    data = broadcast_data.model_dump()
+    # Stored as JSON on the broadcast row
+    data["segment"] = broadcast_data.segment.model_dump(mode="json", exclude_none=True)
+    broadcast, _ = NotificationBroadcastManager.start_broadcast(db, data, current_user.id)
+    if broadcast.status != "completed":
+        background_tasks.add_task(_run_broadcast, broadcast.id)
+    
+    return broadcast
+
+
+@router.get("/broadcasts/{broadcast_id}", response_model=NotificationBroadcastResponse)
+def get_broadcast(
+    broadcast_id: UUID,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get broadcast progress.
+    Admin only.
+    """
+    broadcast = db.query(NotificationBroadcast).filter(NotificationBroadcast.id == broadcast_id).first()
+    if not broadcast:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Broadcast not found"
         )
-    ).count()
     
-    return {"unread_count": count}
+    return broadcast
 
 
 @router.get("/{notification_id}", response_model=NotificationResponse)
@@ -103,7 +271,7 @@ def get_notification(
     
     # Mark as read if it wasn't already
     if not notification.is_read:
-        notification.is_read = True
+        NotificationManager.set_read(db, notification, True)
         db.commit()
     
     return NotificationResponse(
@@ -139,7 +307,7 @@ def update_notification(
             detail="Notification not found"
         )
     
-    notification.is_read = update_data.is_read
+    NotificationManager.set_read(db, notification, update_data.is_read)
     db.commit()
     
     action = "marked as read" if update_data.is_read else "marked as unread"
@@ -177,7 +345,7 @@ def delete_notification(
             detail="Notification not found"
         )
     
-    db.delete(notification)
+    NotificationManager.delete_notification(db, notification)
     db.commit()
     
     return SuccessResponse(message="Notification deleted successfully")
@@ -196,13 +364,7 @@ def delete_multiple_notifications(
             detail="Cannot delete more than 50 notifications at once"
         )
     
-    deleted_count = db.query(Notification).filter(
-        and_(
-            Notification.id.in_(notification_ids),
-            Notification.user_id == current_user.id
-        )
-    ).delete(synchronize_session=False)
-    
+    deleted_count = NotificationManager.delete_notifications(db, current_user.id, notification_ids)
     db.commit()
     
     return SuccessResponse(message=f"Deleted {deleted_count} notifications")
@@ -289,40 +451,46 @@ def get_recent_notifications_summary(
     db: Session = Depends(get_db),
     days: int = 7
 ):
-    """Get summary of recent notifications"""
+    """Get summary of recent notifications (one aggregate query plus the latest 5)"""
     from datetime import timedelta
     
     since_date = datetime.now() - timedelta(days=days)
+    recent_filter = and_(
+        Notification.user_id == current_user.id,
+        Notification.created_at >= since_date
+    )
     
-    # Get notification counts by type
-    notifications = db.query(Notification).filter(
-        and_(
-            Notification.user_id == current_user.id,
-            Notification.created_at >= since_date
-        )
-    ).all()
+    # Counts by type, unread and high priority in one pass over the index range
+    type_rows = db.query(
+        Notification.notification_type,
+        func.count(Notification.id),
+        func.count(Notification.id).filter(Notification.is_read == False),
+        func.count(Notification.id).filter(Notification.priority == "high")
+    ).filter(recent_filter).group_by(Notification.notification_type).all()
     
-    # Group by type
     type_counts = {}
+    total_notifications = 0
     unread_count = 0
     high_priority_count = 0
+    for notification_type, total, unread, high_priority in type_rows:
+        type_counts[notification_type] = total
+        total_notifications += total
+        unread_count += unread
+        high_priority_count += high_priority
     
-    for notification in notifications:
-        notification_type = notification.notification_type
-        type_counts[notification_type] = type_counts.get(notification_type, 0) + 1
-        
-        if not notification.is_read:
-            unread_count += 1
-        
-        if notification.priority == "high":
-            high_priority_count += 1
-    
-    # Get most recent notifications
-    recent_notifications = sorted(notifications, key=lambda x: x.created_at, reverse=True)[:5]
+    # Most recent notifications
+    recent_notifications = db.query(
+        Notification.id,
+        Notification.notification_type,
+        Notification.title,
+        Notification.is_read,
+        Notification.priority,
+        Notification.created_at
+    ).filter(recent_filter).order_by(desc(Notification.created_at)).limit(5).all()
     
     return {
         "period_days": days,
-        "total_notifications": len(notifications),
+        "total_notifications": total_notifications,
         "unread_count": unread_count,
         "high_priority_count": high_priority_count,
         "type_breakdown": type_counts,
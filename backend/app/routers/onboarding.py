@@ -20,7 +20,7 @@ from schemas import (
 )
 from utils import OnboardingManager
 from analytics.event_tracker import EventTracker
-from services.hubspot import sync_contact_onboarding_complete
+from services.hubspot import queue_contact_onboarding_complete
 
 router = APIRouter()
 
@@ -170,6 +170,10 @@ def complete_step4_cities(
 
     onboarding.target_cities = step_data.target_cities
     onboarding.updated_at = datetime.now()
+
+    # Queue HubSpot sync (sent by the scheduler) in the same transaction as the
+    # answers: the next commit writes both or neither
+    queue_contact_onboarding_complete(db, current_user, onboarding)
     
     # Track location provided
     EventTracker.track_location_provided(db, current_user.id, ", ".join(step_data.target_cities))
@@ -183,13 +187,6 @@ def complete_step4_cities(
     if is_completed:
         EventTracker.track_onboarding_completed(db, current_user.id)
 
-    # Sync to HubSpot (non-blocking; failures are logged only)
-    if is_completed:
-        try:
-            sync_contact_onboarding_complete(current_user, completed_onboarding)
-        except Exception:
-            pass
-
     payload = OnboardingStatusPayload(
         user_id=current_user.id,
         completed=is_completed,
@@ -228,6 +225,9 @@ def complete_onboarding_all_at_once(
     onboarding.homeownership_timeline_months = onboarding_data.homeownership_timeline_months
     onboarding.target_cities = onboarding_data.target_cities
     onboarding.updated_at = datetime.now()
+
+    # Queue HubSpot sync (sent by the scheduler) with the field updates
+    queue_contact_onboarding_complete(db, current_user, onboarding)
     
     # Commit the field updates first
     db.commit()
@@ -237,13 +237,6 @@ def complete_onboarding_all_at_once(
     is_completed = bool(completed_onboarding.completed_at)
     step = 5 if is_completed else 4
 
-    # Sync to HubSpot when onboarding is complete (non-blocking; failures are logged only)
-    if is_completed:
-        try:
-            sync_contact_onboarding_complete(current_user, completed_onboarding)
-        except Exception:
-            pass
-
     payload = OnboardingStatusPayload(
         user_id=current_user.id,
         completed=is_completed,
@@ -3,9 +3,9 @@ from typing import List, Dict
 from uuid import UUID
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, Integer
+from sqlalchemy import and_, desc, func
 
 from database import get_db
 from auth import get_current_user, get_current_admin_user
@@ -18,7 +18,8 @@ from schemas import (
     QuizAnswerCreate, QuizQuestionResponse, QuizAnswerResponse
 )
 from utils import (
-    QuizManager, BadgeManager, ProgressManager, NotificationManager
+    QuizManager, BadgeManager, ProgressManager, NotificationManager, StatsManager,
+    LeaderboardManager
 )
 from analytics.event_tracker import EventTracker
 
@@ -181,6 +182,7 @@ def submit_quiz(
     )
     
     db.add(quiz_attempt)
+    StatsManager.record_quiz_attempt(db, current_user.id, score, passed)
     db.commit()
     db.refresh(quiz_attempt)
     
@@ -379,12 +381,25 @@ def get_quiz_statistics(
     db: Session = Depends(get_db)
 ):
     """Get user's overall quiz statistics"""
-    # Total attempts and scores
-    attempts = db.query(UserQuizAttempt).filter(
-        UserQuizAttempt.user_id == current_user.id
-    ).all()
+    # Counts, average, best score and quiz coin total in one aggregate query
+    quiz_coins = db.query(
+        func.coalesce(func.sum(UserCoinTransaction.amount), 0)
+    ).filter(
+        and_(
+            UserCoinTransaction.user_id == current_user.id,
+            UserCoinTransaction.source_type == "quiz_passed"
+        )
+    ).scalar_subquery()
+    
+    totals = db.query(
+        func.count(UserQuizAttempt.id).label("total_attempts"),
+        func.count(UserQuizAttempt.id).filter(UserQuizAttempt.passed == True).label("total_passed"),
+        func.avg(UserQuizAttempt.score).label("average_score"),
+        func.max(UserQuizAttempt.score).label("best_score"),
+        quiz_coins.label("total_coins_earned")
+    ).filter(UserQuizAttempt.user_id == current_user.id).one()
     
-    if not attempts:
+    if not totals.total_attempts:
         return {
             "total_attempts": 0,
             "total_passed": 0,
@@ -396,39 +411,34 @@ def get_quiz_statistics(
             "recent_attempts": []
         }
     
-    total_attempts = len(attempts)
-    passed_attempts = [a for a in attempts if a.passed]
-    total_passed = len(passed_attempts)
+    total_attempts = totals.total_attempts
+    total_passed = totals.total_passed
     total_failed = total_attempts - total_passed
     pass_rate = (total_passed / total_attempts * 100) if total_attempts > 0 else 0
     
-    average_score = sum(float(a.score) for a in attempts) / len(attempts)
-    best_score = max(float(a.score) for a in attempts)
-    
-    # Calculate coins earned from quizzes
-    quiz_coins = db.query(UserCoinTransaction).filter(
-        and_(
-            UserCoinTransaction.user_id == current_user.id,
-            UserCoinTransaction.source_type == "quiz_passed"
-        )
-    ).all()
-    total_coins_earned = sum(t.amount for t in quiz_coins)
-    
-    # Recent attempts (last 10)
-    recent_attempts = sorted(attempts, key=lambda x: x.completed_at, reverse=True)[:10]
+    # Recent attempts (last 10) with lesson titles in one joined query
+    recent_attempts = db.query(
+        UserQuizAttempt.id,
+        Lesson.title.label("lesson_title"),
+        UserQuizAttempt.score,
+        UserQuizAttempt.passed,
+        UserQuizAttempt.completed_at
+    ).join(Lesson, UserQuizAttempt.lesson_id == Lesson.id).filter(
+        UserQuizAttempt.user_id == current_user.id
+    ).order_by(desc(UserQuizAttempt.completed_at)).limit(10).all()
     
     return {
         "total_attempts": total_attempts,
         "total_passed": total_passed,
         "total_failed": total_failed,
         "pass_rate": round(pass_rate, 2),
-        "average_score": round(average_score, 2),
-        "best_score": round(best_score, 2),
-        "total_coins_earned": total_coins_earned,
+        "average_score": round(float(totals.average_score), 2),
+        "best_score": round(float(totals.best_score), 2),
+        "total_coins_earned": totals.total_coins_earned,
         "recent_attempts": [
             {
                 "id": attempt.id,
-                "lesson_title": attempt.lesson.title,
+                "lesson_title": attempt.lesson_title,
                 "score": float(attempt.score),
                 "passed": attempt.passed,
                 "completed_at": attempt.completed_at
@@ -442,50 +452,74 @@ def get_quiz_statistics(
 def get_quiz_leaderboard(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    limit: int = 20
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
 ):
-    """Get quiz leaderboard based on average scores"""
-    # This is a simplified leaderboard - you might want to implement more sophisticated ranking
-    # Calculate average scores for all users who have taken quizzes
-    from sqlalchemy import func
-    
-    leaderboard = db.query(
-        User.id,
-        User.first_name,
-        User.last_name,
-        func.avg(UserQuizAttempt.score).label('average_score'),
-        func.count(UserQuizAttempt.id).label('total_attempts'),
-        func.sum(UserQuizAttempt.passed.cast(Integer)).label('total_passed')
-    ).join(UserQuizAttempt).group_by(
-        User.id, User.first_name, User.last_name
-    ).order_by(
-        desc('average_score')
-    ).limit(limit).all()
-    
-    # Find current user's rank
-    user_rank = None
-    for i, entry in enumerate(leaderboard, 1):
-        if entry.id == current_user.id:
-            user_rank = i
-            break
+    """
+    Get quiz leaderboard based on average scores.
+    Served from the quiz_leaderboard materialized view (refreshed by the scheduler),
+    so the caller's rank is exact even when they are outside the requested page.
+    """
+    leaderboard = LeaderboardManager.get_page(db, offset=offset, limit=limit)
+    user_entry = LeaderboardManager.get_user_entry(db, current_user.id)
     
     return {
         "leaderboard": [
-            {
-                "rank": i + 1,
-                "user_id": entry.id,
-                "name": f"{entry.first_name} {entry.last_name}",
-                "average_score": round(float(entry.average_score), 2),
-                "total_attempts": entry.total_attempts,
-                "total_passed": entry.total_passed,
-                "is_current_user": entry.id == current_user.id
-            }
-            for i, entry in enumerate(leaderboard)
+            LeaderboardManager.serialize_entry(entry, current_user.id)
+            for entry in leaderboard
         ],
-        "current_user_rank": user_rank
+        "current_user_rank": user_entry.rank if user_entry else None,
+        "current_user": LeaderboardManager.serialize_entry(user_entry, current_user.id) if user_entry else None,
+        "total_ranked": LeaderboardManager.get_total_ranked(db),
+        "offset": offset,
+        "limit": limit,
+        "refreshed_at": user_entry.refreshed_at if user_entry else (
+            leaderboard[0].refreshed_at if leaderboard else None
+        )
     }
 
 
+@router.get("/leaderboard/around-me")
+def get_quiz_leaderboard_around_me(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    radius: int = Query(5, ge=1, le=50)
+):
+    """Get the leaderboard entries ranked within `radius` places of the current user"""
+    user_entry = LeaderboardManager.get_user_entry(db, current_user.id)
+    
+    if not user_entry:
+        return {
+            "leaderboard": [],
+            "current_user_rank": None,
+            "total_ranked": LeaderboardManager.get_total_ranked(db)
+        }
+    
+    window = LeaderboardManager.get_rank_range(
+        db, user_entry.rank - radius, user_entry.rank + radius
+    )
+    
+    return {
+        "leaderboard": [
+            LeaderboardManager.serialize_entry(entry, current_user.id)
+            for entry in window
+        ],
+        "current_user_rank": user_entry.rank,
+        "total_ranked": LeaderboardManager.get_total_ranked(db),
+        "refreshed_at": user_entry.refreshed_at
+    }
+
+
+@router.post("/leaderboard/refresh", response_model=SuccessResponse)
+def refresh_quiz_leaderboard(
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Refresh the quiz leaderboard immediately (admin only)"""
+    LeaderboardManager.refresh(db)
+    return SuccessResponse(message="Quiz leaderboard refreshed")
+
+
 @router.post("/questions", response_model=QuizQuestionResponse, status_code=status.HTTP_201_CREATED)
 def create_quiz_question(
     question_data: QuizQuestionCreate,
@@ -2,7 +2,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import List, Optional, Dict, Any
 from uuid import UUID
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field, model_validator, validator
 
 
 # ================================
@@ -77,6 +77,18 @@ class VerifyEmailRequest(BaseModel):
     code: str = Field(..., min_length=6, max_length=6, pattern=r"^\d+$")
 
 
+class UserDataWipeResponse(BaseSchema):
+    id: UUID
+    status: str
+    current_step: Optional[str]
+    rows_deleted: int
+    rows_detached: int
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+
+
 # ================================
 # ONBOARDING SCHEMAS
 # ================================
@@ -520,6 +532,9 @@ class FAQResponse(BaseSchema):
     category: Optional[str]
     order_index: int
     view_count: int
+    # Search results only: relevance and answer excerpt with matches in <mark>
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
 
 
 class SupportTicketCreate(BaseModel):
@@ -565,6 +580,46 @@ class NotificationUpdate(BaseModel):
     is_read: bool
 
 
+class BroadcastSegment(BaseModel):
+    """Audience filters for a broadcast; all given filters must match (active users only)"""
+    lead_temperatures: Optional[List[str]] = None  # e.g. ["hot_lead", "warm_lead"]
+    onboarding_completed: Optional[bool] = None
+    module_id: Optional[UUID] = None
+    module_status: Optional[str] = Field(None, pattern="^(not_started|in_progress|completed)$")
+
+    @model_validator(mode="after")
+    def validate_module_filter(self):
+        # One without the other would silently drop the module filter
+        if (self.module_id is None) != (self.module_status is None):
+            raise ValueError("module_id and module_status must be given together")
+        return self
+
+
+class NotificationBroadcastRequest(BaseModel):
+    broadcast_id: Optional[UUID] = None  # client-chosen id makes retries idempotent
+    notification_type: str = Field("system", max_length=50)
+    title: str = Field(..., min_length=1, max_length=255)
+    message: str = Field(..., min_length=1)
+    priority: str = Field("normal", pattern="^(low|normal|high)$")
+    expires_at: Optional[datetime] = None
+    segment: BroadcastSegment = Field(default_factory=BroadcastSegment)
+
+
+class NotificationBroadcastResponse(BaseSchema):
+    id: UUID
+    status: str
+    notification_type: str
+    title: str
+    segment: Optional[Dict[str, Any]]
+    total_recipients: int
+    processed_users: int
+    delivered_count: int
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+
+
 # ================================
 # MINI-GAME (GROW YOUR NEST) SCHEMAS
 # ================================
@@ -819,4 +874,12 @@ class RecalculationResponse(BaseModel):
     total_users: int
     successful: int
     failed: int
-    execution_time_seconds: float
\ No newline at end of file
+    execution_time_seconds: float
+
+
+class WeightSimulationRequest(BaseModel):
+    """Candidate scoring configuration for a what-if re-scoring run"""
+    signal_weights: Optional[Dict[str, float]] = None  # signal_id -> weight
+    dimension_weights: Optional[Dict[str, float]] = None  # dimension -> weight
+    temperature_thresholds: Optional[Dict[str, float]] = None  # temperature -> min composite
+    changed_users_limit: int = Field(100, ge=0, le=10000)
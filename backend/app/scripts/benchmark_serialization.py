@@ -0,0 +1,120 @@
+"""
+Compare JSON serialization paths on synthetic large payloads.
+Run manually: python scripts/benchmark_serialization.py [--repeat N]
+
+For each payload (module list, question bank, lead list) it times:
+- fastapi: FastAPI's default path (response_model serialization, then the
+  stdlib JSONResponse)
+- orjson: the same response_model serialization rendered by FastJSONResponse
+  (the app's default_response_class)
+- direct: json_model_response (pydantic-core straight to JSON bytes)
+No database required.
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+from uuid import uuid4
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from responses import FastJSONResponse, _adapter, json_model_response
+from schemas import LeadSummary, ModuleResponse
+
+
+def _modules(count=50):
+    now = datetime.now()
+    return [
+        ModuleResponse(
+            id=uuid4(), title=f"Module {i}", description="Homebuying basics " * 20,
+            thumbnail_url=f"https://cdn.example.com/modules/{i}.png", order_index=i,
+            is_active=True, prerequisite_module_id=None, estimated_duration_minutes=45,
+            difficulty_level="beginner", created_at=now, lesson_count=12,
+            progress_percentage=Decimal("41.67"), all_lessons_completed=False,
+            free_roam_available=False, tree_growth_points=120, tree_current_stage=2,
+            tree_completed=False
+        )
+        for i in range(count)
+    ]
+
+
+def _question_bank(count=300):
+    return {
+        "module": {"id": str(uuid4()), "title": "Module", "description": "x" * 200, "difficulty_level": "beginner"},
+        "total_questions": count,
+        "questions": [
+            {
+                "id": str(uuid4()), "lesson_id": str(uuid4()), "lesson_title": "Lesson",
+                "question_text": "What does a pre-approval letter tell a seller? " * 2,
+                "question_type": "multiple_choice", "order_index": i,
+                "answers": [
+                    {"id": str(uuid4()), "answer_text": f"Answer option {j}", "order_index": j}
+                    for j in range(4)
+                ]
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def _leads(count=500):
+    now = datetime.now()
+    return [
+        LeadSummary(
+            user_id=uuid4(), email=f"lead{i}@example.com", first_name="Test", last_name=f"Lead {i}",
+            composite_score=512.5, lead_temperature="warm_lead", temperature_label="Warm Lead",
+            intent_band="medium_intent", intent_label="Medium Intent", profile_completion_pct=75.0,
+            last_activity_at=now - timedelta(hours=i), created_at=now - timedelta(days=i)
+        )
+        for i in range(count)
+    ]
+
+
+def _fastapi_default(content, model_type):
+    # FastAPI 0.104 serializes a response_model with mode="json" before rendering
+    return JSONResponse(_adapter(model_type).dump_python(content, mode="json")).body
+
+
+def _orjson(content, model_type):
+    return FastJSONResponse(_adapter(model_type).dump_python(content, mode="json")).body
+
+
+def _direct(content, model_type):
+    return json_model_response(content, model_type).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON response serialization")
+    parser.add_argument("--repeat", type=int, default=200, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    payloads = [
+        ("modules x50", _modules(), List[ModuleResponse]),
+        ("leads x500", _leads(), List[LeadSummary]),
+    ]
+    paths = [("fastapi", _fastapi_default), ("orjson", _orjson), ("direct", _direct)]
+
+    print(f"{'payload':<22}{'path':<10}{'ms/response':>12}{'bytes':>10}")
+    for name, content, model_type in payloads:
+        for path, render in paths:
+            seconds = timeit.timeit(lambda: render(content, model_type), number=args.repeat)
+            size = len(render(content, model_type))
+            print(f"{name:<22}{path:<10}{seconds * 1000 / args.repeat:>12.3f}{size:>10}")
+
+    # Plain dict payload (no response_model): jsonable_encoder, then render
+    bank = _question_bank()
+    for path, response_class in (("fastapi", JSONResponse), ("orjson", FastJSONResponse)):
+        seconds = timeit.timeit(lambda: response_class(jsonable_encoder(bank)).body, number=args.repeat)
+        size = len(response_class(jsonable_encoder(bank)).body)
+        print(f"{'question bank x300':<22}{path:<10}{seconds * 1000 / args.repeat:>12.3f}{size:>10}")
+
+
+if __name__ == "__main__":
+    main()
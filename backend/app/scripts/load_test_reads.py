@@ -0,0 +1,105 @@
+"""
+Load test for the hot read endpoints (async engine vs the sync threadpool).
+Run manually against a running API:
+
+    python scripts/load_test_reads.py --base-url http://localhost:8000 \
+        --token <access token> --concurrency 500 --duration 30 [--module-id UUID]
+
+Each of --concurrency clients loops over the endpoints below for --duration
+seconds over one shared connection pool, then throughput and latency
+percentiles are printed per endpoint. Run it once against a build before the
+async endpoints and once after (same database, same uvicorn worker count) to
+compare. The user behind --token must have completed onboarding (and the
+lessons of --module-id for the question endpoint).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+ENDPOINTS = [
+    "/api/notifications/",
+    "/api/notifications/unread-count",
+    "/api/learning/modules",
+    "/api/dashboard/overview",
+    "/api/dashboard/statistics",
+]
+MODULE_ENDPOINTS = [
+    "/api/grow-your-nest/module/{module_id}",
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _client_loop(client, paths, deadline, latencies, errors):
+    i = 0
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - started
+        if ok:
+            latencies[path].append(elapsed)
+        else:
+            errors[path] += 1
+
+
+async def run(base_url, token, concurrency, duration, module_id):
+    paths = list(ENDPOINTS)
+    if module_id:
+        paths += [path.format(module_id=module_id) for path in MODULE_ENDPOINTS]
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={"Authorization": f"Bearer {token}"}, limits=limits, timeout=60.0
+    ) as client:
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*(
+            _client_loop(client, paths[i % len(paths):] + paths[:i % len(paths)], deadline, latencies, errors)
+            for i in range(concurrency)
+        ))
+
+    print(f"{concurrency} clients, {duration}s against {base_url}")
+    print(f"{'endpoint':<48}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    total = 0
+    for path in paths:
+        values = latencies[path]
+        total += len(values)
+        if not values:
+            print(f"{path:<48}{0:>9}{'-':>9}{'-':>9}{'-':>9}{errors[path]:>8}")
+            continue
+        print(
+            f"{path:<48}{len(values) / duration:>9.1f}"
+            f"{statistics.median(values) * 1000:>9.1f}"
+            f"{_percentile(values, 95) * 1000:>9.1f}"
+            f"{_percentile(values, 99) * 1000:>9.1f}{errors[path]:>8}"
+        )
+    print(f"{'total':<48}{total / duration:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the hot read endpoints")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Access token of an onboarded test user")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=int, default=30, help="Seconds")
+    parser.add_argument("--module-id", help="Module whose lessons the user completed (question endpoint)")
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.token, args.concurrency, args.duration, args.module_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Rebuild the user_stats summary table from the raw progress, coin, badge and quiz tables.
+Run manually: python scripts/rebuild_user_stats.py [--user-id UUID] [--verify]
+
+Without --verify, every row is rebuilt and committed (use after deploying the
+user_stats migration to backfill, or to repair drift). With --verify, rows are
+rebuilt inside a transaction that is rolled back, and any counter that differs
+from the stored row is reported; the exit code is 1 if drift was found.
+"""
+import argparse
+import os
+import sys
+from uuid import UUID
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from models import User, UserStats
+from utils import StatsManager
+
+COMPARED_FIELDS = [
+    "coins_current",
+    "coins_lifetime_earned",
+    "coins_lifetime_spent",
+    "badges_earned",
+    "lessons_completed",
+    "modules_completed",
+    "quizzes_taken",
+    "quizzes_passed",
+    "quiz_score_total",
+]
+
+
+def _snapshot(stats):
+    if stats is None:
+        return None
+    return {field: getattr(stats, field) for field in COMPARED_FIELDS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild user_stats from the raw tables")
+    parser.add_argument("--user-id", type=UUID, help="Only rebuild this user")
+    parser.add_argument("--verify", action="store_true", help="Report drift without writing")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        query = db.query(User.id)
+        if args.user_id:
+            query = query.filter(User.id == args.user_id)
+        user_ids = [row.id for row in query.all()]
+
+        print(f"📊 {'Verifying' if args.verify else 'Rebuilding'} stats for {len(user_ids)} user(s)...")
+
+        drifted = 0
+        for user_id in user_ids:
+            stored = _snapshot(db.query(UserStats).filter(UserStats.user_id == user_id).first())
+            rebuilt = _snapshot(StatsManager.rebuild_user_stats(db, user_id))
+
+            if stored is not None and stored != rebuilt:
+                drifted += 1
+                diffs = ", ".join(
+                    f"{field}: {stored[field]} -> {rebuilt[field]}"
+                    for field in COMPARED_FIELDS
+                    if stored[field] != rebuilt[field]
+                )
+                print(f"  ⚠️  {user_id}: {diffs}")
+
+            if args.verify:
+                db.rollback()
+            else:
+                db.commit()
+
+        print(f"✅ Done. {drifted} row(s) differed from the raw tables.")
+        if args.verify and drifted:
+            sys.exit(1)
+
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Error rebuilding user stats: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
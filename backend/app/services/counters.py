@@ -0,0 +1,202 @@
+"""
+Coalesced view / download counters.
+
+Read endpoints record increments in a per-process buffer instead of updating
+the counted row in their own transaction. A background thread flushes the
+buffer every COUNTER_FLUSH_SECONDS (or sooner once COUNTER_FLUSH_MAX_KEYS rows
+are pending) with one statement per counter column:
+
+    UPDATE faqs SET view_count = faqs.view_count + v.delta
+    FROM (VALUES (:id, :delta), ...) AS v (id, delta) WHERE faqs.id = v.id
+
+so a popular row is written once per flush instead of once per request and
+readers never wait on its row lock. Counts are approximate by design: at most
+one flush interval of increments is lost if the process dies; a failed flush
+puts its deltas back for the next attempt.
+
+Under the lambda profile the flusher thread would be frozen with the container
+between invocations, so COUNTER_FLUSH_MODE defaults to "request": no thread is
+started and app.py flushes the buffer at the end of each request instead.
+"""
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import Integer, column, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from models import FAQ, MaterialResource
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FLUSH_SECONDS = float(os.getenv("COUNTER_FLUSH_SECONDS", "5"))
+COUNTER_FLUSH_MAX_KEYS = 1000
+# Same detection as APP_PROFILE in app.py
+_LAMBDA_PROFILE = os.getenv(
+    "APP_PROFILE", "lambda" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "server"
+).lower() == "lambda"
+# "thread": background flusher; "request": flushed at the end of each request
+COUNTER_FLUSH_MODE = os.getenv("COUNTER_FLUSH_MODE", "request" if _LAMBDA_PROFILE else "thread").lower()
+COUNTER_FLUSH_MODES = ("thread", "request")
+
+# Counter name -> counted column
+COUNTER_COLUMNS = {
+    "faq_views": FAQ.view_count,
+    "material_downloads": MaterialResource.download_count,
+}
+
+
+def build_flush_statement(counter: str, deltas: Dict[UUID, int]):
+    """UPDATE ... FROM (VALUES ...) adding each delta to its row's counter"""
+    target = COUNTER_COLUMNS[counter]
+    model = target.class_
+    batch = values(
+        column("id", PG_UUID(as_uuid=True)), column("delta", Integer), name="v"
+    ).data(list(deltas.items()))
+    assignments = {target.key: target + batch.c.delta}
+    if hasattr(model, "updated_at"):
+        # A view or download is not an edit: keep updated_at as it is
+        assignments["updated_at"] = model.updated_at
+    return update(model).where(model.id == batch.c.id).values(assignments).execution_options(
+        synchronize_session=False
+    )
+
+
+class CounterBuffer:
+    """Thread-safe per-process buffer of pending counter increments"""
+
+    def __init__(
+        self,
+        flush_seconds: float = COUNTER_FLUSH_SECONDS,
+        max_keys: int = COUNTER_FLUSH_MAX_KEYS,
+        session_factory: Optional[Callable[[], Session]] = None,
+        flush_mode: str = COUNTER_FLUSH_MODE,
+    ):
+        self.flush_seconds = flush_seconds
+        self.flush_mode = flush_mode
+        self.max_keys = max_keys
+        self._session_factory = session_factory
+        self._pending: Dict[str, Dict[UUID, int]] = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    # ----- producer -----
+
+    def increment(self, counter: str, row_id: UUID, amount: int = 1) -> None:
+        if counter not in COUNTER_COLUMNS:
+            raise ValueError(f"Unknown counter: {counter}")
+        with self._lock:
+            self._pending[counter][row_id] += amount
+            pending_keys = sum(len(deltas) for deltas in self._pending.values())
+        if self.flush_mode != "thread":
+            return
+        self.start()
+        if pending_keys >= self.max_keys:
+            self._wake.set()
+
+    def pending(self, counter: str, row_id: UUID) -> int:
+        """Increments for a row not yet flushed (added to counts shown to the caller)"""
+        with self._lock:
+            deltas = self._pending.get(counter)
+            return deltas.get(row_id, 0) if deltas else 0
+
+    # ----- flushing -----
+
+    def flush(self) -> int:
+        """Write all pending increments; returns the number of rows updated"""
+        with self._flush_lock:
+            with self._lock:
+                batch = {counter: dict(deltas) for counter, deltas in self._pending.items() if deltas}
+                self._pending.clear()
+            if not batch:
+                return 0
+
+            db = self._open_session()
+            try:
+                updated = 0
+                for counter, deltas in batch.items():
+                    updated += db.execute(build_flush_statement(counter, deltas)).rowcount
+                db.commit()
+                return updated
+            except Exception:
+                db.rollback()
+                self._restore(batch)
+                raise
+            finally:
+                db.close()
+
+    def flush_request(self) -> None:
+        """End-of-request flush (request mode); a failure keeps the deltas for the next request"""
+        if self.flush_mode != "request":
+            return
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning("Counter flush failed, retrying after the next request: %s", e)
+
+    def _restore(self, batch: Dict[str, Dict[UUID, int]]) -> None:
+        with self._lock:
+            for counter, deltas in batch.items():
+                for row_id, delta in deltas.items():
+                    self._pending[counter][row_id] += delta
+
+    def _open_session(self) -> Session:
+        if self._session_factory is None:
+            from database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ----- lifecycle -----
+
+    def start(self) -> None:
+        """Start the flush thread (done lazily on first increment)"""
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._stopping.clear()
+            self._flusher = threading.Thread(target=self._run, name="counter-flusher", daemon=True)
+            self._flusher.start()
+
+    def shutdown(self) -> None:
+        """Stop the flush thread and write what is pending"""
+        self._stopping.set()
+        self._wake.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5.0)
+            self._flusher = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error("Final counter flush failed: %s", e)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            if self._stopping.is_set():
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Counter flush failed, retrying next interval: %s", e)
+
+
+# Global buffer (one per worker process)
+counter_buffer = CounterBuffer()
+
+
+def record_faq_view(faq_id: UUID) -> None:
+    counter_buffer.increment("faq_views", faq_id)
+
+
+def record_material_download(material_id: UUID) -> None:
+    counter_buffer.increment("material_downloads", material_id)
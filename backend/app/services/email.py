@@ -1,35 +1,92 @@
 """Email sending via Amazon SES."""
 import logging
 import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Tuple
 
-import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 
 logger = logging.getLogger(__name__)
 
 SES_FROM_EMAIL = os.getenv("SES_FROM_EMAIL")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+# "ses" (default) or "stub" to record messages in memory instead of calling AWS
+EMAIL_TRANSPORT = os.getenv("EMAIL_TRANSPORT", "ses").lower()
+# One client is shared by every sender thread; size its connection pool to match
+SES_MAX_POOL_CONNECTIONS = int(os.getenv("SES_MAX_POOL_CONNECTIONS", "10"))
+
+# SES error codes worth retrying; anything else (MessageRejected, ...) is permanent
+RETRYABLE_SES_ERRORS = {
+    "Throttling",
+    "ThrottlingException",
+    "ServiceUnavailable",
+    "InternalFailure",
+    "RequestTimeout",
+}
 
 # Lazy client so env/credentials can be set after import
 _ses_client = None
+_ses_client_lock = threading.Lock()
+
+
+class EmailDeliveryError(Exception):
+    """SES send failed; retryable tells the dispatcher whether to try again"""
+
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class StubSESClient:
+    """
+    Offline stand-in for the boto3 SES client (EMAIL_TRANSPORT=stub and tests).
+    Records every send_email call; latency simulates a slow SES round trip.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def send_email(self, **kwargs) -> Dict[str, str]:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.sent.append(kwargs)
+        return {"MessageId": str(uuid.uuid4())}
 
 
 def _get_ses_client():
     global _ses_client
     if _ses_client is None:
-        _ses_client = boto3.client("ses", region_name=AWS_REGION)
+        with _ses_client_lock:
+            if _ses_client is None:
+                if EMAIL_TRANSPORT == "stub":
+                    _ses_client = StubSESClient()
+                else:
+                    # boto3 is slow to import; only load it for the first real send
+                    import boto3
+                    from botocore.config import Config
+
+                    _ses_client = boto3.client(
+                        "ses",
+                        region_name=AWS_REGION,
+                        config=Config(
+                            max_pool_connections=SES_MAX_POOL_CONNECTIONS,
+                            retries={"mode": "standard"},
+                        ),
+                    )
     return _ses_client
 
 
-def send_verification_email(to_email: str, code: str) -> bool:
-    """
-    Send a 6-digit verification code email via SES.
-    Returns True on success, False on failure (logs exception).
-    """
-    if not SES_FROM_EMAIL:
-        logger.warning("SES_FROM_EMAIL not set; skipping verification email")
-        return False
+# ================================
+# MESSAGES
+# ================================
 
+def build_verification_message(code: str) -> Tuple[str, str, str]:
+    """Subject, text and HTML body of the verification code email"""
     subject = "Your verification code"
     body_text = f"Your verification code is: {code}\n\nIt expires in 15 minutes.\n\nIf you didn't request this, you can ignore this email."
     body_html = (
@@ -37,20 +94,88 @@ def send_verification_email(to_email: str, code: str) -> bool:
         f"<p>It expires in 15 minutes.</p>"
         "<p>If you didn't request this, you can ignore this email.</p>"
     )
+    return subject, body_text, body_html
 
-    try:
-        client = _get_ses_client()
-        client.send_email(
-            Source=SES_FROM_EMAIL,
-            Destination={"ToAddresses": [to_email]},
-            Message={
-                "Subject": {"Data": subject, "Charset": "UTF-8"},
-                "Body": {
-                    "Text": {"Data": body_text, "Charset": "UTF-8"},
-                    "Html": {"Data": body_html, "Charset": "UTF-8"},
-                },
+
+def build_password_reset_message(reset_link: str) -> Tuple[str, str, str]:
+    """Subject, text and HTML body of the password reset email"""
+    subject = "Reset your NestNavigate password"
+    body_text = (
+        "You requested a password reset. Click the link below to set a new password:\n\n"
+        f"{reset_link}\n\n"
+        "This link expires in 1 hour. If you didn't request this, you can ignore this email.\n\n"
+        "— The NestNavigate Team"
+    )
+    body_html = (
+        "<p>You requested a password reset. Click the link below to set a new password:</p>"
+        f'<p><a href="{reset_link}" style="color:#2563eb;">Reset password</a></p>'
+        "<p>This link expires in 1 hour. If you didn't request this, you can ignore this email.</p>"
+        "<p>— The NestNavigate Team</p>"
+    )
+    return subject, body_text, body_html
+
+
+# Email kinds accepted by deliver_email() and the dispatch queue
+EMAIL_BUILDERS = {
+    "verification": lambda params: build_verification_message(params["code"]),
+    "password_reset": lambda params: build_password_reset_message(params["reset_link"]),
+}
+
+
+def _send_ses_email(to_email: str, subject: str, body_text: str, body_html: str) -> None:
+    """Single SES send_email call; raises ClientError / BotoCoreError"""
+    client = _get_ses_client()
+    client.send_email(
+        Source=SES_FROM_EMAIL,
+        Destination={"ToAddresses": [to_email]},
+        Message={
+            "Subject": {"Data": subject, "Charset": "UTF-8"},
+            "Body": {
+                "Text": {"Data": body_text, "Charset": "UTF-8"},
+                "Html": {"Data": body_html, "Charset": "UTF-8"},
             },
-        )
+        },
+    )
+
+
+def deliver_email(kind: str, to_email: str, params: Dict[str, Any]) -> bool:
+    """
+    Send one email of the given kind (used by the dispatch queue workers).
+    Returns False when SES_FROM_EMAIL is not set (nothing to retry).
+    Raises EmailDeliveryError on SES failure.
+    """
+    if not SES_FROM_EMAIL:
+        logger.warning("SES_FROM_EMAIL not set; skipping %s email", kind)
+        return False
+
+    subject, body_text, body_html = EMAIL_BUILDERS[kind](params)
+    try:
+        _send_ses_email(to_email, subject, body_text, body_html)
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code", "")
+        raise EmailDeliveryError(f"{code}: {e}", retryable=code in RETRYABLE_SES_ERRORS) from e
+    except BotoCoreError as e:
+        # Connection / timeout errors
+        raise EmailDeliveryError(str(e), retryable=True) from e
+    logger.info("%s email sent to %s", kind, to_email)
+    return True
+
+
+# ================================
+# DIRECT SENDS
+# ================================
+
+def send_verification_email(to_email: str, code: str) -> bool:
+    """
+    Send a 6-digit verification code email via SES.
+    Returns True on success, False on failure (logs exception).
+    """
+    if not SES_FROM_EMAIL:
+        logger.warning("SES_FROM_EMAIL not set; skipping verification email")
+        return False
+
+    try:
+        _send_ses_email(to_email, *build_verification_message(code))
         logger.info("Verification email sent to %s", to_email)
         return True
     except ClientError as e:
@@ -67,33 +192,8 @@ def send_password_reset_email(to_email: str, reset_link: str) -> bool:
         logger.warning("SES_FROM_EMAIL not set; skipping password reset email")
         return False
 
-    subject = "Reset your NestNavigate password"
-    body_text = (
-        "You requested a password reset. Click the link below to set a new password:\n\n"
-        f"{reset_link}\n\n"
-        "This link expires in 1 hour. If you didn't request this, you can ignore this email.\n\n"
-        "— The NestNavigate Team"
-    )
-    body_html = (
-        "<p>You requested a password reset. Click the link below to set a new password:</p>"
-        f'<p><a href="{reset_link}" style="color:#2563eb;">Reset password</a></p>'
-        "<p>This link expires in 1 hour. If you didn't request this, you can ignore this email.</p>"
-        "<p>— The NestNavigate Team</p>"
-    )
-
     try:
-        client = _get_ses_client()
-        client.send_email(
-            Source=SES_FROM_EMAIL,
-            Destination={"ToAddresses": [to_email]},
-            Message={
-                "Subject": {"Data": subject, "Charset": "UTF-8"},
-                "Body": {
-                    "Text": {"Data": body_text, "Charset": "UTF-8"},
-                    "Html": {"Data": body_html, "Charset": "UTF-8"},
-                },
-            },
-        )
+        _send_ses_email(to_email, *build_password_reset_message(reset_link))
         logger.info("Password reset email sent to %s", to_email)
         return True
     except ClientError as e:
@@ -0,0 +1,282 @@
+"""
+Email dispatch queue.
+
+Auth endpoints enqueue transactional emails and return immediately; a small
+pool of sender threads delivers them through the shared SES client.
+
+- Bounded queue: when EMAIL_QUEUE_MAX_SIZE messages are waiting, the caller
+  sends inline instead, so emails are never dropped.
+- Per-recipient coalescing: a message queued for the same (kind, recipient)
+  while an earlier one is still waiting replaces it, so rapid resend requests
+  send only the latest code.
+- Retries: throttling / transient SES errors are retried with exponential
+  backoff, unless a newer message for the recipient supersedes the failed one.
+- Metrics: counters plus queue wait and SES send latency percentiles.
+
+EMAIL_DISPATCH_BACKEND=thread (default) runs the senders in-process;
+EMAIL_DISPATCH_BACKEND=celery hands each message to the
+analytics.scheduler.celery_send_email task instead (coalescing is then
+per API process, retries are done by Celery). EMAIL_DISPATCH_BACKEND=inline
+sends during the request, with the same retries; it is the default under the
+lambda profile, where the container is frozen as soon as the response is
+returned and sender threads would not run until a later invocation.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from services import email as email_service
+
+logger = logging.getLogger(__name__)
+
+# Same detection as APP_PROFILE in app.py
+_LAMBDA_PROFILE = os.getenv(
+    "APP_PROFILE", "lambda" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "server"
+).lower() == "lambda"
+EMAIL_DISPATCH_BACKEND = os.getenv(
+    "EMAIL_DISPATCH_BACKEND", "inline" if _LAMBDA_PROFILE else "thread"
+).lower()
+EMAIL_DISPATCH_BACKENDS = ("thread", "celery", "inline")
+EMAIL_SENDER_WORKERS = int(os.getenv("EMAIL_SENDER_WORKERS", "4"))
+EMAIL_QUEUE_MAX_SIZE = int(os.getenv("EMAIL_QUEUE_MAX_SIZE", "1000"))
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_BASE_SECONDS = 1.0
+EMAIL_RETRY_MAX_SECONDS = 60.0
+# Latency samples kept for percentiles
+EMAIL_LATENCY_SAMPLES = 1000
+
+
+@dataclass
+class _QueuedEmail:
+    kind: str
+    to_email: str
+    params: Dict[str, Any]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+def _percentiles(samples) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+class EmailDispatcher:
+    """Bounded, coalescing email queue drained by a pool of sender threads"""
+
+    def __init__(
+        self,
+        workers: int = EMAIL_SENDER_WORKERS,
+        max_queue_size: int = EMAIL_QUEUE_MAX_SIZE,
+        max_attempts: int = EMAIL_MAX_ATTEMPTS,
+        retry_base_seconds: float = EMAIL_RETRY_BASE_SECONDS,
+        deliver: Optional[Callable[[str, str, Dict[str, Any]], bool]] = None,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self._deliver = deliver or email_service.deliver_email
+        self._queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(maxsize=max_queue_size)
+        self._pending: Dict[Tuple[str, str], _QueuedEmail] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._threads: list = []
+        self._counters = {
+            "enqueued": 0, "coalesced": 0, "sent": 0, "skipped": 0,
+            "retried": 0, "superseded": 0, "failed": 0, "sent_inline": 0,
+        }
+        self._wait_seconds: deque = deque(maxlen=EMAIL_LATENCY_SAMPLES)
+        self._send_seconds: deque = deque(maxlen=EMAIL_LATENCY_SAMPLES)
+
+    # ----- lifecycle -----
+
+    def start(self) -> None:
+        """Start the sender threads (done lazily on first enqueue)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"email-sender-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info("Email dispatcher started with %s sender threads", self.workers)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued message has been processed; True if drained"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._queue.unfinished_tasks == 0:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Send what is queued, then stop the sender threads"""
+        if not self._threads:
+            return
+        self.flush(timeout)
+        self._stopping.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+        logger.info("Email dispatcher stopped")
+
+    # ----- producer -----
+
+    def enqueue(self, kind: str, to_email: str, params: Dict[str, Any]) -> bool:
+        """
+        Queue an email. Returns True when queued (or coalesced into a waiting
+        message), False when the queue was full and the email was sent inline.
+        """
+        if kind not in email_service.EMAIL_BUILDERS:
+            raise ValueError(f"Unknown email kind: {kind}")
+        if not self._threads:
+            self.start()
+
+        key = (kind, to_email.strip().lower())
+        with self._lock:
+            waiting = self._pending.get(key)
+            if waiting is not None:
+                # Keep the original enqueue time so wait latency covers the whole delay
+                waiting.params = params
+                waiting.to_email = to_email
+                self._counters["coalesced"] += 1
+                return True
+            try:
+                self._queue.put_nowait(key)
+            except queue.Full:
+                full = True
+            else:
+                full = False
+                self._pending[key] = _QueuedEmail(kind, to_email, params)
+                self._counters["enqueued"] += 1
+
+        if full:
+            logger.warning("Email queue full (%s); sending %s email inline", self._queue.maxsize, kind)
+            self._count("sent_inline")
+            self._send(_QueuedEmail(kind, to_email, params), key=None)
+            return False
+        return True
+
+    def send_inline(self, kind: str, to_email: str, params: Dict[str, Any]) -> None:
+        """Send now in the calling thread (inline backend), with the same retries"""
+        if kind not in email_service.EMAIL_BUILDERS:
+            raise ValueError(f"Unknown email kind: {kind}")
+        self._count("sent_inline")
+        self._send(_QueuedEmail(kind, to_email, params), key=None)
+
+    # ----- workers -----
+
+    def _run(self) -> None:
+        while True:
+            key = self._queue.get()
+            try:
+                if key is None:
+                    return
+                with self._lock:
+                    message = self._pending.pop(key, None)
+                if message is not None:
+                    self._record(self._wait_seconds, time.monotonic() - message.enqueued_at)
+                    self._send(message, key)
+            except Exception:
+                logger.exception("Email sender thread error")
+            finally:
+                self._queue.task_done()
+
+    def _send(self, message: _QueuedEmail, key: Optional[Tuple[str, str]]) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            start = time.monotonic()
+            try:
+                delivered = self._deliver(message.kind, message.to_email, message.params)
+            except email_service.EmailDeliveryError as e:
+                self._record(self._send_seconds, time.monotonic() - start)
+                if not e.retryable or attempt == self.max_attempts:
+                    self._count("failed")
+                    logger.error("%s email to %s failed after %s attempts: %s",
+                                 message.kind, message.to_email, attempt, e)
+                    return
+                if key is not None:
+                    with self._lock:
+                        superseded = key in self._pending
+                    if superseded:
+                        # A newer message for this recipient is already queued
+                        self._count("superseded")
+                        return
+                self._count("retried")
+                delay = min(self.retry_base_seconds * 2 ** (attempt - 1), EMAIL_RETRY_MAX_SECONDS)
+                # Shutdown cuts the wait short; remaining attempts run immediately
+                self._stopping.wait(delay)
+                continue
+
+            self._record(self._send_seconds, time.monotonic() - start)
+            self._count("sent" if delivered else "skipped")
+            return
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _record(self, samples: deque, seconds: float) -> None:
+        with self._lock:
+            samples.append(seconds)
+
+    # ----- metrics -----
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters, queue depth and latency percentiles (milliseconds)"""
+        with self._lock:
+            return {
+                "backend": EMAIL_DISPATCH_BACKEND,
+                "workers": len(self._threads),
+                "queue_depth": self._queue.qsize(),
+                "queue_max_size": self._queue.maxsize,
+                **self._counters,
+                "queue_wait": _percentiles(self._wait_seconds),
+                "send_latency": _percentiles(self._send_seconds),
+            }
+
+
+# Global dispatcher instance
+email_dispatcher = EmailDispatcher()
+
+
+def dispatch_email(kind: str, to_email: str, params: Dict[str, Any]) -> None:
+    """Hand an email to the configured backend; never raises"""
+    try:
+        backend = EMAIL_DISPATCH_BACKEND
+        if backend == "celery":
+            from analytics.scheduler import CELERY_AVAILABLE
+            if CELERY_AVAILABLE:
+                from analytics.scheduler import celery_send_email
+                celery_send_email.delay(kind, to_email, params)
+                return
+            backend = "inline" if _LAMBDA_PROFILE else "thread"
+            logger.warning("EMAIL_DISPATCH_BACKEND=celery but Celery is not available; using %s", backend)
+        if backend == "inline":
+            email_dispatcher.send_inline(kind, to_email, params)
+        else:
+            email_dispatcher.enqueue(kind, to_email, params)
+    except Exception as e:
+        logger.exception("Failed to dispatch %s email to %s: %s", kind, to_email, e)
+
+
+def queue_verification_email(to_email: str, code: str) -> None:
+    """Queue the 6-digit verification code email"""
+    dispatch_email("verification", to_email, {"code": code})
+
+
+def queue_password_reset_email(to_email: str, reset_link: str) -> None:
+    """Queue the password reset link email"""
+    dispatch_email("password_reset", to_email, {"reset_link": reset_link})
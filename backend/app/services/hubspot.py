@@ -4,202 +4,344 @@ HubSpot CRM integration for Nest Navigate.
 Syncs new users to HubSpot on registration and updates contacts with onboarding
 data when onboarding is completed. Requires HUBSPOT_ACCESS_TOKEN (Private App).
 If the token is not set, all sync calls are no-ops.
+
+Syncs never call HubSpot on the request path: registration and onboarding add a
+HubSpotOutbox row in their own transaction, and the scheduler drains pending
+rows with drain_outbox(), sending up to 100 contacts per batch upsert call over
+one pooled client and retrying failures with exponential backoff.
 """
 import logging
-from typing import Any, Dict, Optional
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
 
-import httpx
+from models import User, UserOnboarding, HubSpotOutbox
 
-from models import User, UserOnboarding
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
-HUBSPOT_API_BASE = "https://api.hubapi.com"
-HUBSPOT_CONTACTS_SEARCH = f"{HUBSPOT_API_BASE}/crm/v3/objects/contacts/search"
-HUBSPOT_CONTACTS_CREATE = f"{HUBSPOT_API_BASE}/crm/v3/objects/contacts"
-HUBSPOT_CONTACTS_UPDATE = f"{HUBSPOT_API_BASE}/crm/v3/objects/contacts"
+HUBSPOT_API_BASE = os.getenv("HUBSPOT_API_BASE", "https://api.hubapi.com")
+HUBSPOT_CONTACTS_BATCH_UPSERT = "/crm/v3/objects/contacts/batch/upsert"
+
+# HubSpot batch endpoints accept at most 100 inputs per call
+OUTBOX_BATCH_SIZE = 100
+# Batches drained per scheduler run
+OUTBOX_MAX_BATCHES = 10
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BASE_SECONDS = 30
+OUTBOX_RETRY_MAX_SECONDS = 3600
+# Sent rows are kept this long for troubleshooting
+OUTBOX_SENT_RETENTION_DAYS = 7
+
+# httpx is imported on first use (keeps it out of API cold starts)
+_client: Optional["httpx.Client"] = None
+_client_lock = threading.Lock()
 
 
 def _get_access_token() -> Optional[str]:
-    import os
     token = os.getenv("HUBSPOT_ACCESS_TOKEN", "").strip()
     return token if token else None
 
 
-def _search_contact_by_email(email: str) -> Optional[str]:
-    """Return HubSpot contact ID if found, else None."""
-    token = _get_access_token()
-    if not token:
-        return None
-    payload = {
-        "filterGroups": [
-            {
-                "filters": [
-                    {"propertyName": "email", "operator": "EQ", "value": email}
-                ]
-            }
-        ]
-    }
-    try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.post(
-                HUBSPOT_CONTACTS_SEARCH,
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                },
+def _get_client() -> "httpx.Client":
+    """Shared HubSpot client; keeps connections alive across batches"""
+    global _client
+    import httpx
+
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                base_url=HUBSPOT_API_BASE,
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=5, max_keepalive_connections=5),
             )
-            if resp.status_code != 200:
-                logger.warning("HubSpot search failed: %s %s", resp.status_code, resp.text)
-                return None
-            data = resp.json()
-            results = data.get("results") or []
-            if not results:
-                return None
-            return str(results[0].get("id"))
-    except Exception as e:
-        logger.exception("HubSpot search error for %s: %s", email, e)
-        return None
+        return _client
 
 
-def _create_contact(properties: Dict[str, Any]) -> bool:
-    token = _get_access_token()
-    if not token:
-        return False
-    payload = {"properties": properties}
-    try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.post(
-                HUBSPOT_CONTACTS_CREATE,
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                },
-            )
-            if resp.status_code in (200, 201):
-                logger.info("HubSpot contact created for %s", properties.get("email"))
-                return True
-            logger.warning("HubSpot create failed: %s %s", resp.status_code, resp.text)
-            return False
-    except Exception as e:
-        logger.exception("HubSpot create error: %s", e)
-        return False
+def close_client() -> None:
+    """Close the shared client (shutdown / tests)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
 
 
-def _update_contact(contact_id: str, properties: Dict[str, Any]) -> bool:
-    token = _get_access_token()
-    if not token:
-        return False
-    url = f"{HUBSPOT_CONTACTS_UPDATE}/{contact_id}"
-    payload = {"properties": properties}
-    try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.patch(
-                url,
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                },
-            )
-            if resp.status_code == 200:
-                logger.info("HubSpot contact updated: %s", contact_id)
-                return True
-            logger.warning("HubSpot update failed: %s %s", resp.status_code, resp.text)
-            return False
-    except Exception as e:
-        logger.exception("HubSpot update error for %s: %s", contact_id, e)
-        return False
+# ================================
+# CONTACT PROPERTIES
+# ================================
+
+def build_register_properties(user: User) -> Dict[str, Any]:
+    """Core profile fields, nest_navigate_user_id and marketing_consent"""
+    properties = {
+        "email": user.email,
+        "firstname": user.first_name or "",
+        "lastname": user.last_name or "",
+        "nest_navigate_user_id": str(user.id),
+        "marketing_consent": bool(user.marketing_consent) if user.marketing_consent is not None else False,
+    }
+    if user.phone:
+        properties["phone"] = user.phone
+    if user.date_of_birth:
+        properties["date_of_birth"] = user.date_of_birth.isoformat()
+    return properties
 
 
-def _create_or_update_contact(properties: Dict[str, Any]) -> None:
-    """Create or update a contact by email. Does nothing if token is missing."""
+def build_onboarding_properties(user: User, onboarding: UserOnboarding) -> Dict[str, Any]:
+    """
+    Profile fields plus onboarding answers.
+
+    Data sent to HubSpot (align custom property types in HubSpot):
+    - has_realtor, has_loan_officer: boolean (True/False) — DB stores bool from "Yes, I am" / "Not yet"
+    - wants_expert_contact: string — DB stores "Yes, I'd love to" or "Maybe later"
+    - homeownership_timeline_months: number — DB stores int (e.g. 3, 6, 12, 24, 36, 120)
+    - target_cities: string — comma-separated list of city names (multi-line text in HubSpot)
+    - marketing_consent: boolean — from user; used by HubSpot workflow to set as marketing contact
+    """
+    # Build target_cities string robustly (DB stores JSON array)
+    target_cities_raw = getattr(onboarding, "target_cities", None)
+    if isinstance(target_cities_raw, list) and target_cities_raw:
+        target_cities_value = ", ".join(str(c).strip() for c in target_cities_raw if c)
+    elif isinstance(target_cities_raw, str) and target_cities_raw.strip():
+        target_cities_value = target_cities_raw.strip()
+    else:
+        target_cities_value = ""
+
+    properties = {
+        "email": user.email,
+        "firstname": user.first_name or "",
+        "lastname": user.last_name or "",
+        "nest_navigate_user_id": str(user.id),
+        "has_realtor": bool(onboarding.has_realtor) if onboarding.has_realtor is not None else False,
+        "has_loan_officer": bool(onboarding.has_loan_officer) if onboarding.has_loan_officer is not None else False,
+        "wants_expert_contact": (onboarding.wants_expert_contact or ""),
+        "target_cities": target_cities_value,
+        "marketing_consent": bool(user.marketing_consent) if user.marketing_consent is not None else False,
+    }
+    if onboarding.homeownership_timeline_months is not None:
+        properties["homeownership_timeline_months"] = int(onboarding.homeownership_timeline_months)
+    if user.phone:
+        properties["phone"] = user.phone
+    if user.date_of_birth:
+        properties["date_of_birth"] = user.date_of_birth.isoformat()
+    return properties
+
+
+# ================================
+# OUTBOX (request path)
+# ================================
+
+def queue_contact_sync(
+    db: Session, user: User, event_type: str, properties: Dict[str, Any]
+) -> Optional[HubSpotOutbox]:
+    """
+    Add a sync intent to the outbox. The caller commits, so the intent is
+    stored atomically with the change that triggered it.
+    Returns None (nothing queued) when HubSpot is not configured.
+    """
     if not _get_access_token():
-        logger.debug("HubSpot not configured; skipping contact sync")
-        return
+        return None
     email = (properties.get("email") or "").strip()
     if not email:
         logger.warning("HubSpot sync skipped: no email in properties")
-        return
-    contact_id = _search_contact_by_email(email)
-    if contact_id:
-        _update_contact(contact_id, properties)
-    else:
-        _create_contact(properties)
+        return None
+
+    entry = HubSpotOutbox(
+        user_id=user.id,
+        email=email,
+        event_type=event_type,
+        properties=properties,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc),
+    )
+    db.add(entry)
+    return entry
 
 
-def sync_contact_on_register(user: User) -> None:
+def queue_contact_on_register(db: Session, user: User) -> None:
     """
-    Create or update a HubSpot contact when a user registers.
-    Sends core profile fields, nest_navigate_user_id, and marketing_consent.
+    Queue a HubSpot contact create/update for a newly registered user.
     Logs errors and does not raise so registration is never blocked.
     """
     try:
-        if not _get_access_token():
-            return
-        properties = {
-            "email": user.email,
-            "firstname": user.first_name or "",
-            "lastname": user.last_name or "",
-            "nest_navigate_user_id": str(user.id),
-            "marketing_consent": bool(user.marketing_consent) if user.marketing_consent is not None else False,
-        }
-        if user.phone:
-            properties["phone"] = user.phone
-        if user.date_of_birth:
-            properties["date_of_birth"] = user.date_of_birth.isoformat()
-        _create_or_update_contact(properties)
+        queue_contact_sync(db, user, "register", build_register_properties(user))
     except Exception as e:
         logger.exception("HubSpot sync on register failed for %s: %s", user.email, e)
 
 
-def sync_contact_onboarding_complete(user: User, onboarding: UserOnboarding) -> None:
+def queue_contact_onboarding_complete(db: Session, user: User, onboarding: UserOnboarding) -> None:
     """
-    Update the HubSpot contact with onboarding fields when onboarding is completed.
-    Identifies contact by user email. Logs errors and does not raise.
-
-    Data sent to HubSpot (align custom property types in HubSpot):
-    - has_realtor, has_loan_officer: boolean (True/False) — DB stores bool from "Yes, I am" / "Not yet"
-    - wants_expert_contact: string — DB stores "Yes, I'd love to" or "Maybe later"
-    - homeownership_timeline_months: number — DB stores int (e.g. 3, 6, 12, 24, 36, 120)
-    - target_cities: string — comma-separated list of city names (multi-line text in HubSpot)
-    - marketing_consent: boolean — from user; used by HubSpot workflow to set as marketing contact
+    Queue a HubSpot contact update with onboarding fields.
+    Logs errors and does not raise.
     """
     try:
-        if not _get_access_token():
-            return
-        # Build target_cities string robustly (DB stores JSON array)
-        target_cities_raw = getattr(onboarding, "target_cities", None)
-        if isinstance(target_cities_raw, list) and target_cities_raw:
-            target_cities_value = ", ".join(str(c).strip() for c in target_cities_raw if c)
-        elif isinstance(target_cities_raw, str) and target_cities_raw.strip():
-            target_cities_value = target_cities_raw.strip()
-        else:
-            target_cities_value = ""
-
-        properties = {
-            "email": user.email,
-            "firstname": user.first_name or "",
-            "lastname": user.last_name or "",
-            "nest_navigate_user_id": str(user.id),
-            "has_realtor": bool(onboarding.has_realtor) if onboarding.has_realtor is not None else False,
-            "has_loan_officer": bool(onboarding.has_loan_officer) if onboarding.has_loan_officer is not None else False,
-            "wants_expert_contact": (onboarding.wants_expert_contact or ""),
-            "target_cities": target_cities_value,
-            "marketing_consent": bool(user.marketing_consent) if user.marketing_consent is not None else False,
-        }
-        if onboarding.homeownership_timeline_months is not None:
-            properties["homeownership_timeline_months"] = int(onboarding.homeownership_timeline_months)
-        if user.phone:
-            properties["phone"] = user.phone
-        if user.date_of_birth:
-            properties["date_of_birth"] = user.date_of_birth.isoformat()
-        _create_or_update_contact(properties)
+        queue_contact_sync(
+            db, user, "onboarding_complete", build_onboarding_properties(user, onboarding)
+        )
     except Exception as e:
         logger.exception(
             "HubSpot sync on onboarding complete failed for %s: %s",
             user.email,
             e,
         )
+
+
+# ================================
+# OUTBOX WORKER
+# ================================
+
+def _coalesce(entries: List[HubSpotOutbox]) -> Dict[str, Dict[str, Any]]:
+    """
+    One upsert input per contact: properties of every pending entry for the
+    same email are merged oldest first, so later changes win. HubSpot rejects
+    batches that contain the same id twice.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for entry in sorted(entries, key=lambda e: e.created_at or datetime.min.replace(tzinfo=timezone.utc)):
+        key = entry.email.strip().lower()
+        merged.setdefault(key, {}).update(entry.properties or {})
+    return merged
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_SECONDS))
+
+
+def _mark_retry(entry: HubSpotOutbox, error: str, now: datetime) -> str:
+    entry.attempts = (entry.attempts or 0) + 1
+    entry.last_error = error[:2000]
+    if entry.attempts >= OUTBOX_MAX_ATTEMPTS:
+        entry.status = "failed"
+        logger.error("HubSpot sync for %s failed after %s attempts: %s", entry.email, entry.attempts, error)
+        return "failed"
+    entry.next_attempt_at = now + _retry_delay(entry.attempts)
+    return "retried"
+
+
+def _failed_emails(body: Dict[str, Any], emails: List[str]) -> set:
+    """
+    Emails listed in the errors' context.ids of a 207 multi-status response.
+    An error that names none of the batch's contacts fails the whole batch,
+    so it is retried rather than marked sent.
+    """
+    batch = set(emails)
+    errors = body.get("errors") or []
+    if body.get("numErrors") and not errors:
+        return batch
+    failed = set()
+    for error in errors:
+        context = error.get("context") if isinstance(error, dict) else None
+        ids = context.get("ids") if isinstance(context, dict) else None
+        matched = {str(i).strip().lower() for i in ids or []} & batch
+        if not matched:
+            return batch
+        failed |= matched
+    return failed
+
+
+def process_outbox_batch(entries: List[HubSpotOutbox]) -> Dict[str, int]:
+    """
+    Send one batch upsert for the given pending entries and update their status.
+
+    Args:
+        entries: Up to OUTBOX_BATCH_SIZE pending rows (distinct emails after coalescing)
+
+    Returns:
+        Counts of sent / retried / failed entries
+    """
+    import httpx
+
+    counts = {"sent": 0, "retried": 0, "failed": 0}
+    if not entries:
+        return counts
+
+    now = datetime.now(timezone.utc)
+    merged = _coalesce(entries)
+    inputs = [
+        {"idProperty": "email", "id": email, "properties": properties}
+        for email, properties in merged.items()
+    ]
+
+    failed_emails: set = set()
+    error: Optional[str] = None
+    try:
+        resp = _get_client().post(
+            HUBSPOT_CONTACTS_BATCH_UPSERT,
+            json={"inputs": inputs},
+            headers={"Authorization": f"Bearer {_get_access_token()}"},
+        )
+        if resp.status_code == 207:
+            failed_emails = _failed_emails(resp.json(), list(merged))
+            error = resp.text
+        elif resp.status_code not in (200, 201):
+            failed_emails = set(merged)
+            error = f"{resp.status_code} {resp.text}"
+    except httpx.HTTPError as e:
+        failed_emails = set(merged)
+        error = f"{type(e).__name__}: {e}"
+
+    for entry in entries:
+        if entry.email.strip().lower() in failed_emails:
+            counts[_mark_retry(entry, error or "", now)] += 1
+        else:
+            entry.status = "sent"
+            entry.attempts = (entry.attempts or 0) + 1
+            entry.sent_at = now
+            entry.last_error = None
+            counts["sent"] += 1
+
+    if failed_emails:
+        logger.warning("HubSpot batch upsert: %s of %s contacts failed: %s", len(failed_emails), len(merged), error)
+    else:
+        logger.info("HubSpot batch upsert: %s contacts synced", len(merged))
+    return counts
+
+
+def drain_outbox(db: Session, max_batches: int = OUTBOX_MAX_BATCHES) -> Dict[str, int]:
+    """
+    Send due outbox entries in batches and purge old sent entries.
+    Rows are claimed with SKIP LOCKED so concurrent workers never send the same row.
+
+    Returns:
+        Totals of sent / retried / failed entries and purged rows
+    """
+    totals = {"sent": 0, "retried": 0, "failed": 0, "purged": 0}
+    if not _get_access_token():
+        return totals
+
+    for _ in range(max_batches):
+        entries = (
+            db.query(HubSpotOutbox)
+            .filter(
+                HubSpotOutbox.status == "pending",
+                HubSpotOutbox.next_attempt_at <= datetime.now(timezone.utc),
+            )
+            .order_by(HubSpotOutbox.created_at)
+            .limit(OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not entries:
+            break
+
+        for key, value in process_outbox_batch(entries).items():
+            totals[key] += value
+        db.commit()
+
+        if len(entries) < OUTBOX_BATCH_SIZE:
+            break
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=OUTBOX_SENT_RETENTION_DAYS)
+    totals["purged"] = db.query(HubSpotOutbox).filter(
+        HubSpotOutbox.status == "sent",
+        HubSpotOutbox.sent_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    return totals
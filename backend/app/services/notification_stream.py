@@ -0,0 +1,318 @@
+"""
+Server-Sent Events stream of new notifications.
+
+NotificationManager.create_notification() issues pg_notify on the
+NOTIFICATION_CHANNEL inside its transaction, so the message is delivered to
+every API worker at commit. Each worker runs one LISTEN connection in a
+background thread and wakes the streams of the affected user through the
+in-process NotificationHub. A woken stream re-reads the user's notifications
+after its cursor, so wake-ups carry no data and simply coalesce:
+
+- Backpressure: each stream has a one-slot wake-up queue, and a slow client
+  only delays its own next read (at most STREAM_BATCH_LIMIT rows at a time).
+- Late commits: created_at is stamped before commit (at flush, or at the start
+  of a broadcast chunk's transaction), so a notification can become visible
+  after a later-stamped one has moved the cursor. Each read therefore looks
+  STREAM_OVERLAP_SECONDS back from the cursor and skips the ids already sent.
+- Resume: every event id is a notification id (the newest one sent so far);
+  reconnecting with Last-Event-ID (or ?last_event_id=) replays what was missed.
+- Unread count: read / unread / delete changes issue a pg_notify for the user
+  too (notify_unread_count_changed), so other tabs get the new count.
+- Heartbeats: a comment line every STREAM_HEARTBEAT_SECONDS keeps proxies from
+  closing idle streams. If LISTEN is unavailable, each heartbeat also re-reads.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, text, tuple_
+from sqlalchemy.orm import Session
+
+from models import Notification
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_CHANNEL = "user_notifications"
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_BATCH_LIMIT = 50
+STREAM_RETRY_MS = 5000
+LISTEN_RECONNECT_SECONDS = 5
+# How far before the cursor each read looks again for late-committed
+# notifications; covers the longest transaction that creates notifications
+# (a broadcast chunk)
+STREAM_OVERLAP_SECONDS = 120
+
+# (created_at, id) of the newest notification sent on a stream
+Cursor = Tuple[datetime, UUID]
+
+
+def notify_new_notification(db: Session, notification: Notification) -> None:
+    """
+    Queue a pg_notify for a new notification in the caller's transaction
+    (delivered to listeners on commit). No-op on non-PostgreSQL sessions.
+    """
+    bind = db.get_bind()
+    if bind is None or bind.dialect.name != "postgresql":
+        return
+    db.flush()
+    payload = json.dumps({"user_id": str(notification.user_id), "id": str(notification.id)})
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFICATION_CHANNEL, "payload": payload})
+
+
+def notify_unread_count_changed(db: Session, user_id: UUID) -> None:
+    """
+    Queue a pg_notify waking the user's streams after a read / unread / delete
+    (they re-read and send the new unread count). No-op on non-PostgreSQL sessions.
+    """
+    bind = db.get_bind()
+    if bind is None or bind.dialect.name != "postgresql":
+        return
+    payload = json.dumps({"user_id": str(user_id)})
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFICATION_CHANNEL, "payload": payload})
+
+
+def notify_broadcast(db: Session) -> None:
+    """
+    Queue one pg_notify waking every open stream (used per broadcast chunk
+    instead of one message per recipient). No-op on non-PostgreSQL sessions.
+    """
+    bind = db.get_bind()
+    if bind is None or bind.dialect.name != "postgresql":
+        return
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFICATION_CHANNEL, "payload": json.dumps({"all": True})})
+
+
+class NotificationHub:
+    """Per-process registry of open streams, woken by the LISTEN thread"""
+
+    def __init__(self):
+        self._subscribers: Dict[UUID, Set[asyncio.Queue]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.listening = False
+
+    # ----- streams -----
+
+    def subscribe(self, user_id: UUID) -> asyncio.Queue:
+        """Register a stream; must be called from the event loop"""
+        self._loop = asyncio.get_running_loop()
+        wakeups: asyncio.Queue = asyncio.Queue(maxsize=1)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(wakeups)
+        self.start_listener()
+        return wakeups
+
+    def unsubscribe(self, user_id: UUID, wakeups: asyncio.Queue) -> None:
+        with self._lock:
+            streams = self._subscribers.get(user_id)
+            if streams is not None:
+                streams.discard(wakeups)
+                if not streams:
+                    del self._subscribers[user_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(streams) for streams in self._subscribers.values())
+
+    def publish(self, user_id: UUID) -> None:
+        """Wake every stream of the user (thread-safe)"""
+        if self._loop is None:
+            return
+        with self._lock:
+            if user_id not in self._subscribers:
+                return
+        self._loop.call_soon_threadsafe(self._wake, user_id)
+
+    def publish_all(self) -> None:
+        """Wake every open stream (thread-safe)"""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._wake, None)
+
+    def _wake(self, user_id: Optional[UUID]) -> None:
+        with self._lock:
+            if user_id is None:
+                streams = [w for user_streams in self._subscribers.values() for w in user_streams]
+            else:
+                streams = list(self._subscribers.get(user_id, ()))
+        for wakeups in streams:
+            if wakeups.empty():
+                wakeups.put_nowait(None)
+
+    # ----- LISTEN thread -----
+
+    def start_listener(self) -> None:
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._stopping.clear()
+            self._listener = threading.Thread(target=self._listen, name="notification-listener", daemon=True)
+            self._listener.start()
+
+    def stop_listener(self) -> None:
+        self._stopping.set()
+
+    def _listen(self) -> None:
+        import psycopg2
+        from database import DATABASE_URL
+
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                # Dedicated connection outside the pool: it stays in LISTEN for the process lifetime
+                connection = psycopg2.connect(DATABASE_URL)
+                connection.set_session(autocommit=True)
+                connection.cursor().execute(f"LISTEN {NOTIFICATION_CHANNEL}")
+                self.listening = True
+                logger.info("Listening for notifications on %s", NOTIFICATION_CHANNEL)
+
+                while not self._stopping.is_set():
+                    if select.select([connection], [], [], STREAM_HEARTBEAT_SECONDS) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self._dispatch(connection.notifies.pop(0).payload)
+            except Exception as e:
+                self.listening = False
+                logger.warning("Notification listener error: %s; retrying in %ss", e, LISTEN_RECONNECT_SECONDS)
+                self._stopping.wait(LISTEN_RECONNECT_SECONDS)
+            finally:
+                self.listening = False
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            if message.get("all"):
+                self.publish_all()
+            else:
+                self.publish(UUID(message["user_id"]))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed notification payload: %s", payload)
+
+
+# Global hub instance (one per worker process)
+notification_hub = NotificationHub()
+
+
+# ================================
+# STREAM READS (run in the threadpool)
+# ================================
+
+class StreamCursor:
+    """
+    Read position of one stream: the newest (created_at, id) sent, plus the
+    ids sent within STREAM_OVERLAP_SECONDS before it (skipped when re-read).
+    """
+
+    def __init__(self, position: Optional[Cursor] = None, sent: Optional[Dict[UUID, datetime]] = None):
+        self.position = position
+        self.sent: Dict[UUID, datetime] = dict(sent or {})
+
+    @property
+    def event_id(self) -> Optional[str]:
+        return str(self.position[1]) if self.position else None
+
+    def window_start(self) -> Optional[datetime]:
+        if self.position is None:
+            return None
+        return self.position[0] - timedelta(seconds=STREAM_OVERLAP_SECONDS)
+
+    def advance(self, notification: Notification) -> None:
+        """Record a sent notification"""
+        self.sent[notification.id] = notification.created_at
+        key = (notification.created_at, notification.id)
+        if self.position is None or key > self.position:
+            self.position = key
+            start = self.window_start()
+            self.sent = {i: created_at for i, created_at in self.sent.items() if created_at > start}
+
+
+def resolve_cursor(db: Session, user_id: UUID, last_event_id: Optional[str]) -> StreamCursor:
+    """
+    Position of Last-Event-ID, or of the user's newest notification when there
+    is none (or it no longer exists), so a fresh stream only sends new ones.
+    Everything up to that position inside the overlap window counts as sent.
+    """
+    notification = None
+    if last_event_id:
+        try:
+            notification = db.query(Notification.created_at, Notification.id).filter(
+                and_(Notification.id == UUID(last_event_id), Notification.user_id == user_id)
+            ).first()
+        except ValueError:
+            notification = None
+    if notification is None:
+        notification = db.query(Notification.created_at, Notification.id).filter(
+            Notification.user_id == user_id
+        ).order_by(Notification.created_at.desc(), Notification.id.desc()).first()
+    if notification is None:
+        return StreamCursor()
+
+    cursor = StreamCursor((notification.created_at, notification.id))
+    earlier = db.query(Notification.id, Notification.created_at).filter(
+        and_(
+            Notification.user_id == user_id,
+            Notification.created_at > cursor.window_start(),
+            tuple_(Notification.created_at, Notification.id) <= tuple_(*cursor.position)
+        )
+    ).all()
+    cursor.sent = {row.id: row.created_at for row in earlier}
+    return cursor
+
+
+def fetch_after(db: Session, user_id: UUID, cursor: StreamCursor) -> List[Notification]:
+    """Next batch of the user's notifications not sent yet, oldest first"""
+    query = db.query(Notification).filter(Notification.user_id == user_id)
+    if cursor.position is not None:
+        query = query.filter(Notification.created_at > cursor.window_start())
+    if cursor.sent:
+        query = query.filter(Notification.id.notin_(list(cursor.sent)))
+    return query.order_by(Notification.created_at, Notification.id).limit(STREAM_BATCH_LIMIT).all()
+
+
+def format_event(event: str, data: dict, event_id: Optional[str] = None) -> str:
+    """One SSE message"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def notification_event(notification: Notification, event_id: Optional[str] = None) -> str:
+    """
+    `notification` event; the SSE id defaults to the notification id (streams
+    pass the newest id sent, so a late notification does not rewind a resume)
+    """
+    return format_event(
+        "notification",
+        {
+            "id": str(notification.id),
+            "notification_type": notification.notification_type,
+            "title": notification.title,
+            "message": notification.message,
+            "is_read": notification.is_read,
+            "priority": notification.priority,
+            "expires_at": notification.expires_at,
+            "created_at": notification.created_at,
+        },
+        event_id=event_id or str(notification.id),
+    )
+
+
+def heartbeat() -> str:
+    return f": heartbeat {int(time.time())}\n\n"
@@ -0,0 +1,145 @@
+"""
+Pre-serialized module question banks for the minigame endpoints.
+
+GET /minigame/module/{id} and GET /grow-your-nest/module/{id} return every
+question of a module with its answers (never is_correct). The question list
+is the same for every user, so it is built with two queries, encoded once
+with orjson and cached per module; a request only encodes its small
+per-user block and splices the cached bytes in.
+
+A cached bank is keyed by a content version taken from the module and lesson
+rows the endpoints load anyway (ids and updated_at). Questions and answers
+have no updated_at, so ORM writes to them (admin, seeding) clear the cache
+in this process, and QUESTION_BANK_TTL_SECONDS bounds how long other
+processes can serve an edited question.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import orjson
+from fastapi import Response
+from sqlalchemy import and_, event
+from sqlalchemy.orm import Session
+
+from models import Module, Lesson, QuizQuestion, QuizAnswer
+
+QUESTION_BANK_TTL_SECONDS = int(os.getenv("QUESTION_BANK_TTL_SECONDS", "300"))
+QUESTION_BANK_CACHE_SIZE = 128
+
+
+@dataclass(frozen=True)
+class ModuleQuestionBank:
+    version: Tuple
+    questions_json: bytes
+    total_questions: int
+    built_at: float
+
+
+def content_version(module: Module, lessons: List[Lesson]) -> Tuple:
+    return (
+        module.updated_at,
+        tuple((lesson.id, lesson.order_index, lesson.updated_at) for lesson in lessons),
+    )
+
+
+def build_questions(db: Session, lessons: List[Lesson]) -> List[Dict[str, Any]]:
+    """Flat question list of the lessons (in lesson order), answers without is_correct"""
+    lesson_order = {lesson.id: position for position, lesson in enumerate(lessons)}
+    lesson_titles = {lesson.id: lesson.title for lesson in lessons}
+    questions = db.query(QuizQuestion).filter(
+        and_(QuizQuestion.lesson_id.in_(list(lesson_order)), QuizQuestion.is_active == True)
+    ).all()
+    questions.sort(key=lambda q: (lesson_order[q.lesson_id], q.order_index))
+
+    answers_by_question: Dict[UUID, List[Dict[str, Any]]] = {q.id: [] for q in questions}
+    if questions:
+        answers = db.query(QuizAnswer.id, QuizAnswer.question_id, QuizAnswer.answer_text, QuizAnswer.order_index).filter(
+            QuizAnswer.question_id.in_(list(answers_by_question))
+        ).order_by(QuizAnswer.question_id, QuizAnswer.order_index).all()
+        for answer in answers:
+            answers_by_question[answer.question_id].append({
+                "id": str(answer.id),
+                "answer_text": answer.answer_text,
+                "order_index": answer.order_index
+                # Note: is_correct is NOT included for security
+            })
+
+    return [
+        {
+            "id": str(question.id),
+            "lesson_id": str(question.lesson_id),
+            "lesson_title": lesson_titles[question.lesson_id],
+            "question_text": question.question_text,
+            "question_type": question.question_type,
+            "order_index": question.order_index,
+            "answers": answers_by_question[question.id]
+        }
+        for question in questions
+    ]
+
+
+class QuestionBankCache:
+    """Per-process LRU of encoded question banks, keyed by module id"""
+
+    def __init__(self, ttl_seconds: int = QUESTION_BANK_TTL_SECONDS, max_modules: int = QUESTION_BANK_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_modules = max_modules
+        self._banks: "OrderedDict[UUID, ModuleQuestionBank]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, module: Module, lessons: List[Lesson]) -> ModuleQuestionBank:
+        version = content_version(module, lessons)
+        now = time.monotonic()
+        with self._lock:
+            bank = self._banks.get(module.id)
+            if bank is not None and bank.version == version and now - bank.built_at < self.ttl_seconds:
+                self._banks.move_to_end(module.id)
+                return bank
+
+        questions = build_questions(db, lessons)
+        bank = ModuleQuestionBank(
+            version=version,
+            questions_json=orjson.dumps(questions),
+            total_questions=len(questions),
+            built_at=now
+        )
+        with self._lock:
+            self._banks[module.id] = bank
+            self._banks.move_to_end(module.id)
+            while len(self._banks) > self.max_modules:
+                self._banks.popitem(last=False)
+        return bank
+
+    def invalidate(self, module_id: Optional[UUID] = None) -> None:
+        with self._lock:
+            if module_id is None:
+                self._banks.clear()
+            else:
+                self._banks.pop(module_id, None)
+
+
+# Global cache (one per worker process)
+question_bank_cache = QuestionBankCache()
+
+
+def _invalidate_on_write(mapper, connection, target) -> None:
+    question_bank_cache.invalidate()
+
+
+for _model in (Module, Lesson, QuizQuestion, QuizAnswer):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _invalidate_on_write)
+
+
+def module_questions_response(payload: Dict[str, Any], bank: ModuleQuestionBank) -> Response:
+    """JSON response of payload plus "questions" spliced in from the cached bank"""
+    head = orjson.dumps(payload)
+    return Response(
+        content=head[:-1] + b',"questions":' + bank.questions_json + b"}",
+        media_type="application/json"
+    )
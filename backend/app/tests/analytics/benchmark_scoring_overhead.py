@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark Scoring Overhead
+Measures the per-user Python overhead of ScoringEngine.calculate_all_scores()
+outside SQL: every extractor and availability check is replaced with a constant,
+so only catalog lookups, dispatch and score arithmetic are timed. The legacy
+name-based dispatch (hasattr/getattr per user x signal, linear catalog scans)
+is timed alongside for comparison. No database required.
+
+Usage: python tests/analytics/benchmark_scoring_overhead.py [n_users]
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import analytics.scoring_engine as scoring_engine
+import analytics.scoring_signals as scoring_signals
+from analytics.scoring_engine import ScoringEngine
+from analytics.scoring_signals import ScoringSignalsCatalog, SignalAvailabilityChecker, ScoreDimension
+
+
+class _ConstantExtractor:
+    """Answers every extract_* call with a constant (legacy name-based dispatch)"""
+
+    def __getattr__(self, name):
+        if name.startswith("extract_") or name.startswith("_check_extract_"):
+            return lambda: 50.0
+        raise AttributeError(name)
+
+
+def _legacy_user(extractor):
+    """Per-user catalog and dispatch work as done before the catalog was compiled"""
+    all_signals = (
+        ScoringSignalsCatalog.ENGAGEMENT_SIGNALS +
+        ScoringSignalsCatalog.TIMELINE_URGENCY_SIGNALS +
+        ScoringSignalsCatalog.HELP_SEEKING_SIGNALS +
+        ScoringSignalsCatalog.LEARNING_VELOCITY_SIGNALS +
+        ScoringSignalsCatalog.REWARDS_SIGNALS
+    )
+    total = 0.0
+    # Dimension scores: one availability check and one extraction per signal
+    for dimension in ScoreDimension:
+        for signal in [s for s in all_signals if s.dimension == dimension]:
+            check = f"_check_{signal.extraction_func}"
+            if hasattr(extractor, check) and getattr(extractor, check)():
+                if hasattr(extractor, signal.extraction_func):
+                    total += getattr(extractor, signal.extraction_func)() * signal.weight
+    # Availability summary: every check again
+    for signal in all_signals:
+        check = f"_check_{signal.extraction_func}"
+        if hasattr(extractor, check):
+            getattr(extractor, check)()
+    return total
+
+
+def _compiled_user():
+    engine = ScoringEngine.__new__(ScoringEngine)
+    engine.user_id = None
+    engine.extractor = None
+    engine.availability_checker = SignalAvailabilityChecker(db=None, user_id=None)
+    return engine.calculate_all_scores()
+
+
+def benchmark(n_users: int = 20000) -> bool:
+    """Time per-user overhead of the legacy and compiled paths"""
+    print("=" * 80)
+    print(f"BENCHMARK: SCORING OVERHEAD OUTSIDE SQL ({n_users:,} users)")
+    print("=" * 80)
+
+    # Constant extractors / checks so no SQL runs
+    scoring_engine.SIGNAL_EXTRACTORS = {
+        signal_id: (lambda extractor: 50.0) for signal_id in scoring_engine.SIGNAL_EXTRACTORS
+    }
+    scoring_signals.AVAILABILITY_CHECKS.update(
+        {signal_id: (lambda checker: True) for signal_id in scoring_signals.AVAILABILITY_CHECKS}
+    )
+
+    extractor = _ConstantExtractor()
+    start = time.perf_counter()
+    for _ in range(n_users):
+        _legacy_user(extractor)
+    legacy_us = (time.perf_counter() - start) / n_users * 1e6
+
+    start = time.perf_counter()
+    for _ in range(n_users):
+        _compiled_user()
+    compiled_us = (time.perf_counter() - start) / n_users * 1e6
+
+    start = time.perf_counter()
+    for _ in range(n_users):
+        for signal in ScoringSignalsCatalog.get_all_signals():
+            ScoringSignalsCatalog.get_signal_by_id(signal.signal_id)
+    lookup_us = (time.perf_counter() - start) / n_users * 1e6
+
+    print(f"\n⏱️  Legacy dispatch + catalog scans (lookups only): {legacy_us:8.1f} µs/user")
+    print(f"⏱️  Compiled calculate_all_scores (full result):    {compiled_us:8.1f} µs/user")
+    print(f"⏱️  get_signal_by_id for every signal:              {lookup_us:8.1f} µs/user")
+    print(f"\n📊 At 1M users the compiled path spends {compiled_us:.0f} s of Python time outside SQL")
+
+    print("\n✅ SCORING OVERHEAD BENCHMARK COMPLETE")
+    return True
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    success = benchmark(n)
+    sys.exit(0 if success else 1)
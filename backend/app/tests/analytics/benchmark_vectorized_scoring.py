@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark Vectorized Scoring
+Times VectorizedScoringEngine over a synthetic population and spot-checks
+results against the per-user ScoringEngine. No database required.
+
+Usage: python tests/analytics/benchmark_vectorized_scoring.py [n_users]
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+
+from analytics.scoring_engine import ScoringEngine
+from analytics.classifier import LeadClassifier
+from analytics.vectorized_scoring import VectorizedScoringEngine, TEMPERATURE_CODES, INTENT_CODES
+
+# Target for scoring + classifying the whole population
+TARGET_SECONDS = 1.0
+# Users re-scored one at a time with ScoringEngine + LeadClassifier
+SPOT_CHECK_USERS = 1000
+
+
+def score_row_per_user(row: np.ndarray):
+    """Score one matrix row with the per-user ScoringEngine (extraction replaced by the row)"""
+    values = {signal.signal_id: row[i] for i, signal in enumerate(VectorizedScoringEngine.SIGNALS)}
+
+    class _RowSignals:
+        def check_signal_availability(self, signal):
+            return not np.isnan(values[signal.signal_id])
+
+    engine = ScoringEngine.__new__(ScoringEngine)
+    engine.availability_checker = _RowSignals()
+    engine._extract_signal_value = lambda signal: float(values[signal.signal_id])
+
+    dimension_results = [
+        (dimension, engine.calculate_dimension_score(dimension))
+        for dimension in VectorizedScoringEngine.DIMENSIONS
+    ]
+    scores = {
+        "engagement_score": dimension_results[0][1]["score"],
+        "timeline_urgency_score": dimension_results[1][1]["score"],
+        "help_seeking_score": dimension_results[2][1]["score"],
+        "learning_velocity_score": dimension_results[3][1]["score"],
+        "rewards_score": dimension_results[4][1]["score"],
+        "composite_score": engine._calculate_composite_score(dimension_results),
+    }
+    classification = LeadClassifier.classify_lead(scores)
+    return scores, classification["temperature"], classification["intent_band"]
+
+
+def spot_check(values, scores, temperature, intent, rng) -> int:
+    """Compare a random sample of users with the per-user engine; returns mismatches"""
+    sample = rng.choice(len(values), size=min(SPOT_CHECK_USERS, len(values)), replace=False)
+    mismatches = 0
+    for i in sample:
+        expected, expected_temperature, expected_intent = score_row_per_user(values[i])
+        if (
+            any(scores[key][i] != value for key, value in expected.items())
+            or TEMPERATURE_CODES[temperature[i]] != expected_temperature
+            or INTENT_CODES[intent[i]] != expected_intent
+        ):
+            mismatches += 1
+    return mismatches
+
+
+def benchmark(n_users: int = 1_000_000) -> bool:
+    """Score n_users synthetic users and report throughput"""
+    print("=" * 80)
+    print(f"BENCHMARK: VECTORIZED SCORING ({n_users:,} users)")
+    print("=" * 80)
+
+    rng = np.random.default_rng(42)
+    n_signals = len(VectorizedScoringEngine.SIGNALS)
+    values = rng.uniform(0, 100, size=(n_users, n_signals))
+    values[rng.random((n_users, n_signals)) < 0.4] = np.nan
+
+    # Warm-up run so allocation of the first arrays is not timed
+    VectorizedScoringEngine.score(values[:1000])
+
+    start = time.perf_counter()
+    scores = VectorizedScoringEngine.score(values)
+    score_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    temperature, intent = VectorizedScoringEngine.classify(scores)
+    classify_seconds = time.perf_counter() - start
+
+    total = score_seconds + classify_seconds
+    print(f"\n⏱️  Scoring:        {score_seconds * 1000:8.1f} ms")
+    print(f"⏱️  Classification: {classify_seconds * 1000:8.1f} ms")
+    print(f"⏱️  Total:          {total * 1000:8.1f} ms ({n_users / total:,.0f} users/s)")
+
+    print(f"\n📊 Temperature distribution:")
+    for band, stats in VectorizedScoringEngine.distribution(temperature, TEMPERATURE_CODES).items():
+        print(f"   {band:18} {stats['count']:>9,} ({stats['percentage']}%)")
+
+    print(f"\n📊 Intent distribution:")
+    for band, stats in VectorizedScoringEngine.distribution(intent, INTENT_CODES).items():
+        print(f"   {band:18} {stats['count']:>9,} ({stats['percentage']}%)")
+
+    mismatches = spot_check(values, scores, temperature, intent, rng)
+    checked = min(SPOT_CHECK_USERS, n_users)
+    print(f"\n🔍 Spot-check vs per-user ScoringEngine: {checked - mismatches:,}/{checked:,} users match")
+
+    passed = total < TARGET_SECONDS * n_users / 1_000_000 and mismatches == 0
+    if passed:
+        print("\n✅ VECTORIZED SCORING BENCHMARK PASSED")
+    else:
+        print(f"\n❌ VECTORIZED SCORING BENCHMARK FAILED (target {TARGET_SECONDS}s per 1M users, no mismatches)")
+    return passed
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    success = benchmark(n)
+    sys.exit(0 if success else 1)
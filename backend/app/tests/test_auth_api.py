@@ -3,7 +3,7 @@ API tests for auth critical paths.
 
 Covers: send-verification-code, verify-email-code, register, login,
 password-reset, password-reset/confirm, and /me.
-Uses TestClient and mocks email sending (no real SES).
+Uses TestClient and mocks email queuing (no real SES).
 """
 import os
 import sys
@@ -55,7 +55,7 @@ def unique_email():
 # ----- Send verification code -----
 
 
-@patch("routers.auth.send_verification_email")
+@patch("routers.auth.queue_verification_email")
 def test_send_verification_code_success(mock_send, client: TestClient, db, unique_email: str):
     """POST send-verification-code returns 200 and sends email when email not registered."""
     mock_send.return_value = True
@@ -71,7 +71,7 @@ def test_send_verification_code_success(mock_send, client: TestClient, db, uniqu
     assert len(mock_send.call_args[0][1]) == 6 and mock_send.call_args[0][1].isdigit()
 
 
-@patch("routers.auth.send_verification_email")
+@patch("routers.auth.queue_verification_email")
 def test_send_verification_code_already_registered_returns_400(
     mock_send, client: TestClient, db, unique_email: str
 ):
@@ -101,7 +101,7 @@ def test_send_verification_code_already_registered_returns_400(
 # ----- Verify email code -----
 
 
-@patch("routers.auth.send_verification_email")
+@patch("routers.auth.queue_verification_email")
 def test_verify_email_code_success(mock_send, client: TestClient, db, unique_email: str):
     """POST verify-email-code returns 200 when code matches."""
     mock_send.return_value = True
@@ -151,7 +151,7 @@ def test_verify_email_code_invalid_code_returns_400(client: TestClient, db, uniq
 # ----- Register (after verify) -----
 
 
-@patch("routers.auth.send_verification_email")
+@patch("routers.auth.queue_verification_email")
 def test_register_requires_verified_email(mock_send, client: TestClient, db, unique_email: str):
     """POST register returns 400 when email was not verified first."""
     response = client.post(
@@ -167,7 +167,7 @@ def test_register_requires_verified_email(mock_send, client: TestClient, db, uni
     assert "verify" in (response.json().get("detail") or "").lower()
 
 
-@patch("routers.auth.send_verification_email")
+@patch("routers.auth.queue_verification_email")
 def test_register_success_after_verify(mock_send, client: TestClient, db, unique_email: str):
     """Full flow: send code -> verify -> register returns 201 and tokens."""
     mock_send.return_value = True
@@ -259,7 +259,7 @@ def test_login_wrong_password_returns_401(client: TestClient, db, unique_email:
 # ----- Password reset -----
 
 
-@patch("routers.auth.send_password_reset_email")
+@patch("routers.auth.queue_password_reset_email")
 def test_password_reset_returns_200_even_for_unknown_email(mock_send, client: TestClient):
     """POST password-reset returns 200 and same message for unknown email (no leak)."""
     mock_send.return_value = True
@@ -271,7 +271,7 @@ def test_password_reset_returns_200_even_for_unknown_email(mock_send, client: Te
     mock_send.assert_not_called()
 
 
-@patch("routers.auth.send_password_reset_email")
+@patch("routers.auth.queue_password_reset_email")
 def test_password_reset_sends_email_and_confirm_works(mock_send, client: TestClient, db, unique_email: str):
     """POST password-reset sends email; POST password-reset/confirm with token updates password."""
     mock_send.return_value = True
@@ -0,0 +1,134 @@
+"""
+Database tests for NotificationCompactionManager (utils).
+
+Covers: monthly coin digests (month-aligned cutoff, merging notifications read
+after their month was digested) and capping each user's read history in user
+batches. Runs the compaction statements against PostgreSQL.
+"""
+import os
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+from uuid import uuid4
+
+import pytest
+
+_here = os.path.abspath(os.path.dirname(__file__))
+_app_root = os.path.abspath(os.path.join(_here, ".."))
+if _app_root not in sys.path:
+    sys.path.insert(0, _app_root)
+
+from database import SessionLocal
+from models import User, Notification
+from auth import AuthManager
+from utils import NotificationCompactionManager
+
+
+@pytest.fixture(scope="module")
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    user = User(
+        email=f"compaction_test_{uuid4().hex[:12]}@test.com",
+        password_hash=AuthManager.get_password_hash("TestPassword123!"),
+        first_name="Compaction",
+        last_name="Test",
+        is_active=True,
+    )
+    db.add(user)
+    db.commit()
+    yield user
+    db.delete(user)
+    db.commit()
+
+
+def _add(db, user, notification_type, message, created_at, is_read=True):
+    notification = Notification(
+        user_id=user.id, notification_type=notification_type, title="Coins", message=message,
+        is_read=is_read, priority="normal", created_at=created_at,
+    )
+    db.add(notification)
+    db.commit()
+    return notification
+
+
+def _digests(db, user):
+    db.expire_all()
+    return sorted(
+        n.message for n in db.query(Notification).filter(
+            Notification.user_id == user.id, Notification.notification_type == "coins_digest"
+        )
+    )
+
+
+def _roll_up(db):
+    return NotificationCompactionManager.roll_up_coin_notifications(db, time.monotonic() + 60)
+
+
+def test_roll_up_writes_one_digest_per_verb_and_month(db, user):
+    now = datetime.now(timezone.utc)
+    old = (now - timedelta(days=90)).replace(day=10, hour=12)
+    for minutes, amount in enumerate([10, 20, 30]):
+        _add(db, user, "coins_earned", f"You earned {amount} coins! Lesson", old + timedelta(minutes=minutes))
+    _add(db, user, "coins_spent", "You spent 15 coins on a reward", old)
+    unread = _add(db, user, "coins_earned", "You earned 5 coins! Quiz", old, is_read=False)
+    # Inside the current (not yet digested) month window
+    recent = _add(db, user, "coins_earned", "You earned 7 coins! Quiz", now - timedelta(days=1))
+
+    _roll_up(db)
+
+    assert _digests(db, user) == [
+        "You earned 60 coins across 3 transactions.",
+        "You spent 15 coins across 1 transactions.",
+    ]
+    remaining = {n.id for n in db.query(Notification).filter(
+        Notification.user_id == user.id, Notification.notification_type != "coins_digest"
+    )}
+    assert remaining == {unread.id, recent.id}
+
+    # Read after its month was digested: merged into the same digest
+    unread.is_read = True
+    db.commit()
+    _roll_up(db)
+
+    assert _digests(db, user) == [
+        "You earned 65 coins across 4 transactions.",
+        "You spent 15 coins across 1 transactions.",
+    ]
+
+
+def test_cap_user_history_deletes_oldest_read_per_user(db, user):
+    other = User(
+        email=f"compaction_test_{uuid4().hex[:12]}@test.com",
+        password_hash=AuthManager.get_password_hash("TestPassword123!"),
+        first_name="Compaction",
+        last_name="Test",
+        is_active=True,
+    )
+    db.add(other)
+    db.commit()
+    try:
+        start = datetime.now(timezone.utc) - timedelta(days=1)
+        kept = {}
+        for owner in (user, other):
+            unread = _add(db, owner, "system", "old unread", start, is_read=False)
+            read = [_add(db, owner, "system", "read", start + timedelta(minutes=i + 1)) for i in range(4)]
+            kept[owner.id] = {unread.id} | {n.id for n in read[-3:]}
+
+        # Every user with more than 3 notifications, one user per batch
+        NotificationCompactionManager.cap_user_history(db, time.monotonic() + 60, max_per_user=3, user_batch=1)
+
+        db.expire_all()
+        for owner in (user, other):
+            ids = {n.id for n in db.query(Notification).filter(Notification.user_id == owner.id)}
+            assert ids == kept[owner.id]
+    finally:
+        db.delete(other)
+        db.commit()
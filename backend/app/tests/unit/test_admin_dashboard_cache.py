@@ -0,0 +1,45 @@
+"""
+Unit tests for the admin dashboard cache (analytics.admin_dashboard).
+
+Tests that the cached payload is served while the TTL lasts and rebuilt once
+another process has written newer lead scores. No database required.
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from analytics.admin_dashboard import AnalyticsDashboard
+
+
+@pytest.fixture
+def dashboard(monkeypatch):
+    state = {"scores_as_of": datetime(2026, 1, 1, 12, 0), "builds": 0}
+
+    def build(db):
+        state["builds"] += 1
+        return {"build": state["builds"]}
+
+    monkeypatch.setattr(AnalyticsDashboard, "_build_dashboard_data", staticmethod(build))
+    monkeypatch.setattr(AnalyticsDashboard, "scores_as_of", staticmethod(lambda db: state["scores_as_of"]))
+    AnalyticsDashboard.invalidate_cache()
+    yield state
+    AnalyticsDashboard.invalidate_cache()
+
+
+def test_cached_payload_served_within_ttl(dashboard):
+    assert AnalyticsDashboard.get_dashboard_data(None)["build"] == 1
+    assert AnalyticsDashboard.get_dashboard_data(None)["build"] == 1
+    assert AnalyticsDashboard.get_dashboard_data(None, use_cache=False)["build"] == 2
+
+
+def test_recalculation_in_another_process_rebuilds(dashboard):
+    assert AnalyticsDashboard.get_dashboard_data(None)["build"] == 1
+
+    # A Celery / scheduler run wrote new scores; this process was not told
+    dashboard["scores_as_of"] += timedelta(hours=1)
+    assert AnalyticsDashboard.get_dashboard_data(None)["build"] == 2
+    assert AnalyticsDashboard.get_dashboard_data(None)["build"] == 2
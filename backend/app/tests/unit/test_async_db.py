@@ -0,0 +1,117 @@
+"""
+Unit tests for the async read endpoints (database.get_async_db, auth.get_current_user_async).
+
+Tests async user resolution against a fake AsyncSession, the async pool
+settings and a request through an async endpoint with the session
+overridden. No database required.
+"""
+import sys
+import os
+import asyncio
+import inspect
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from auth import AuthManager, get_current_user_async
+from database import ASYNC_DATABASE_URL, MeteredAsyncQueuePool, get_async_db, pool_settings
+from routers import dashboard, grow_your_nest, learning, minigame, notifications
+from utils import NotificationManager
+
+
+class _FakeAsyncSession:
+    """get() serves one user; run_sync() hands `sync_session` to the function"""
+
+    def __init__(self, user=None, sync_session=None):
+        self.user = user
+        self.sync_session = sync_session
+        self.commits = 0
+
+    async def get(self, model, ident):
+        return self.user if self.user is not None and self.user.id == ident else None
+
+    async def run_sync(self, fn, *args):
+        return fn(self.sync_session, *args)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _credentials(user_id, token_type="access"):
+    if token_type == "refresh":
+        token = AuthManager.create_refresh_token({"sub": str(user_id)})
+    else:
+        token = AuthManager.create_access_token({"sub": str(user_id)})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_current_user_async_loads_user_through_async_session():
+    user = SimpleNamespace(id=uuid4(), is_active=True)
+    db = _FakeAsyncSession(user)
+    assert asyncio.run(get_current_user_async(_credentials(user.id), db)) is user
+
+
+@pytest.mark.parametrize("case, status_code", [("missing", 401), ("inactive", 400), ("refresh", 401)])
+def test_current_user_async_rejects_like_sync_dependency(case, status_code):
+    user = SimpleNamespace(id=uuid4(), is_active=case != "inactive")
+    db = _FakeAsyncSession(None if case == "missing" else user)
+    token_type = "refresh" if case == "refresh" else "access"
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_current_user_async(_credentials(user.id, token_type), db))
+    assert exc.value.status_code == status_code
+
+
+def test_hot_read_endpoints_are_async():
+    for endpoint in (
+        notifications.get_notifications, notifications.get_unread_count, learning.get_modules,
+        dashboard.get_dashboard_overview, dashboard.get_user_statistics,
+        minigame.get_module_minigame, grow_your_nest.get_module_questions,
+    ):
+        assert inspect.iscoroutinefunction(endpoint), endpoint.__name__
+
+
+def test_async_pool_is_sized_separately_and_uses_asyncpg(monkeypatch):
+    settings = pool_settings("api", async_=True)
+    assert settings["poolclass"] is MeteredAsyncQueuePool
+    assert (settings["pool_size"], settings["max_overflow"]) == (10, 10)
+    assert "async_pool" not in settings and "async_pool" not in pool_settings("api")
+    assert ASYNC_DATABASE_URL.startswith("postgresql+asyncpg://")
+
+    # One connection budget per API process across both engines
+    sync = pool_settings("api")
+    assert sync["pool_size"] + sync["max_overflow"] + settings["pool_size"] + settings["max_overflow"] <= 35
+
+    # DB_POOL_SIZE sizes the sync pool only; DB_ASYNC_* the async one
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.setenv("DB_ASYNC_MAX_OVERFLOW", "4")
+    assert pool_settings("api")["pool_size"] == 7
+    settings = pool_settings("api", async_=True)
+    assert (settings["pool_size"], settings["max_overflow"]) == (10, 4)
+
+
+def test_unread_count_runs_manager_on_async_session(monkeypatch):
+    user = SimpleNamespace(id=uuid4(), is_active=True)
+    sync_session = object()
+    db = _FakeAsyncSession(user, sync_session)
+    calls = []
+    monkeypatch.setattr(
+        NotificationManager, "get_unread_count",
+        staticmethod(lambda session, user_id: calls.append((session, user_id)) or 3)
+    )
+
+    app = FastAPI()
+    app.include_router(notifications.router, prefix="/api/notifications")
+    app.dependency_overrides[get_async_db] = lambda: db
+
+    response = TestClient(app).get(
+        "/api/notifications/unread-count",
+        headers={"Authorization": f"Bearer {_credentials(user.id).credentials}"}
+    )
+    assert response.status_code == 200 and response.json() == {"unread_count": 3}
+    assert calls == [(sync_session, user.id)] and db.commits == 1
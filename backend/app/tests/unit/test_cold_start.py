@@ -0,0 +1,75 @@
+"""
+Cold-start import benchmark for app.py (the Mangum / Lambda entry point).
+
+Imports the app in a fresh interpreter under python -X importtime with an
+unreachable database and checks that the lambda profile neither connects at
+import nor loads the admin interface, Celery, APScheduler, boto3, httpx or
+asyncpg. No database required.
+
+Run directly to print the slowest imports per profile:
+    python tests/unit/test_cold_start.py
+"""
+import sys
+import os
+import subprocess
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Deferred to first use; none of these may load while the Lambda handler starts
+DEFERRED_MODULES = {"sqladmin", "celery", "apscheduler", "boto3", "httpx", "asyncpg", "analytics.scheduler"}
+
+# importtime does not report importlib.import_module (how app.py loads routers),
+# so the loaded modules are listed from sys.modules as well
+IMPORT_APP = "import sys, app; print('\\n'.join(sorted(sys.modules)))"
+
+
+def import_app(**env):
+    """
+    Import app in a new interpreter.
+    Returns (returncode, loaded module names, {module: (self_us, cumulative_us)}, stderr).
+    """
+    run_env = dict(os.environ, POSTGRES_HOST="db.invalid", SECRET_KEY="cold-start-test", **env)
+    run_env.pop("AWS_LAMBDA_FUNCTION_NAME", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_APP],
+        cwd=APP_DIR, env=run_env, capture_output=True, text=True, timeout=120
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return result.returncode, set(result.stdout.split()), timings, result.stderr
+
+
+def test_lambda_profile_defers_heavy_imports():
+    returncode, modules, timings, stderr = import_app(APP_PROFILE="lambda")
+    assert returncode == 0, stderr[-2000:]
+    assert DEFERRED_MODULES.isdisjoint(modules)
+    assert "mangum" in modules and "routers.analytics" in modules
+
+
+def test_server_profile_imports_without_database():
+    # Tables are created on startup, not at import
+    returncode, modules, timings, stderr = import_app(APP_PROFILE="server")
+    assert returncode == 0, stderr[-2000:]
+    assert "sqladmin" in modules
+
+
+def test_api_routers_limits_imported_routers():
+    returncode, modules, timings, stderr = import_app(APP_PROFILE="lambda", API_ROUTERS="auth,learning")
+    assert returncode == 0, stderr[-2000:]
+    routers = {name for name in modules if name.startswith("routers.")}
+    assert routers == {"routers.auth", "routers.learning"}
+
+
+if __name__ == "__main__":
+    for profile in ("server", "lambda"):
+        returncode, modules, timings, stderr = import_app(APP_PROFILE=profile)
+        if returncode:
+            sys.exit(stderr)
+        print(f"\n{profile}: import app {timings['app'][1] / 1000:.0f} ms")
+        slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:15]
+        for name, (self_us, cumulative_us) in slowest:
+            print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms total  {name}")
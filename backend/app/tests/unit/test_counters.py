@@ -0,0 +1,123 @@
+"""
+Unit tests for the coalesced view / download counters (services.counters).
+
+Tests coalescing, the single UPDATE ... FROM (VALUES ...) flush statement and
+restoring deltas after a failed flush, in thread and end-of-request modes. No
+database required.
+"""
+import sys
+import os
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from services.counters import CounterBuffer, build_flush_statement
+
+
+class _FakeSession:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.statements = []
+        self.committed = False
+        self.closed = False
+
+    def execute(self, statement):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.statements.append(statement)
+
+        class _Result:
+            rowcount = 1
+        return _Result()
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sessions():
+    return []
+
+
+@pytest.fixture
+def buffer(sessions, monkeypatch):
+    def factory():
+        sessions.append(_FakeSession())
+        return sessions[-1]
+
+    buffer = CounterBuffer(flush_seconds=60, session_factory=factory)
+    monkeypatch.setattr(buffer, "start", lambda: None)
+    return buffer
+
+
+def test_flush_statement_is_one_update_from_values():
+    sql = str(build_flush_statement("faq_views", {uuid4(): 3, uuid4(): 1}).compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE faqs SET view_count=(faqs.view_count + v.delta)")
+    assert "FROM (VALUES (" in sql and "AS v (id, delta) WHERE faqs.id = v.id" in sql
+    assert "updated_at=faqs.updated_at" in sql
+
+
+def test_increments_coalesce_per_row(buffer, sessions):
+    faq_id, material_id = uuid4(), uuid4()
+    for _ in range(100):
+        buffer.increment("faq_views", faq_id)
+    buffer.increment("material_downloads", material_id)
+    assert buffer.pending("faq_views", faq_id) == 100
+
+    assert buffer.flush() == 2
+    # One session, one statement per counter column, one commit
+    assert len(sessions) == 1 and len(sessions[0].statements) == 2
+    assert sessions[0].committed and sessions[0].closed
+    assert buffer.pending("faq_views", faq_id) == 0
+    assert buffer.flush() == 0 and len(sessions) == 1
+
+
+def test_failed_flush_keeps_deltas(sessions):
+    db = _FakeSession(fail=True)
+    buffer = CounterBuffer(flush_seconds=60, session_factory=lambda: db)
+    faq_id = uuid4()
+    buffer._pending["faq_views"][faq_id] += 3
+
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    buffer._pending["faq_views"][faq_id] += 1
+    assert buffer.pending("faq_views", faq_id) == 4
+
+
+def test_unknown_counter_rejected(buffer):
+    with pytest.raises(ValueError):
+        buffer.increment("lesson_views", uuid4())
+
+
+def test_request_mode_flushes_without_a_thread(sessions):
+    def factory():
+        sessions.append(_FakeSession())
+        return sessions[-1]
+
+    buffer = CounterBuffer(flush_seconds=60, session_factory=factory, flush_mode="request")
+    faq_id = uuid4()
+    buffer.increment("faq_views", faq_id)
+    buffer.increment("faq_views", faq_id)
+    assert buffer._flusher is None
+
+    buffer.flush_request()
+    assert len(sessions) == 1 and sessions[0].committed
+    assert buffer.pending("faq_views", faq_id) == 0
+
+
+def test_request_mode_failed_flush_waits_for_next_request():
+    buffer = CounterBuffer(flush_seconds=60, session_factory=lambda: _FakeSession(fail=True), flush_mode="request")
+    faq_id = uuid4()
+    buffer.increment("faq_views", faq_id)
+
+    buffer.flush_request()
+    assert buffer.pending("faq_views", faq_id) == 1
@@ -0,0 +1,173 @@
+"""
+Unit tests for the email dispatch queue (services.email_dispatch).
+
+Tests non-blocking enqueue, per-recipient coalescing, retries, the bounded
+queue and metrics, using the stub SES transport. No real AWS/SES calls.
+"""
+import sys
+import os
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import services.email as email_module
+from services.email import StubSESClient, EmailDeliveryError
+import services.email_dispatch as dispatch_module
+from services.email_dispatch import EmailDispatcher
+
+
+@pytest.fixture
+def stub_ses(monkeypatch):
+    client = StubSESClient()
+    monkeypatch.setattr(email_module, "SES_FROM_EMAIL", "noreply@test.com")
+    monkeypatch.setattr(email_module, "_get_ses_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def dispatcher():
+    d = EmailDispatcher(workers=2, max_queue_size=10, retry_base_seconds=0.01)
+    yield d
+    d.shutdown(timeout=5.0)
+
+
+def test_enqueue_returns_before_slow_ses(stub_ses, dispatcher):
+    stub_ses.latency = 0.5
+
+    start = time.perf_counter()
+    assert dispatcher.enqueue("verification", "user@example.com", {"code": "123456"}) is True
+    assert time.perf_counter() - start < 0.1
+
+    assert dispatcher.flush(timeout=5.0)
+    assert len(stub_ses.sent) == 1
+    assert "123456" in stub_ses.sent[0]["Message"]["Body"]["Text"]["Data"]
+    assert dispatcher.metrics()["send_latency"]["p50_ms"] >= 500
+
+
+def test_rapid_resends_coalesce_to_latest_code(stub_ses):
+    release = threading.Event()
+    delivered = []
+
+    def deliver(kind, to_email, params):
+        release.wait(5.0)
+        delivered.append((to_email, params["code"]))
+        return True
+
+    d = EmailDispatcher(workers=1, max_queue_size=10, deliver=deliver)
+    try:
+        # The first message occupies the only worker; the next three wait and coalesce
+        d.enqueue("verification", "other@example.com", {"code": "000000"})
+        time.sleep(0.05)
+        for code in ("111111", "222222", "333333"):
+            d.enqueue("verification", "User@Example.com", {"code": code})
+        release.set()
+        assert d.flush(timeout=5.0)
+    finally:
+        d.shutdown(timeout=5.0)
+
+    assert delivered == [("other@example.com", "000000"), ("User@Example.com", "333333")]
+    metrics = d.metrics()
+    assert metrics["enqueued"] == 2 and metrics["coalesced"] == 2
+
+
+def test_throttling_is_retried(stub_ses, dispatcher, monkeypatch):
+    calls = []
+    real_send = stub_ses.send_email
+
+    def flaky_send(**kwargs):
+        calls.append(1)
+        if len(calls) < 3:
+            raise ClientError({"Error": {"Code": "Throttling"}}, "SendEmail")
+        return real_send(**kwargs)
+
+    monkeypatch.setattr(stub_ses, "send_email", flaky_send)
+    dispatcher.enqueue("password_reset", "user@example.com", {"reset_link": "https://app.test/r?token=x"})
+    assert dispatcher.flush(timeout=5.0)
+
+    assert len(calls) == 3 and len(stub_ses.sent) == 1
+    metrics = dispatcher.metrics()
+    assert metrics["retried"] == 2 and metrics["sent"] == 1 and metrics["failed"] == 0
+
+
+def test_rejected_message_is_not_retried(stub_ses, dispatcher, monkeypatch):
+    calls = []
+
+    def rejecting_send(**kwargs):
+        calls.append(1)
+        raise ClientError({"Error": {"Code": "MessageRejected"}}, "SendEmail")
+
+    monkeypatch.setattr(stub_ses, "send_email", rejecting_send)
+    dispatcher.enqueue("verification", "user@example.com", {"code": "123456"})
+    assert dispatcher.flush(timeout=5.0)
+
+    assert len(calls) == 1
+    assert dispatcher.metrics()["failed"] == 1
+
+
+def test_full_queue_sends_inline(stub_ses):
+    release = threading.Event()
+
+    def blocked_deliver(kind, to_email, params):
+        if threading.current_thread().name.startswith("email-sender"):
+            release.wait(5.0)
+        return email_module.deliver_email(kind, to_email, params)
+
+    d = EmailDispatcher(workers=1, max_queue_size=1, deliver=blocked_deliver)
+    try:
+        d.enqueue("verification", "a@example.com", {"code": "1"})
+        time.sleep(0.05)
+        assert d.enqueue("verification", "b@example.com", {"code": "2"}) is True
+        assert d.enqueue("verification", "c@example.com", {"code": "3"}) is False
+        assert [m["Destination"]["ToAddresses"][0] for m in stub_ses.sent] == ["c@example.com"]
+        release.set()
+        assert d.flush(timeout=5.0)
+    finally:
+        d.shutdown(timeout=5.0)
+
+    recipients = sorted(m["Destination"]["ToAddresses"][0] for m in stub_ses.sent)
+    assert recipients == ["a@example.com", "b@example.com", "c@example.com"]
+    assert d.metrics()["sent_inline"] == 1
+
+
+def test_deliver_email_classifies_errors(stub_ses, monkeypatch):
+    def throttled_send(**kwargs):
+        raise ClientError({"Error": {"Code": "Throttling"}}, "SendEmail")
+
+    monkeypatch.setattr(stub_ses, "send_email", throttled_send)
+    with pytest.raises(EmailDeliveryError) as exc:
+        email_module.deliver_email("verification", "user@example.com", {"code": "1"})
+    assert exc.value.retryable is True
+
+
+def test_unknown_kind_rejected(dispatcher):
+    with pytest.raises(ValueError):
+        dispatcher.enqueue("newsletter", "user@example.com", {})
+
+
+def test_inline_backend_sends_before_returning(stub_ses, monkeypatch):
+    d = EmailDispatcher(workers=1, max_queue_size=10)
+    monkeypatch.setattr(dispatch_module, "EMAIL_DISPATCH_BACKEND", "inline")
+    monkeypatch.setattr(dispatch_module, "email_dispatcher", d)
+
+    dispatch_module.queue_verification_email("user@example.com", "654321")
+
+    # Sent on the caller's thread: nothing is left for a (frozen) sender thread
+    assert len(stub_ses.sent) == 1 and not d._threads
+    assert d.metrics()["sent_inline"] == 1
+
+
+def test_lambda_profile_defaults_to_inline():
+    import subprocess
+
+    env = {**os.environ, "AWS_LAMBDA_FUNCTION_NAME": "api"}
+    env.pop("APP_PROFILE", None)
+    env.pop("EMAIL_DISPATCH_BACKEND", None)
+    out = subprocess.run(
+        [sys.executable, "-c", "from services.email_dispatch import EMAIL_DISPATCH_BACKEND; print(EMAIL_DISPATCH_BACKEND)"],
+        cwd=os.path.join(os.path.dirname(__file__), "..", ".."), env=env, capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip() == "inline"
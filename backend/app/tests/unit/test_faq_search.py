@@ -0,0 +1,54 @@
+"""
+Unit tests for FAQ full-text search (routers.help_support.get_faqs).
+
+Tests the generated search column and the ranked query compiled for
+PostgreSQL. No database required.
+"""
+import sys
+import os
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from models import FAQ
+from routers.help_support import get_faqs
+
+
+@pytest.fixture
+def statements(monkeypatch):
+    captured = []
+
+    def all(query):
+        captured.append(str(query.statement.compile(dialect=postgresql.dialect())))
+        return []
+
+    monkeypatch.setattr(Query, "all", all)
+    return captured
+
+
+def test_search_vector_is_generated_and_gin_indexed():
+    ddl = str(CreateTable(FAQ.__table__).compile(dialect=postgresql.dialect()))
+    assert "search_vector TSVECTOR GENERATED ALWAYS AS (setweight(" in ddl
+    index = next(i for i in FAQ.__table__.indexes if i.name == "ix_faqs_search_vector")
+    assert "USING gin (search_vector)" in str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+
+def test_search_ranks_indexed_matches_and_highlights_page(statements):
+    assert get_faqs(db=Session(), category="rewards", search="earn coins", limit=10) == []
+
+    sql = statements[0]
+    assert "faqs.search_vector @@ websearch_to_tsquery(" in sql
+    assert "ILIKE" not in sql
+    assert "ORDER BY rank DESC" in sql and "LIMIT" in sql
+    # ts_headline is applied outside the ranked, limited subquery
+    assert sql.index("ts_headline(") < sql.index("JOIN (SELECT")
+
+
+def test_no_search_keeps_curated_order(statements):
+    get_faqs(db=Session(), category=None, search="  ", limit=10)
+    assert "ORDER BY faqs.order_index, faqs.question" in statements[0]
+    assert "search_vector" not in statements[0]
@@ -0,0 +1,207 @@
+"""
+Unit tests for the HubSpot outbox (services.hubspot).
+
+Runs a local fake HubSpot server: queuing a sync never calls it, and the outbox
+worker sends coalesced batch upserts over one pooled connection with retries.
+No database and no real HubSpot calls.
+"""
+import sys
+import os
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import services.hubspot as hubspot
+from models import HubSpotOutbox
+
+
+class _FakeHubSpot(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append({"path": self.path, "body": body, "port": self.client_address[1]})
+        time.sleep(server.delay)
+
+        status, payload = server.responses.pop(0) if server.responses else (200, {"results": []})
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_hubspot(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeHubSpot)
+    server.requests, server.responses, server.delay = [], [], 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv("HUBSPOT_ACCESS_TOKEN", "test-token")
+    monkeypatch.setattr(hubspot, "HUBSPOT_API_BASE", f"http://127.0.0.1:{server.server_address[1]}")
+    hubspot.close_client()
+    yield server
+    hubspot.close_client()
+    server.shutdown()
+    server.server_close()
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+
+def _user(email="buyer@example.com"):
+    return SimpleNamespace(
+        id=uuid4(), email=email, first_name="Ada", last_name="Lovelace",
+        marketing_consent=True, phone=None, date_of_birth=None,
+    )
+
+
+def _entry(email, properties, minutes_ago=0):
+    return HubSpotOutbox(
+        user_id=uuid4(), email=email, event_type="register", properties=properties,
+        status="pending", attempts=0,
+        created_at=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+    )
+
+
+def test_registration_does_not_wait_for_hubspot(fake_hubspot):
+    fake_hubspot.delay = 2.0
+    db = _RecordingSession()
+
+    start = time.perf_counter()
+    hubspot.queue_contact_on_register(db, _user())
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < fake_hubspot.delay / 4
+    assert fake_hubspot.requests == []
+    assert len(db.added) == 1 and db.added[0].status == "pending"
+    assert db.added[0].properties["email"] == "buyer@example.com"
+
+
+def test_nothing_queued_without_token(monkeypatch):
+    monkeypatch.delenv("HUBSPOT_ACCESS_TOKEN", raising=False)
+    db = _RecordingSession()
+    hubspot.queue_contact_on_register(db, _user())
+    assert db.added == []
+
+
+def test_batch_upsert_coalesces_by_email(fake_hubspot):
+    entries = [
+        _entry("a@example.com", {"email": "a@example.com", "firstname": "Old"}, minutes_ago=2),
+        _entry("b@example.com", {"email": "b@example.com"}),
+        _entry("A@example.com", {"email": "A@example.com", "firstname": "New", "has_realtor": True}),
+    ]
+
+    counts = hubspot.process_outbox_batch(entries)
+
+    assert counts == {"sent": 3, "retried": 0, "failed": 0}
+    assert len(fake_hubspot.requests) == 1
+    request = fake_hubspot.requests[0]
+    assert request["path"] == hubspot.HUBSPOT_CONTACTS_BATCH_UPSERT
+    inputs = {i["id"]: i for i in request["body"]["inputs"]}
+    assert set(inputs) == {"a@example.com", "b@example.com"}
+    assert inputs["a@example.com"]["idProperty"] == "email"
+    assert inputs["a@example.com"]["properties"]["firstname"] == "New"
+    assert all(e.status == "sent" and e.sent_at for e in entries)
+
+
+def test_batches_reuse_one_connection(fake_hubspot):
+    hubspot.process_outbox_batch([_entry("a@example.com", {"email": "a@example.com"})])
+    hubspot.process_outbox_batch([_entry("b@example.com", {"email": "b@example.com"})])
+
+    assert len(fake_hubspot.requests) == 2
+    assert fake_hubspot.requests[0]["port"] == fake_hubspot.requests[1]["port"]
+
+
+def test_server_error_retries_with_backoff(fake_hubspot):
+    fake_hubspot.responses = [(503, {"message": "unavailable"})] * 2
+    entry = _entry("a@example.com", {"email": "a@example.com"})
+
+    assert hubspot.process_outbox_batch([entry])["retried"] == 1
+    first_delay = entry.next_attempt_at - datetime.now(timezone.utc)
+    assert entry.status == "pending" and entry.attempts == 1 and "503" in entry.last_error
+
+    hubspot.process_outbox_batch([entry])
+    second_delay = entry.next_attempt_at - datetime.now(timezone.utc)
+    assert entry.attempts == 2
+    assert second_delay > first_delay
+
+
+def test_entry_fails_after_max_attempts(fake_hubspot):
+    fake_hubspot.responses = [(500, {})]
+    entry = _entry("a@example.com", {"email": "a@example.com"})
+    entry.attempts = hubspot.OUTBOX_MAX_ATTEMPTS - 1
+
+    assert hubspot.process_outbox_batch([entry])["failed"] == 1
+    assert entry.status == "failed"
+
+
+def test_multi_status_retries_only_failed_contacts(fake_hubspot):
+    fake_hubspot.responses = [(207, {
+        "status": "COMPLETE",
+        "results": [{"id": "1"}],
+        "errors": [{"status": "error", "message": "Property values were not valid", "context": {"ids": ["b@example.com"]}}],
+    })]
+    ok = _entry("a@example.com", {"email": "a@example.com"})
+    bad = _entry("b@example.com", {"email": "b@example.com"})
+
+    counts = hubspot.process_outbox_batch([ok, bad])
+
+    assert counts == {"sent": 1, "retried": 1, "failed": 0}
+    assert ok.status == "sent"
+    assert bad.status == "pending" and bad.attempts == 1
+
+
+def test_multi_status_matches_ids_exactly(fake_hubspot):
+    fake_hubspot.responses = [(207, {
+        "status": "COMPLETE",
+        "errors": [{"status": "error", "message": "Invalid email aa@example.com", "context": {"ids": ["aa@example.com"]}}],
+    })]
+    ok = _entry("a@example.com", {"email": "a@example.com"})
+    bad = _entry("aa@example.com", {"email": "aa@example.com"})
+
+    assert hubspot.process_outbox_batch([ok, bad]) == {"sent": 1, "retried": 1, "failed": 0}
+    assert ok.status == "sent" and bad.status == "pending"
+
+
+def test_multi_status_unmatched_error_retries_whole_batch(fake_hubspot):
+    fake_hubspot.responses = [(207, {
+        "status": "COMPLETE",
+        "errors": [{"status": "error", "category": "VALIDATION_ERROR", "message": "Property values were not valid"}],
+    })]
+    first = _entry("a@example.com", {"email": "a@example.com"})
+    second = _entry("b@example.com", {"email": "b@example.com"})
+
+    assert hubspot.process_outbox_batch([first, second]) == {"sent": 0, "retried": 2, "failed": 0}
+    assert first.status == second.status == "pending"
+
+
+def test_connection_error_is_retried(monkeypatch):
+    monkeypatch.setenv("HUBSPOT_ACCESS_TOKEN", "test-token")
+    monkeypatch.setattr(hubspot, "HUBSPOT_API_BASE", "http://127.0.0.1:9")
+    hubspot.close_client()
+    entry = _entry("a@example.com", {"email": "a@example.com"})
+    try:
+        assert hubspot.process_outbox_batch([entry])["retried"] == 1
+    finally:
+        hubspot.close_client()
+    assert entry.status == "pending" and entry.last_error
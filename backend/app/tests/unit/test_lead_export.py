@@ -0,0 +1,95 @@
+"""
+Unit tests for analytics.lead_export (cursor encoding and export rendering).
+
+Tests pure logic: cursor round-trip, malformed cursors, CSV/NDJSON output.
+No database required.
+"""
+import sys
+import os
+import json
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from analytics.lead_export import (
+    EXPORT_COLUMNS,
+    INTENT_LABELS,
+    TEMPERATURE_LABELS,
+    InvalidLeadCursor,
+    decode_lead_cursor,
+    encode_lead_cursor,
+    iter_csv_export,
+    iter_ndjson_export,
+)
+
+
+def _row(**overrides):
+    row = {
+        "user_id": uuid4(),
+        "email": "lead@example.com",
+        "first_name": "Ada",
+        "last_name": "Lovelace",
+        "composite_score": 812.5,
+        "lead_temperature": "hot_lead",
+        "temperature_label": TEMPERATURE_LABELS["hot_lead"],
+        "intent_band": "high_intent",
+        "intent_label": INTENT_LABELS["high_intent"],
+        "profile_completion_pct": 75.0,
+        "last_activity_at": None,
+        "created_at": datetime(2026, 1, 2, 3, 4, 5),
+    }
+    row.update(overrides)
+    return row
+
+
+def test_cursor_round_trip():
+    user_id = uuid4()
+    cursor = encode_lead_cursor(Decimal("812.50"), user_id)
+    assert decode_lead_cursor(cursor) == (Decimal("812.50"), user_id)
+
+
+def test_cursor_round_trip_unscored_tail():
+    user_id = uuid4()
+    cursor = encode_lead_cursor(None, user_id)
+    assert decode_lead_cursor(cursor) == (None, user_id)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_lead_cursor(Decimal("999.99"), uuid4())
+    assert "=" not in cursor
+    assert "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!!", "e30", "eyJzIjoiYWJjIiwidSI6IngifQ"])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(InvalidLeadCursor):
+        decode_lead_cursor(cursor)
+
+
+def test_labels_cover_every_band():
+    assert set(TEMPERATURE_LABELS) == {"hot_lead", "warm_lead", "cold_lead", "dormant"}
+    assert set(INTENT_LABELS) == {"very_high_intent", "high_intent", "medium_intent", "low_intent"}
+    assert "Unknown" not in TEMPERATURE_LABELS.values()
+
+
+def test_csv_export_header_and_rows():
+    rows = [_row(), _row(email="other@example.com")]
+    chunks = list(iter_csv_export(iter(rows)))
+    assert len(chunks) == 3
+    assert chunks[0].strip() == ",".join(EXPORT_COLUMNS)
+    assert "other@example.com" in chunks[2]
+    assert "2026-01-02T03:04:05" in chunks[1]
+
+
+def test_ndjson_export_one_object_per_line():
+    row = _row()
+    lines = list(iter_ndjson_export(iter([row])))
+    assert len(lines) == 1 and lines[0].endswith("\n")
+    data = json.loads(lines[0])
+    assert data["user_id"] == str(row["user_id"])
+    assert data["last_activity_at"] is None
+    assert list(data) == EXPORT_COLUMNS
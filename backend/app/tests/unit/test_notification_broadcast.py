@@ -0,0 +1,151 @@
+"""
+Unit tests for NotificationBroadcastManager (utils) and broadcast schemas.
+
+Tests segment filters, the set-based fan-out statement compiled for
+PostgreSQL and concurrent submissions of one broadcast id. No database
+required.
+"""
+import sys
+import os
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from models import NotificationBroadcast
+from schemas import NotificationBroadcastRequest
+from utils import NotificationBroadcastManager
+
+
+def _sql(clauses):
+    return " AND ".join(
+        str(c.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        for c in clauses
+    )
+
+
+def test_empty_segment_is_all_active_users():
+    assert _sql(NotificationBroadcastManager.segment_filters({})) == "users.is_active = true"
+
+
+def test_segment_filters():
+    module_id = uuid4()
+    sql = _sql(NotificationBroadcastManager.segment_filters({
+        "lead_temperatures": ["hot_lead"],
+        "onboarding_completed": True,
+        "module_id": str(module_id),
+        "module_status": "completed",
+    }))
+    assert "user_lead_scores.lead_temperature IN ('hot_lead')" in sql
+    assert "users.id IN (SELECT user_onboarding.user_id" in sql
+    assert "user_module_progress.status = 'completed'" in sql
+
+
+def test_not_started_module_includes_users_without_progress():
+    sql = _sql(NotificationBroadcastManager.segment_filters({
+        "module_id": str(uuid4()), "module_status": "not_started", "onboarding_completed": False,
+    }))
+    assert "users.id NOT IN (SELECT user_module_progress.user_id" in sql
+    assert "user_module_progress.status != 'not_started'" in sql
+    assert "users.id NOT IN (SELECT user_onboarding.user_id" in sql
+
+
+class _CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+
+        class _Result:
+            def one(self):
+                return (3, 2)
+        return _Result()
+
+
+def test_fan_out_is_one_idempotent_statement():
+    broadcast = NotificationBroadcast(
+        id=uuid4(), notification_type="system", title="Hello", message="Announcement",
+        priority="normal", expires_at=datetime(2026, 6, 1, tzinfo=timezone.utc),
+    )
+    db = _CapturingSession()
+
+    counts = NotificationBroadcastManager._fan_out_chunk(
+        db, broadcast, NotificationBroadcastManager.segment_filters({})
+    )
+
+    assert counts == (3, 2)
+    assert len(db.statements) == 1
+    sql = db.statements[0]
+    assert "INSERT INTO notifications" in sql and "FROM recipients" in sql
+    assert "ON CONFLICT (broadcast_id, user_id) WHERE broadcast_id IS NOT NULL DO NOTHING" in sql
+    assert "UPDATE user_notification_counters" in sql
+    assert "next_expiry_at=least(" in sql
+
+
+def test_broadcast_request_validation():
+    request = NotificationBroadcastRequest(title="Hi", message="There")
+    assert request.segment.lead_temperatures is None and request.priority == "normal"
+    with pytest.raises(ValidationError):
+        NotificationBroadcastRequest(title="Hi", message="There", priority="urgent")
+    with pytest.raises(ValidationError):
+        NotificationBroadcastRequest(title="Hi", message="There", segment={"module_status": "halfway"})
+
+
+def test_module_filter_needs_both_fields():
+    with pytest.raises(ValidationError):
+        NotificationBroadcastRequest(title="Hi", message="There", segment={"module_id": str(uuid4())})
+    with pytest.raises(ValidationError):
+        NotificationBroadcastRequest(title="Hi", message="There", segment={"module_status": "completed"})
+    # A stored partial segment is rejected rather than sent to every active user
+    with pytest.raises(ValueError):
+        NotificationBroadcastManager.segment_filters({"module_id": str(uuid4())})
+
+
+class _RacingSession:
+    """The id lookup misses, then the insert loses to a concurrent submission"""
+
+    def __init__(self, winner):
+        self.winner = winner
+        self.lookups = 0
+        self.rolled_back = False
+
+    def query(self, *args):
+        session = self
+
+        class _Query:
+            def filter(self, *args):
+                return self
+
+            def first(self):
+                session.lookups += 1
+                return None if session.lookups == 1 else session.winner
+
+            def scalar(self):
+                return 10
+        return _Query()
+
+    def add(self, obj):
+        pass
+
+    def commit(self):
+        raise IntegrityError("INSERT INTO notification_broadcasts", {}, Exception("duplicate key"))
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_concurrent_submission_returns_the_existing_broadcast():
+    winner = NotificationBroadcast(id=uuid4(), title="Hi", message="There", status="pending")
+    db = _RacingSession(winner)
+
+    broadcast, created = NotificationBroadcastManager.start_broadcast(
+        db, {"broadcast_id": winner.id, "title": "Hi", "message": "There"}
+    )
+    assert broadcast is winner and created is False
+    assert db.rolled_back
@@ -0,0 +1,73 @@
+"""
+Unit tests for NotificationCompactionManager (utils).
+
+Tests the batched delete and roll-up statements compiled for PostgreSQL and
+the time budget. No database required.
+"""
+import sys
+import os
+import time
+
+from sqlalchemy.dialects import postgresql
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from utils import NotificationCompactionManager
+
+
+class _CapturingSession:
+    """Records compiled statements; each execute returns the next rowcount / counts"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        value = self.results.pop(0)
+
+        class _Result:
+            rowcount = value
+
+            def one(self):
+                return value
+        return _Result()
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_delete_expired_runs_bounded_batches():
+    db = _CapturingSession([5000, 5000, 12])
+
+    deleted = NotificationCompactionManager.delete_expired(db, time.monotonic() + 60, batch_size=5000)
+
+    assert deleted == 10012
+    assert len(db.statements) == 3 and db.commits == 3
+    sql = db.statements[0]
+    assert sql.startswith("DELETE FROM notifications WHERE notifications.id IN (SELECT notifications.id")
+    assert "notifications.expires_at <= now()" in sql and "LIMIT" in sql
+
+
+def test_delete_expired_stops_at_deadline():
+    db = _CapturingSession([])
+    assert NotificationCompactionManager.delete_expired(db, time.monotonic() - 1) == 0
+    assert db.statements == []
+
+
+def test_roll_up_deletes_and_inserts_digests_in_one_statement():
+    db = _CapturingSession([(40, 3), (0, 0)])
+
+    deleted, digests = NotificationCompactionManager.roll_up_coin_notifications(db, time.monotonic() + 60)
+
+    assert (deleted, digests) == (40, 3)
+    assert len(db.statements) == 2
+    sql = db.statements[0]
+    assert sql.startswith("WITH users AS \n(SELECT DISTINCT notifications.user_id")
+    assert "rolled_up AS \n(DELETE FROM notifications" in sql and "notifications.is_read = true" in sql
+    # Month-aligned cutoff, and the month's existing digest is merged
+    assert "notifications.created_at < date_trunc(%(date_trunc_1)s, now() - %(now_1)s)" in sql
+    assert "OR notifications.notification_type = %(notification_type_2)s" in sql
+    assert "INSERT INTO notifications" in sql and "FROM parts GROUP BY parts.user_id, parts.verb, parts.period" in sql
+    assert "date_trunc(" in sql and "RETURNING notifications.id" in sql
@@ -0,0 +1,261 @@
+"""
+Unit tests for the notification stream (services.notification_stream and the
+SSE generator in routers.notifications).
+
+Tests hub wake-ups and coalescing, SSE formatting, resume cursors and
+heartbeats with in-memory reads, late commits with in-memory SQLite, and the
+unread-count wake-ups. No database or LISTEN connection required.
+"""
+import sys
+import os
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import routers.notifications as notifications_router
+from services.notification_stream import NotificationHub, format_event
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = NotificationHub()
+    monkeypatch.setattr(hub, "start_listener", lambda: None)
+    monkeypatch.setattr(notifications_router, "notification_hub", hub)
+    return hub
+
+
+def test_format_event():
+    event = format_event("notification", {"title": "Hi"}, event_id="abc")
+    assert event == 'id: abc\nevent: notification\ndata: {"title": "Hi"}\n\n'
+
+
+def test_publish_from_other_thread_wakes_stream(hub):
+    async def scenario():
+        user_id = uuid4()
+        wakeups = hub.subscribe(user_id)
+        other = hub.subscribe(uuid4())
+
+        thread = threading.Thread(target=lambda: [hub.publish(user_id) for _ in range(5)])
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.01)
+
+        # Five publishes coalesce into one pending wake-up
+        assert wakeups.qsize() == 1 and other.qsize() == 0
+        hub.unsubscribe(user_id, wakeups)
+        assert hub.subscriber_count() == 1
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_payload_wakes_every_stream(hub):
+    async def scenario():
+        streams = [hub.subscribe(uuid4()) for _ in range(3)]
+        hub._dispatch(json.dumps({"all": True}))
+        await asyncio.sleep(0.01)
+        assert all(wakeups.qsize() == 1 for wakeups in streams)
+
+    asyncio.run(scenario())
+
+
+def test_dispatch_ignores_malformed_payload(hub):
+    hub._dispatch("not json")
+    hub._dispatch(json.dumps({"id": "x"}))
+
+
+class _FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+class _FakeStore:
+    """In-memory stand-in for the stream's threadpool reads"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.rows = []
+        self.reads = 0
+
+    def add(self):
+        created_at = datetime(2026, 1, 1) + timedelta(seconds=len(self.rows))
+        self.rows.append((created_at, uuid4()))
+        return self.rows[-1]
+
+    def resolve(self, user_id, last_event_id):
+        matches = [r for r in self.rows if str(r[1]) == last_event_id]
+        if matches:
+            return matches[0]
+        return self.rows[-1] if self.rows else None
+
+    def read(self, user_id, cursor):
+        self.reads += 1
+        after = [r for r in self.rows if cursor is None or r > cursor]
+        events = [format_event("notification", {}, event_id=str(r[1])) for r in after]
+        return events, (after[-1] if after else cursor), len(self.rows)
+
+
+@pytest.fixture
+def store(hub, monkeypatch):
+    store = _FakeStore(uuid4())
+    monkeypatch.setattr(notifications_router, "_resolve_stream_cursor", store.resolve)
+    monkeypatch.setattr(notifications_router, "_read_stream", store.read)
+    monkeypatch.setattr(notifications_router, "STREAM_HEARTBEAT_SECONDS", 0.05)
+    return store
+
+
+def _event_ids(chunks):
+    return [line[4:] for chunk in chunks for line in chunk.splitlines() if line.startswith("id: ")]
+
+
+def test_stream_pushes_new_notifications(hub, store):
+    store.add()  # existing before connect: not replayed
+
+    async def scenario():
+        hub.listening = True
+        stream = notifications_router._notification_events(_FakeRequest(), store.user_id, None)
+        assert (await stream.__anext__()).startswith("retry:")
+        assert "unread_count" in await stream.__anext__()
+
+        _, new_id = store.add()
+        hub.publish(store.user_id)
+        assert _event_ids([await stream.__anext__()]) == [str(new_id)]
+        assert '"unread_count": 2' in await stream.__anext__()
+        await stream.aclose()
+        assert hub.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_resumes_after_last_event_id(hub, store):
+    first = store.add()
+    missed = [store.add()[1], store.add()[1]]
+
+    async def scenario():
+        stream = notifications_router._notification_events(_FakeRequest(), store.user_id, str(first[1]))
+        chunks = [await stream.__anext__() for _ in range(3)]
+        await stream.aclose()
+        return chunks
+
+    assert _event_ids(asyncio.run(scenario())) == [str(i) for i in missed]
+
+
+def test_heartbeat_and_disconnect(hub, store):
+    async def scenario():
+        hub.listening = False
+        request = _FakeRequest()
+        stream = notifications_router._notification_events(request, store.user_id, None)
+        await stream.__anext__()
+        await stream.__anext__()
+        reads = store.reads
+
+        assert (await stream.__anext__()).startswith(": heartbeat")
+        # No LISTEN connection: the heartbeat also re-reads
+        store.add()
+        assert "id: " in await stream.__anext__()
+        assert store.reads > reads
+
+        request.disconnected = True
+        remaining = [chunk async for chunk in stream]
+        assert all(not chunk.startswith("id:") for chunk in remaining)
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def notification_db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.orm import sessionmaker
+    from models import Notification
+
+    # notifications table on SQLite: PostgreSQL UUIDs stored as text
+    compiles(PG_UUID, "sqlite")(lambda type_, compiler, **kw: "CHAR(32)")
+    engine = create_engine("sqlite://")
+    Notification.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+
+def _add_notification(db, user_id, created_at):
+    from models import Notification
+
+    notification = Notification(
+        id=uuid4(), user_id=user_id, notification_type="system", title="t", message="m",
+        is_read=False, priority="normal", created_at=created_at,
+    )
+    db.add(notification)
+    db.commit()
+    return notification.id
+
+
+def test_late_commit_with_earlier_created_at_is_still_sent(notification_db):
+    from services.notification_stream import resolve_cursor, fetch_after
+
+    user_id = uuid4()
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    _add_notification(notification_db, user_id, start)
+    cursor = resolve_cursor(notification_db, user_id, None)
+    assert fetch_after(notification_db, user_id, cursor) == []
+
+    # Stamped at +5 s but committed after the +10 s one was already sent
+    newer = _add_notification(notification_db, user_id, start + timedelta(seconds=10))
+    sent = fetch_after(notification_db, user_id, cursor)
+    for notification in sent:
+        cursor.advance(notification)
+    assert [n.id for n in sent] == [newer] and cursor.event_id == str(newer)
+
+    late = _add_notification(notification_db, user_id, start + timedelta(seconds=5))
+    sent = fetch_after(notification_db, user_id, cursor)
+    for notification in sent:
+        cursor.advance(notification)
+    assert [n.id for n in sent] == [late]
+    # The cursor stays on the newest notification, so a resume does not rewind
+    assert cursor.event_id == str(newer)
+    assert fetch_after(notification_db, user_id, cursor) == []
+
+
+def test_resume_treats_earlier_notifications_as_sent(notification_db):
+    from services.notification_stream import resolve_cursor, fetch_after
+
+    user_id = uuid4()
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    first = _add_notification(notification_db, user_id, start)
+    second = _add_notification(notification_db, user_id, start + timedelta(seconds=1))
+    missed = _add_notification(notification_db, user_id, start + timedelta(seconds=2))
+
+    cursor = resolve_cursor(notification_db, user_id, str(second))
+    assert set(cursor.sent) == {first, second}
+    assert [n.id for n in fetch_after(notification_db, user_id, cursor)] == [missed]
+
+
+def test_read_and_delete_wake_the_users_streams(monkeypatch):
+    import utils
+    from models import Notification
+    from utils import NotificationManager
+
+    woken = []
+    monkeypatch.setattr(utils, "notify_unread_count_changed", lambda db, user_id: woken.append(user_id))
+    monkeypatch.setattr(NotificationManager, "_adjust_unread_count", staticmethod(lambda *args, **kwargs: None))
+
+    class _Session:
+        def delete(self, obj):
+            pass
+
+    user_id = uuid4()
+    notification = Notification(id=uuid4(), user_id=user_id, is_read=False)
+    NotificationManager.set_read(_Session(), notification, True)
+    NotificationManager.set_read(_Session(), notification, True)  # unchanged: no wake-up
+    NotificationManager.set_read(_Session(), notification, False)
+    NotificationManager.delete_notification(_Session(), notification)
+    assert woken == [user_id] * 3
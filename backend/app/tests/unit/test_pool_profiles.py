@@ -0,0 +1,71 @@
+"""
+Unit tests for the connection pool profiles and pool metrics (database).
+
+Tests profile selection, env overrides and the checkout / timeout /
+invalidation counters against an in-memory SQLite engine. No database required.
+"""
+import sys
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from database import (
+    MeteredNullPool, MeteredQueuePool, create_metered_engine, pool_settings, pool_status
+)
+
+
+def test_profiles_size_the_pool_per_process_type():
+    api, lam, worker = pool_settings("api"), pool_settings("lambda"), pool_settings("worker")
+    assert api["poolclass"] is MeteredQueuePool and api["pool_pre_ping"] is True
+    assert lam["pool_size"] == 1 and lam["pool_pre_ping"] is False
+    assert worker["pool_size"] > api["pool_size"]
+    assert pool_settings("external") == {"poolclass": MeteredNullPool, "pool_pre_ping": False}
+    with pytest.raises(ValueError):
+        pool_settings("unknown")
+
+
+def test_env_overrides_single_values(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "true")
+    settings = pool_settings("lambda")
+    assert settings["pool_size"] == 3 and settings["pool_pre_ping"] is True
+    # NullPool has no size to override
+    assert "pool_size" not in pool_settings("external")
+
+
+def test_metrics_count_checkouts_timeouts_and_invalidations(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "0")
+    engine = create_metered_engine("sqlite://", profile="api")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        conn.invalidate()
+
+    status = pool_status(engine)
+    assert status["profile"] == "api" and status["pool_class"] == "MeteredQueuePool"
+    assert status["checkouts"] == 1 and status["checkout_timeouts"] == 1
+    assert status["invalidations"] == 1 and status["peak_checked_out"] == 1
+    assert status["checked_out"] == 0
+
+    # dispose() recreates the pool; metrics carry over
+    engine.dispose()
+    with engine.connect():
+        pass
+    assert pool_status(engine)["checkouts"] == 2
+
+
+def test_null_pool_reports_counters_only():
+    engine = create_metered_engine("sqlite://", profile="external")
+    with engine.connect():
+        pass
+    status = pool_status(engine)
+    assert status["checkouts"] == 1 and status["connects"] == 1
+    assert "size" not in status
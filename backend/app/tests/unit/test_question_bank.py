@@ -0,0 +1,101 @@
+"""
+Unit tests for the pre-serialized minigame question banks (services.question_bank).
+
+Tests cache hits, content-version and TTL rebuilds, and that the spliced
+response is the documented MiniGameQuestionsResponse. No database required.
+"""
+import sys
+import os
+import json
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import services.question_bank as question_bank
+from models import Module, Lesson
+from schemas import MiniGameQuestionsResponse
+from services.question_bank import QuestionBankCache, module_questions_response
+
+
+def _module_with_lessons(count=2):
+    module = Module(id=uuid4(), title="Budgeting", updated_at=datetime(2026, 1, 1))
+    lessons = [
+        Lesson(id=uuid4(), module_id=module.id, title=f"Lesson {i}", order_index=i, updated_at=datetime(2026, 1, 1))
+        for i in range(count)
+    ]
+    return module, lessons
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+
+    def fake_build(db, lessons):
+        calls.append([lesson.id for lesson in lessons])
+        return [
+            {
+                "id": str(uuid4()), "lesson_id": str(lesson.id), "lesson_title": lesson.title,
+                "question_text": "Q?", "question_type": "multiple_choice", "order_index": 0,
+                "answers": [{"id": str(uuid4()), "answer_text": "A", "order_index": 0}],
+            }
+            for lesson in lessons
+        ]
+
+    monkeypatch.setattr(question_bank, "build_questions", fake_build)
+    return calls
+
+
+def test_bank_is_built_once_per_version(builds):
+    cache = QuestionBankCache(ttl_seconds=300)
+    module, lessons = _module_with_lessons()
+
+    first = cache.get(None, module, lessons)
+    assert cache.get(None, module, lessons) is first
+    assert len(builds) == 1 and first.total_questions == 2
+
+    lessons[0].updated_at = datetime(2026, 2, 1)
+    assert cache.get(None, module, lessons) is not first
+    assert len(builds) == 2
+
+
+def test_ttl_and_invalidate_rebuild(builds):
+    cache = QuestionBankCache(ttl_seconds=0)
+    module, lessons = _module_with_lessons()
+    cache.get(None, module, lessons)
+    cache.get(None, module, lessons)
+    assert len(builds) == 2
+
+    cache = QuestionBankCache(ttl_seconds=300)
+    cache.get(None, module, lessons)
+    cache.invalidate(module.id)
+    cache.get(None, module, lessons)
+    assert len(builds) == 4
+
+
+def test_cache_is_bounded(builds):
+    cache = QuestionBankCache(max_modules=2)
+    modules = [_module_with_lessons(1) for _ in range(3)]
+    for module, lessons in modules:
+        cache.get(None, module, lessons)
+    cache.get(None, *modules[0])
+    assert len(builds) == 4
+
+
+def test_spliced_response_matches_schema(builds):
+    module, lessons = _module_with_lessons()
+    bank = QuestionBankCache().get(None, module, lessons)
+
+    response = module_questions_response({
+        "module": {"id": str(module.id), "title": module.title},
+        "total_lessons": 2,
+        "completed_lessons": 2,
+        "total_questions": bank.total_questions,
+        "user_status": {"can_play": True},
+    }, bank)
+
+    body = json.loads(response.body)
+    assert response.media_type == "application/json"
+    assert MiniGameQuestionsResponse(**body).total_questions == len(body["questions"]) == 2
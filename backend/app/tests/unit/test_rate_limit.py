@@ -0,0 +1,76 @@
+"""
+Unit tests for the shared rate limiter (rate_limit).
+
+Tests user / IP keying, per-route limit overrides and hit / rejection metrics
+against an in-memory limiter. No database required.
+"""
+import sys
+import os
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from auth import AuthManager
+from rate_limit import MeteredLimiter, rate_limit_key, route_limit
+
+
+def _bearer(user_id, token_type="access"):
+    if token_type == "refresh":
+        token = AuthManager.create_refresh_token({"sub": str(user_id)})
+    else:
+        token = AuthManager.create_access_token({"sub": str(user_id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def limited():
+    limiter = MeteredLimiter(key_func=rate_limit_key, storage_uri="memory://", strategy="moving-window")
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.post("/submit")
+    @limiter.limit("2/minute")
+    def submit(request: Request):
+        return {"ok": True}
+
+    return TestClient(app), limiter
+
+
+def test_authenticated_users_get_their_own_bucket(limited):
+    client, _ = limited
+    alice, bob = _bearer(uuid4()), _bearer(uuid4())
+
+    assert [client.post("/submit", headers=alice).status_code for _ in range(3)] == [200, 200, 429]
+    # Same client address, different user: separate bucket
+    assert client.post("/submit", headers=bob).status_code == 200
+
+
+def test_anonymous_and_invalid_tokens_fall_back_to_ip(limited):
+    client, _ = limited
+    assert client.post("/submit").status_code == 200
+    assert client.post("/submit", headers={"Authorization": "Bearer not-a-jwt"}).status_code == 200
+    assert client.post("/submit", headers=_bearer(uuid4(), token_type="refresh")).status_code == 429
+
+
+def test_metrics_count_hits_and_rejections(limited):
+    client, limiter = limited
+    headers = _bearer(uuid4())
+    for _ in range(4):
+        client.post("/submit", headers=headers)
+
+    metrics = limiter.metrics()
+    assert metrics["routes"]["submit"] == {"hits": 4, "rejected": 2}
+    assert metrics["storage"] == "memory"
+
+
+def test_route_limit_override(monkeypatch):
+    assert route_limit("minigame_submit") == "10/minute"
+    monkeypatch.setenv("RATE_LIMIT_MINIGAME_SUBMIT", "25/minute")
+    assert route_limit("minigame_submit") == "25/minute"
@@ -0,0 +1,107 @@
+"""
+Unit tests for read-replica routing (database.ReplicaRouter, get_read_db).
+
+Tests replica / primary selection by lag, the lag check interval,
+read-your-writes and the read-only guard, with SQLite engines and a stubbed
+lag measurement. No database required.
+"""
+import sys
+import os
+from uuid import uuid4
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import database
+from database import READ_YOUR_WRITES_HEADER, ReplicaRouter, get_read_db
+from models import User
+
+
+def _router(lags, url="sqlite://", check_interval_seconds=0):
+    router = ReplicaRouter(
+        url=url,
+        primary_sessions=sessionmaker(bind=create_engine("sqlite://")),
+        max_lag_seconds=10,
+        check_interval_seconds=check_interval_seconds
+    )
+    measured = iter(lags)
+    router._measure_lag = lambda: next(measured)
+    return router
+
+
+def _target(router, db):
+    return "replica" if db.get_bind() is router.engine else "primary"
+
+
+def test_fresh_replica_serves_reads_and_lagging_one_falls_back():
+    router = _router([2.0, 30.0, None])
+    assert _target(router, router.session()) == "replica"
+    assert _target(router, router.session()) == "primary"  # 30 s behind
+    assert _target(router, router.session()) == "primary"  # unreachable
+    status = router.status()
+    assert status["reads"] == {"replica": 1, "primary": 2} and status["fallbacks"] == 2
+    assert status["lag_seconds"] is None and "pool" in status
+
+
+def test_lag_is_measured_once_per_interval():
+    router = _router([1.0], check_interval_seconds=60)
+    for _ in range(5):
+        assert _target(router, router.session()) == "replica"
+
+
+def test_read_your_writes_and_unconfigured_replica_use_primary():
+    router = _router([0.0])
+    assert _target(router, router.session(read_your_writes=True)) == "primary"
+    assert router.fallbacks == 0
+
+    unconfigured = _router([], url=None)
+    assert unconfigured.session().get_bind() is not None
+    assert unconfigured.reads["primary"] == 1 and unconfigured.fallbacks == 0
+
+
+def test_read_sessions_reject_writes():
+    db = _router([], url=None).session()
+    db.add(User(id=uuid4(), email="reader@example.com"))
+    with pytest.raises(RuntimeError):
+        db.flush()
+    # Regular sessions are not affected
+    assert not Session().info.get("read_only")
+
+
+def test_get_read_db_honours_read_your_writes_header(monkeypatch):
+    router = _router([0.0] * 4)
+    monkeypatch.setattr(database, "replica_router", router)
+
+    app = FastAPI()
+
+    @app.get("/target")
+    def target(db: Session = Depends(get_read_db)):
+        return {"target": _target(router, db)}
+
+    client = TestClient(app)
+    assert client.get("/target").json() == {"target": "replica"}
+    assert client.get("/target", headers={READ_YOUR_WRITES_HEADER: "1"}).json() == {"target": "primary"}
+
+
+def test_replica_that_is_not_streaming_is_not_used(monkeypatch):
+    router = ReplicaRouter(
+        url="sqlite://",
+        primary_sessions=sessionmaker(bind=create_engine("sqlite://")),
+        max_lag_seconds=10,
+        check_interval_seconds=0
+    )
+    # What REPLICA_LAG_SQL returns when pg_stat_wal_receiver shows no streaming receiver
+    monkeypatch.setattr(database, "REPLICA_LAG_SQL", text("SELECT NULL"))
+    assert _target(router, router.session()) == "primary"
+    assert router.status()["lag_seconds"] is None
+
+
+def test_lag_sql_requires_a_streaming_wal_receiver():
+    sql = str(database.REPLICA_LAG_SQL)
+    assert sql.index("pg_stat_wal_receiver") < sql.index("pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()")
+    assert "status = 'streaming'" in sql
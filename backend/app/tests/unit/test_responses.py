@@ -0,0 +1,68 @@
+"""
+Unit tests for the fast JSON responses (responses).
+
+Tests that orjson rendering and direct model serialization produce the same
+JSON as FastAPI's default path, Decimal handling, headers and the backend
+switch. No database required.
+"""
+import sys
+import os
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import responses
+from responses import FastJSONResponse, default_response_class, json_model_response
+from schemas import LeadSummary, ModuleResponse
+
+
+def _module(**overrides):
+    values = dict(
+        id=uuid4(), title="Module", description=None, thumbnail_url=None, order_index=1,
+        is_active=True, prerequisite_module_id=None, estimated_duration_minutes=30,
+        difficulty_level="beginner", created_at=datetime(2026, 3, 14, 9, 30),
+        progress_percentage=Decimal("41.67")
+    )
+    values.update(overrides)
+    return ModuleResponse(**values)
+
+
+def test_direct_serialization_matches_fastapi_default():
+    modules = [_module(), _module(order_index=2, tree_completed=True)]
+    expected = JSONResponse(
+        [module.model_dump(mode="json") for module in modules]
+    ).body
+
+    response = json_model_response(modules, List[ModuleResponse])
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == json.loads(expected)
+
+
+def test_direct_serialization_validates_dicts_and_passes_headers():
+    lead = dict(
+        user_id=uuid4(), email="lead@example.com", first_name="A", last_name="B",
+        composite_score=10, lead_temperature=None, temperature_label=None, intent_band=None,
+        intent_label=None, profile_completion_pct=50, last_activity_at=None,
+        created_at=datetime(2026, 3, 14)
+    )
+    response = json_model_response([lead], List[LeadSummary], headers={"X-Next-Cursor": "abc"})
+    assert response.headers["X-Next-Cursor"] == "abc"
+    body = json.loads(response.body)
+    assert body[0]["composite_score"] == 10.0 and body[0]["user_id"] == str(lead["user_id"])
+
+
+def test_orjson_response_encodes_decimal_and_sets():
+    body = FastJSONResponse({"score": Decimal("87.50"), "tags": {"a"}, 1: "x"}).body
+    assert json.loads(body) == {"score": 87.5, "tags": ["a"], "1": "x"}
+
+
+def test_default_response_class_follows_backend_setting(monkeypatch):
+    assert default_response_class() is FastJSONResponse
+    monkeypatch.setattr(responses, "JSON_RESPONSE_BACKEND", "json")
+    assert default_response_class() is JSONResponse
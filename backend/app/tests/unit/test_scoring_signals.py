@@ -0,0 +1,70 @@
+"""
+Unit tests for the compiled ScoringSignalsCatalog and signal dispatch tables.
+
+Tests catalog lookups, dispatch table coverage and availability memoization.
+No database required.
+"""
+import sys
+import os
+import dataclasses
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from analytics.scoring_signals import (
+    AVAILABILITY_CHECKS,
+    ScoreDimension,
+    ScoringSignalsCatalog,
+    SignalAvailabilityChecker,
+)
+from analytics.scoring_engine import SIGNAL_EXTRACTORS
+
+
+def test_all_signals_is_concatenation_of_dimension_lists():
+    expected = (
+        ScoringSignalsCatalog.ENGAGEMENT_SIGNALS
+        + ScoringSignalsCatalog.TIMELINE_URGENCY_SIGNALS
+        + ScoringSignalsCatalog.HELP_SEEKING_SIGNALS
+        + ScoringSignalsCatalog.LEARNING_VELOCITY_SIGNALS
+        + ScoringSignalsCatalog.REWARDS_SIGNALS
+    )
+    assert ScoringSignalsCatalog.get_all_signals() == tuple(expected)
+    assert ScoringSignalsCatalog.get_total_signal_count() == len(expected)
+
+
+@pytest.mark.parametrize("dimension", list(ScoreDimension))
+def test_signals_by_dimension_match_filter(dimension):
+    expected = tuple(
+        s for s in ScoringSignalsCatalog.get_all_signals() if s.dimension == dimension
+    )
+    assert ScoringSignalsCatalog.get_signals_by_dimension(dimension) == expected
+
+
+def test_signal_by_id():
+    for signal in ScoringSignalsCatalog.get_all_signals():
+        assert ScoringSignalsCatalog.get_signal_by_id(signal.signal_id) is signal
+    assert ScoringSignalsCatalog.get_signal_by_id("no_such_signal") is None
+
+
+def test_signals_are_frozen():
+    signal = ScoringSignalsCatalog.get_all_signals()[0]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        signal.weight = 1.0
+
+
+def test_dispatch_tables_cover_every_signal():
+    signal_ids = {s.signal_id for s in ScoringSignalsCatalog.get_all_signals()}
+    assert set(SIGNAL_EXTRACTORS) == signal_ids
+    assert set(AVAILABILITY_CHECKS) == signal_ids
+
+
+def test_availability_checked_once_per_signal(monkeypatch):
+    signal = ScoringSignalsCatalog.get_all_signals()[0]
+    calls = []
+    monkeypatch.setitem(AVAILABILITY_CHECKS, signal.signal_id, lambda checker: calls.append(1) or True)
+
+    checker = SignalAvailabilityChecker(db=None, user_id=None)
+    assert checker.check_signal_availability(signal) is True
+    assert checker.check_signal_availability(signal) is True
+    assert len(calls) == 1
@@ -0,0 +1,163 @@
+"""
+Unit tests for analytics.signal_store and analytics.reweighting_simulator.
+
+Tests store round-trip, incremental updates (serialised by the write lock),
+column realignment and what-if re-scoring against a temporary store file. No
+database required.
+"""
+import sys
+import os
+import threading
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import analytics.signal_store as signal_store
+from analytics.signal_store import SignalStore, SignalStoreNotFound
+from analytics.reweighting_simulator import ReweightingSimulator
+from analytics.vectorized_scoring import VectorizedScoringEngine
+
+
+@pytest.fixture
+def store_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "signals.npz")
+    monkeypatch.setattr(signal_store, "SIGNAL_STORE_PATH", path)
+    return path
+
+
+def _scores(values):
+    """Minimal calculate_all_scores() result carrying the given signal values"""
+    return {
+        "dimension_details": {
+            "engagement": {
+                "signal_values": [
+                    {"signal_id": signal_id, "value": value}
+                    for signal_id, value in values.items()
+                ]
+            }
+        }
+    }
+
+
+def _population(n_users, seed=0):
+    rng = np.random.default_rng(seed)
+    signals = rng.uniform(0, 100, size=(n_users, len(VectorizedScoringEngine.SIGNALS)))
+    signals[rng.random(signals.shape) < 0.3] = np.nan
+    user_ids = np.array([uuid4().bytes for _ in range(n_users)], dtype="S16")
+    return user_ids, signals
+
+
+def test_load_missing_store(store_path):
+    with pytest.raises(SignalStoreNotFound):
+        SignalStore.load()
+
+
+def test_write_and_load_round_trip(store_path):
+    user_ids, signals = _population(50)
+    SignalStore.write(user_ids, signals)
+
+    snapshot = SignalStore.load()
+    assert snapshot["signals"].dtype == np.float32
+    assert np.array_equal(snapshot["user_ids"], user_ids)
+    assert np.array_equal(
+        np.isnan(snapshot["signals"]), np.isnan(signals)
+    )
+    assert SignalStore.decode_user_id(snapshot["user_ids"][0]).bytes == user_ids[0].ljust(16, b"\0")
+
+
+def test_record_results_updates_existing_rows(store_path):
+    first_id, second_id = uuid4(), uuid4()
+    signal_id = VectorizedScoringEngine.SIGNAL_IDS[0]
+
+    SignalStore.record_results({first_id: _scores({signal_id: 10}), second_id: _scores({signal_id: 20})})
+    SignalStore.record_results({first_id: _scores({signal_id: 30}), uuid4(): {"error": "boom"}})
+
+    snapshot = SignalStore.load()
+    column = VectorizedScoringEngine.column_index(signal_id)
+    stored = {
+        SignalStore.decode_user_id(raw): snapshot["signals"][i, column]
+        for i, raw in enumerate(snapshot["user_ids"])
+    }
+    assert stored == {first_id: 30.0, second_id: 20.0}
+
+
+def test_record_results_replace(store_path):
+    signal_id = VectorizedScoringEngine.SIGNAL_IDS[0]
+    SignalStore.record_results({uuid4(): _scores({signal_id: 10})})
+    kept = uuid4()
+    SignalStore.record_results({kept: _scores({signal_id: 50})}, replace=True)
+
+    snapshot = SignalStore.load()
+    assert [SignalStore.decode_user_id(raw) for raw in snapshot["user_ids"]] == [kept]
+
+
+def test_record_results_waits_for_a_concurrent_writer(store_path):
+    signal_id = VectorizedScoringEngine.SIGNAL_IDS[0]
+    first, second = uuid4(), uuid4()
+    SignalStore.record_results({first: _scores({signal_id: 10})})
+
+    # Another run holds the lock between its read and its write
+    with signal_store.write_lock():
+        writer = threading.Thread(
+            target=SignalStore.record_results, args=({second: _scores({signal_id: 20})},)
+        )
+        writer.start()
+        writer.join(timeout=0.2)
+        assert writer.is_alive()
+    writer.join(timeout=5)
+
+    snapshot = SignalStore.load()
+    assert {SignalStore.decode_user_id(raw) for raw in snapshot["user_ids"]} == {first, second}
+
+
+def test_load_realigns_columns(store_path):
+    n_signals = len(VectorizedScoringEngine.SIGNALS)
+    signals = np.arange(2 * n_signals, dtype=np.float32).reshape(2, n_signals)
+    reordered = list(reversed(VectorizedScoringEngine.SIGNAL_IDS))[:-1]  # first catalog signal missing
+    np.savez(
+        store_path,
+        signals=signals[:, ::-1][:, :-1],
+        user_ids=np.array([uuid4().bytes, uuid4().bytes], dtype="S16"),
+        signal_ids=np.array(reordered),
+        written_at=np.array("2026-01-01T00:00:00")
+    )
+
+    aligned = SignalStore.load()["signals"]
+    assert np.array_equal(aligned[:, 1:], signals[:, 1:])
+    assert np.isnan(aligned[:, 0]).all()
+
+
+def test_simulate_with_current_configuration_changes_nobody(store_path):
+    SignalStore.write(*_population(500))
+
+    result = ReweightingSimulator.simulate()
+    assert result["total_users"] == 500
+    assert result["changed_users_count"] == 0
+    assert result["baseline"] == result["candidate"]
+
+
+def test_simulate_reports_band_changes(store_path):
+    SignalStore.write(*_population(500))
+
+    result = ReweightingSimulator.simulate(
+        temperature_thresholds={"warm_lead": 0, "cold_lead": 0},
+        changed_users_limit=5
+    )
+    candidate = result["candidate"]["temperature_distribution"]
+    assert candidate["warm_lead"]["count"] + candidate["hot_lead"]["count"] == 500
+    assert result["changed_users_count"] > 5
+    assert len(result["changed_users"]) == 5
+    assert all(u["temperature_after"] != "dormant" for u in result["changed_users"])
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"signal_weights": {"not_a_signal": 1.0}},
+    {"dimension_weights": {"engagement": -1.0}},
+    {"temperature_thresholds": {"lukewarm": 300}},
+])
+def test_simulate_rejects_invalid_overrides(store_path, kwargs):
+    with pytest.raises(ValueError):
+        ReweightingSimulator.simulate(**kwargs)
@@ -0,0 +1,194 @@
+"""
+Unit tests for UserDataWipeManager (utils).
+
+Tests the batched per-table statements compiled for PostgreSQL, step coverage
+and resuming after the time budget runs out. No database required.
+"""
+import sys
+import os
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import utils
+from models import Base, UserDataWipe, UserQuizAttempt, SupportTicket
+from utils import UserDataWipeManager, WIPE_STEPS
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_delete_batch_is_bounded_by_primary_key():
+    sql = _sql(UserDataWipeManager.batch_statement(UserQuizAttempt, "delete", uuid4(), batch_size=100))
+    assert sql.startswith("DELETE FROM user_quiz_attempts WHERE user_quiz_attempts.id IN (SELECT user_quiz_attempts.id")
+    assert "WHERE user_quiz_attempts.user_id = " in sql and "LIMIT" in sql
+
+
+def test_detach_batch_sets_user_id_null():
+    sql = _sql(UserDataWipeManager.batch_statement(SupportTicket, "detach", uuid4()))
+    assert sql.startswith("UPDATE support_tickets SET user_id=%(user_id)s")
+    assert "WHERE support_tickets.id IN (SELECT support_tickets.id" in sql
+
+
+def test_steps_cover_every_user_table():
+    handled = {model.__tablename__ for _, model, _ in WIPE_STEPS}
+    # Reset at the end, cascaded from quiz attempts, or not user progress
+    skipped = {
+        "users", "user_coin_balances", "user_stats", "user_notification_counters",
+        "user_quiz_answers", "user_data_wipes", "hubspot_outbox", "notification_broadcasts",
+    }
+    user_tables = {
+        table.name for table in Base.metadata.tables.values()
+        if any(fk.column.table.name == "users" for fk in table.foreign_keys)
+    }
+    assert user_tables - skipped <= handled
+
+
+class _FakeQuery:
+    def __init__(self, session):
+        self.session = session
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        return self.session.wipe
+
+    def delete(self, **kwargs):
+        return 0
+
+    def update(self, *args, **kwargs):
+        return 1
+
+
+class _FakeSession:
+    """Serves one wipe row; each table has `rows_per_table` rows left"""
+
+    def __init__(self, wipe, rows_per_table):
+        self.wipe = wipe
+        self.remaining = {name: rows_per_table for name, _, _ in WIPE_STEPS}
+        self.executed = []
+        self.added = []
+
+    def query(self, *args):
+        return _FakeQuery(self)
+
+    def refresh(self, obj, with_for_update=False):
+        pass
+
+    def execute(self, statement):
+        table = statement.table.name
+        if table == "user_data_wipes":
+            return self._claim()
+        step = next(name for name, model, _ in WIPE_STEPS if model.__tablename__ == table)
+        limit = statement.whereclause.right.element._limit
+        count = min(limit, self.remaining[step])
+        self.remaining[step] -= count
+        self.executed.append(step)
+
+        class _Result:
+            rowcount = count
+        return _Result()
+
+    def _claim(self):
+        # UPDATE ... WHERE status = 'pending' (or stale running) RETURNING id
+        claimed = self.wipe.status == "pending"
+        if claimed:
+            self.wipe.status = "running"
+        wipe_id = self.wipe.id
+
+        class _Result:
+            def first(self):
+                return (wipe_id,) if claimed else None
+        return _Result()
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_wipe_runs_in_batches_and_resumes_after_budget(monkeypatch):
+    wipe = UserDataWipe(id=uuid4(), user_id=uuid4(), status="pending", rows_deleted=0, rows_detached=0)
+    db = _FakeSession(wipe, rows_per_table=5)
+
+    clock = iter(range(0, 10000))
+    monkeypatch.setattr(utils.time, "monotonic", lambda: next(clock))
+
+    # Budget covers only a few batches: the wipe goes back to pending mid-way
+    UserDataWipeManager.run_wipe(db, wipe.id, time_budget_seconds=4, batch_size=2)
+    assert wipe.status == "pending"
+    assert wipe.current_step == "quiz_attempts" and db.executed == ["quiz_attempts"] * 3
+    assert wipe.rows_deleted == 5
+
+    UserDataWipeManager.run_wipe(db, wipe.id, time_budget_seconds=1000, batch_size=2)
+    assert wipe.status == "completed" and wipe.current_step is None
+    assert all(left == 0 for left in db.remaining.values())
+    assert wipe.rows_detached == 4 * 5
+    assert wipe.rows_deleted == (len(WIPE_STEPS) - 4) * 5
+    assert any(type(obj).__name__ == "UserCoinBalance" for obj in db.added)
+
+
+def test_wipe_claimed_elsewhere_or_finished_is_not_run():
+    for status in ("running", "completed", "failed"):
+        wipe = UserDataWipe(id=uuid4(), user_id=uuid4(), status=status, rows_deleted=0, rows_detached=0)
+        db = _FakeSession(wipe, rows_per_table=5)
+
+        assert UserDataWipeManager.run_wipe(db, wipe.id) is wipe
+        assert wipe.status == status and db.executed == [] and db.added == []
+
+
+def test_claimable_covers_pending_and_stale_running():
+    sql = _sql(
+        select(UserDataWipe.id).where(UserDataWipeManager._claimable())
+    )
+    assert "user_data_wipes.status = %(status_1)s OR user_data_wipes.status = %(status_2)s" in sql
+    assert "user_data_wipes.updated_at < %(updated_at_1)s" in sql
+
+
+class _RacingSession:
+    """The first lookup finds nothing, then the insert loses to a concurrent request"""
+
+    def __init__(self, winner):
+        self.winner = winner
+        self.lookups = 0
+        self.rolled_back = False
+
+    def query(self, *args):
+        session = self
+
+        class _Query:
+            def filter(self, *args):
+                return self
+
+            def first(self):
+                session.lookups += 1
+                return None if session.lookups == 1 else session.winner
+        return _Query()
+
+    def add(self, obj):
+        pass
+
+    def commit(self):
+        raise IntegrityError("INSERT INTO user_data_wipes", {}, Exception("duplicate key"))
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_concurrent_start_returns_the_existing_wipe():
+    winner = UserDataWipe(id=uuid4(), user_id=uuid4(), status="pending")
+    db = _RacingSession(winner)
+
+    wipe, created = UserDataWipeManager.start_wipe(db, winner.user_id)
+    assert wipe is winner and created is False
+    assert db.rolled_back
@@ -1,18 +1,33 @@
 """
-Unit tests for utils (QuizManager and Grow Your Nest helpers).
+Unit tests for utils (QuizManager, user stats helpers and Grow Your Nest helpers).
 
-Tests pure logic: quiz score, pass/fail, coin reward, tree stage and completion.
+Tests pure logic: quiz score, pass/fail, coin reward, stats daily buckets and
+activity feed, unread notification counter updates, tree stage and completion.
 No database required.
 """
 import sys
 import os
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
 from decimal import Decimal
 
 import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
-from utils import QuizManager
+import utils
+from models import Notification, UserNotificationCounter, UserStats
+from utils import (
+    NotificationManager,
+    QuizManager,
+    STATS_DAILY_RETENTION_DAYS,
+    STATS_RECENT_ITEMS_PER_TYPE,
+    _bump_daily_activity,
+    _sum_daily_activity,
+    _merge_recent_activity,
+    _is_expired,
+    _lock_or_create_user_row,
+)
 from routers.grow_your_nest import (
     calculate_tree_stage,
     is_tree_complete,
@@ -89,6 +104,129 @@ def test_calculate_coin_reward_custom_perfect_bonus():
     assert coins == 50 + 100
 
 
+# ----- User stats helpers -----
+
+
+def test_bump_daily_activity_adds_and_accumulates():
+    today = date(2026, 3, 10)
+    daily = _bump_daily_activity(None, today, "coins_earned", 5, today)
+    daily = _bump_daily_activity(daily, today, "coins_earned", 10, today)
+    daily = _bump_daily_activity(daily, today, "lessons", 1, today)
+    assert daily == {"2026-03-10": {"coins_earned": 15, "lessons": 1}}
+
+
+def test_bump_daily_activity_does_not_mutate_input():
+    today = date(2026, 3, 10)
+    original = {"2026-03-10": {"lessons": 1}}
+    _bump_daily_activity(original, today, "lessons", 1, today)
+    assert original == {"2026-03-10": {"lessons": 1}}
+
+
+def test_bump_daily_activity_prunes_old_buckets():
+    today = date(2026, 3, 10)
+    daily = {"2026-01-01": {"lessons": 3}}
+    daily = _bump_daily_activity(daily, today, "lessons", 1, today)
+    assert "2026-01-01" not in daily
+    assert len(daily) == 1
+
+
+def test_sum_daily_activity_window_is_inclusive():
+    today = date(2026, 3, 10)
+    daily = {
+        "2026-03-10": {"lessons": 1},
+        "2026-03-03": {"lessons": 2},  # exactly 7 days ago
+        "2026-03-02": {"lessons": 4},  # outside the week
+    }
+    assert _sum_daily_activity(daily, "lessons", 7, today) == 3
+    assert _sum_daily_activity(daily, "lessons", STATS_DAILY_RETENTION_DAYS, today) == 7
+    assert _sum_daily_activity(daily, "coins_earned", 7, today) == 0
+
+
+def _activity(activity_type, timestamp):
+    return {"type": activity_type, "title": "", "timestamp": timestamp, "data": {}}
+
+
+def test_merge_recent_activity_caps_per_type():
+    feed = []
+    for day in range(1, 9):
+        feed = _merge_recent_activity(
+            feed, [_activity("coin_transaction", f"2026-03-0{day}T00:00:00")], "coin_transaction"
+        )
+    assert len(feed) == STATS_RECENT_ITEMS_PER_TYPE
+    assert feed[0]["timestamp"] == "2026-03-08T00:00:00"
+
+
+def test_merge_recent_activity_keeps_other_types():
+    feed = [_activity("badge_earned", "2026-03-01T00:00:00")]
+    feed = _merge_recent_activity(feed, [_activity("coin_transaction", "2026-03-02T00:00:00")], "coin_transaction")
+    assert {a["type"] for a in feed} == {"badge_earned", "coin_transaction"}
+
+
+def test_merge_recent_activity_replace_drops_stale_items():
+    feed = [
+        _activity("lesson_completed", "2026-03-01T00:00:00"),
+        _activity("badge_earned", "2026-03-01T00:00:00"),
+    ]
+    feed = _merge_recent_activity(feed, [], "lesson_completed", replace=True)
+    assert [a["type"] for a in feed] == ["badge_earned"]
+
+
+# ----- Unread notification counter -----
+
+
+@pytest.fixture
+def counter(monkeypatch):
+    """Counter row handed to NotificationManager instead of a locked DB row"""
+    row = UserNotificationCounter(user_id=uuid4(), unread_count=3, next_expiry_at=None)
+    monkeypatch.setattr(NotificationManager, "_lock_counter", staticmethod(lambda db, user_id: row))
+    monkeypatch.setattr(utils, "notify_unread_count_changed", lambda db, user_id: None)
+    return row
+
+
+def _notification(is_read=False, expires_at=None):
+    return Notification(user_id=uuid4(), notification_type="system", title="t", message="m",
+                        is_read=is_read, expires_at=expires_at)
+
+
+def test_set_read_decrements_and_increments(counter):
+    notification = _notification()
+    NotificationManager.set_read(None, notification, True)
+    assert notification.is_read is True and counter.unread_count == 2
+    NotificationManager.set_read(None, notification, False)
+    assert counter.unread_count == 3
+
+
+def test_set_read_unchanged_is_noop(counter):
+    NotificationManager.set_read(None, _notification(is_read=True), True)
+    assert counter.unread_count == 3
+
+
+def test_set_read_on_expired_notification_leaves_counter(counter):
+    expired = _notification(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+    NotificationManager.set_read(None, expired, True)
+    assert counter.unread_count == 3
+
+
+def test_marking_unread_tracks_earliest_expiry(counter):
+    soon = datetime.now(timezone.utc) + timedelta(hours=1)
+    later = soon + timedelta(days=1)
+    NotificationManager.set_read(None, _notification(is_read=True, expires_at=later), False)
+    NotificationManager.set_read(None, _notification(is_read=True, expires_at=soon), False)
+    assert counter.unread_count == 5 and counter.next_expiry_at == soon
+
+
+def test_unread_count_never_negative(counter):
+    counter.unread_count = 0
+    NotificationManager.set_read(None, _notification(), True)
+    assert counter.unread_count == 0
+
+
+def test_is_expired_handles_naive_and_aware():
+    assert _is_expired(None) is False
+    assert _is_expired(datetime.now() - timedelta(seconds=1)) is True
+    assert _is_expired(datetime.now(timezone.utc) + timedelta(hours=1)) is False
+
+
 # ----- Grow Your Nest tree helpers -----
 
 
@@ -124,3 +262,53 @@ def test_is_tree_complete_false():
 def test_is_tree_complete_true():
     assert is_tree_complete(TREE_TOTAL_STAGES * POINTS_PER_STAGE) is True
     assert is_tree_complete(TREE_TOTAL_STAGES * POINTS_PER_STAGE + 50) is True
+
+
+class _RowRaceSession:
+    """No row on the first lookup; a concurrent request inserts it meanwhile"""
+
+    def __init__(self, model, row):
+        self.model = model
+        self.row = row
+        self.lookups = 0
+        self.executed = []
+        self.added = []
+
+    def query(self, *args):
+        session = self
+
+        class _Query:
+            def filter(self, *args):
+                return self
+
+            def with_for_update(self):
+                return self
+
+            def first(self):
+                session.lookups += 1
+                return None if session.lookups == 1 else session.row
+
+            def one(self):
+                session.lookups += 1
+                return session.row
+        return _Query()
+
+    def execute(self, statement):
+        from sqlalchemy.dialects import postgresql
+        self.executed.append(str(statement.compile(dialect=postgresql.dialect())))
+
+    def add(self, obj):
+        self.added.append(obj)
+
+
+@pytest.mark.parametrize("model", [UserNotificationCounter, UserStats])
+def test_missing_summary_row_is_inserted_on_conflict_do_nothing(model):
+    row = model(user_id=uuid4())
+    db = _RowRaceSession(model, row)
+
+    assert _lock_or_create_user_row(db, model, row.user_id) is row
+    # Never db.add(): a plain INSERT would fail on the primary key against the other request
+    assert not db.added
+    assert len(db.executed) == 1
+    assert db.executed[0].startswith(f"INSERT INTO {model.__tablename__}")
+    assert db.executed[0].endswith("ON CONFLICT (user_id) DO NOTHING")
@@ -0,0 +1,154 @@
+"""
+Unit tests for analytics.vectorized_scoring (population scoring parity).
+
+Scores random signal matrices with VectorizedScoringEngine and with the
+per-user ScoringEngine + LeadClassifier (fed from the same rows) and requires
+identical results. No database required.
+"""
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from analytics.scoring_engine import ScoringEngine
+from analytics.classifier import LeadClassifier
+from analytics.vectorized_scoring import (
+    INTENT_CODES,
+    TEMPERATURE_CODES,
+    VectorizedScoringEngine,
+    round2,
+)
+
+
+class _RowSignals:
+    """Stands in for signal extraction and availability checks, reading one matrix row"""
+
+    def __init__(self, row):
+        self._values = {
+            signal.signal_id: row[i]
+            for i, signal in enumerate(VectorizedScoringEngine.SIGNALS)
+        }
+
+    def extract(self, signal):
+        value = self._values[signal.signal_id]
+        return None if np.isnan(value) else float(value)
+
+    def check_signal_availability(self, signal):
+        return not np.isnan(self._values[signal.signal_id])
+
+
+def _score_row(row):
+    engine = ScoringEngine.__new__(ScoringEngine)
+    engine.availability_checker = row_signals = _RowSignals(row)
+    engine._extract_signal_value = row_signals.extract
+
+    dimension_results = [
+        (dimension, engine.calculate_dimension_score(dimension))
+        for dimension in VectorizedScoringEngine.DIMENSIONS
+    ]
+    scores = {
+        "engagement_score": dimension_results[0][1]["score"],
+        "timeline_urgency_score": dimension_results[1][1]["score"],
+        "help_seeking_score": dimension_results[2][1]["score"],
+        "learning_velocity_score": dimension_results[3][1]["score"],
+        "rewards_score": dimension_results[4][1]["score"],
+        "composite_score": engine._calculate_composite_score(dimension_results),
+    }
+    classification = LeadClassifier.classify_lead(scores)
+    return scores, classification["temperature"], classification["intent_band"]
+
+
+def _random_matrix(n_users, seed):
+    rng = np.random.default_rng(seed)
+    n_signals = len(VectorizedScoringEngine.SIGNALS)
+    values = rng.uniform(0, 100, size=(n_users, n_signals))
+    # Mix in integers and two-decimal values, which extractors often return
+    values[::3] = np.round(values[::3])
+    values[1::3] = np.round(values[1::3], 2)
+    values[rng.random((n_users, n_signals)) < 0.4] = np.nan
+    # Users with nothing available and with whole dimensions missing
+    values[0] = np.nan
+    for k, dimension in enumerate(VectorizedScoringEngine.DIMENSIONS):
+        values[k + 1, list(VectorizedScoringEngine.DIMENSION_COLUMNS[dimension])] = np.nan
+    return values
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_per_user_engine(seed):
+    values = _random_matrix(400, seed)
+    scores = VectorizedScoringEngine.score(values)
+    temperature, intent = VectorizedScoringEngine.classify(scores)
+
+    for i, row in enumerate(values):
+        expected, expected_temperature, expected_intent = _score_row(row)
+        for key, value in expected.items():
+            assert scores[key][i] == value, (i, key)
+        assert TEMPERATURE_CODES[temperature[i]] == expected_temperature
+        assert INTENT_CODES[intent[i]] == expected_intent
+
+
+def test_matches_per_user_engine_with_negative_values():
+    values = _random_matrix(100, 3) - 10.0
+
+    scores = VectorizedScoringEngine.score(values)
+    for i, row in enumerate(values):
+        expected, _, _ = _score_row(row)
+        for key, value in expected.items():
+            assert scores[key][i] == value, (i, key)
+
+
+def test_matches_per_user_engine_at_band_edges():
+    # Uniform rows land the composite exactly on thresholds (score * 10)
+    values = VectorizedScoringEngine.empty_matrix(12)
+    for i, level in enumerate([0, 19.99, 20, 40, 49.99, 50, 65, 70, 79.99, 80, 85, 100]):
+        values[i] = level
+
+    scores = VectorizedScoringEngine.score(values)
+    temperature, intent = VectorizedScoringEngine.classify(scores)
+
+    for i, row in enumerate(values):
+        expected, expected_temperature, expected_intent = _score_row(row)
+        assert scores["composite_score"][i] == expected["composite_score"]
+        assert TEMPERATURE_CODES[temperature[i]] == expected_temperature
+        assert INTENT_CODES[intent[i]] == expected_intent
+
+
+def test_round2_matches_python_round():
+    rng = np.random.default_rng(7)
+    values = np.concatenate([
+        rng.uniform(0, 1000, 20000),
+        np.arange(0, 1000, 0.005),  # every .xx5 boundary
+    ])
+    expected = np.array([round(float(v), 2) for v in values])
+    assert np.array_equal(round2(values), expected)
+
+
+def test_weight_overrides():
+    values = VectorizedScoringEngine.empty_matrix(1)
+    eng_columns = VectorizedScoringEngine.DIMENSION_COLUMNS[VectorizedScoringEngine.DIMENSIONS[0]]
+    values[0, eng_columns[0]] = 100.0
+    values[0, eng_columns[1]] = 0.0
+
+    first, second = (VectorizedScoringEngine.SIGNALS[c].signal_id for c in eng_columns[:2])
+    weights = VectorizedScoringEngine.signal_weights({first: 3.0, second: 1.0})
+    scores = VectorizedScoringEngine.score(values, signal_weights=weights)
+
+    assert scores["engagement_score"][0] == 75.0
+    assert scores["composite_score"][0] == 750.0
+    assert scores["available_signals_count"][0] == 2
+
+
+def test_rejects_wrong_shape():
+    with pytest.raises(ValueError):
+        VectorizedScoringEngine.score(np.zeros((3, 2)))
+
+
+def test_distribution_counts_every_band():
+    codes = np.array([0, 0, 1, 3], dtype=np.int8)
+    distribution = VectorizedScoringEngine.distribution(codes, TEMPERATURE_CODES)
+    assert list(distribution) == list(TEMPERATURE_CODES)
+    assert distribution["hot_lead"] == {"count": 2, "percentage": 50.0}
+    assert distribution["cold_lead"]["count"] == 0
@@ -1,19 +1,27 @@
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, date, timedelta, timezone
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, and_, or_, tuple_, text, select, insert, update, delete, literal, case, true, false, Integer, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from models import (
     User, UserCoinBalance, UserCoinTransaction, Notification, 
     UserBadge, Badge, UserLessonProgress, UserModuleProgress,
-    Module, Lesson, UserQuizAttempt, LessonBadgeReward,
-    UserOnboarding, UserCouponRedemption
+    Module, Lesson, UserQuizAttempt, UserModuleQuizAttempt, LessonBadgeReward,
+    UserOnboarding, UserCouponRedemption, UserStats, UserNotificationCounter,
+    NotificationBroadcast, UserLeadScore, UserDataWipe, UserQuizAnswer,
+    UserBehaviorEvent, LeadScoreHistory, UserActivityLog, CalculatorUsage,
+    MaterialDownload, SupportTicket
 )
 
+from services.notification_stream import notify_new_notification, notify_unread_count_changed, notify_broadcast
+
 # Import will be used after class definitions to avoid circular imports
 _EventTracker = None
 
@@ -27,7 +35,7 @@ def _get_event_tracker():
 
 
 class NotificationManager:
-    """Manages user notifications"""
+    """Manages user notifications and the per-user unread counter"""
     
     @staticmethod
     def create_notification(
@@ -47,6 +55,9 @@ class NotificationManager:
             priority=priority
         )
         db.add(notification)
+        NotificationManager._adjust_unread_count(db, user_id, 1, notification.expires_at)
+        # Wakes open notification streams when the transaction commits
+        notify_new_notification(db, notification)
         db.commit()
         db.refresh(notification)
         return notification
@@ -75,7 +86,7 @@ class NotificationManager:
         ).first()
         
         if notification:
-            notification.is_read = True
+            NotificationManager.set_read(db, notification, True)
             db.commit()
             return True
         return False
@@ -86,8 +97,681 @@ class NotificationManager:
         count = db.query(Notification).filter(
             and_(Notification.user_id == user_id, Notification.is_read == False)
         ).update({"is_read": True})
+        counter = NotificationManager._lock_counter(db, user_id)
+        if counter is not None:
+            counter.unread_count = 0
+            counter.next_expiry_at = None
+        if count:
+            notify_unread_count_changed(db, user_id)
         db.commit()
         return count
+    
+    @staticmethod
+    def set_read(db: Session, notification: Notification, is_read: bool) -> None:
+        """Mark one notification read/unread and adjust the counter (caller commits)"""
+        if bool(notification.is_read) == is_read:
+            return
+        notification.is_read = is_read
+        if not _is_expired(notification.expires_at):
+            NotificationManager._adjust_unread_count(
+                db, notification.user_id, -1 if is_read else 1, notification.expires_at
+            )
+            # Open streams (other tabs) send the new count on commit
+            notify_unread_count_changed(db, notification.user_id)
+    
+    @staticmethod
+    def delete_notification(db: Session, notification: Notification) -> None:
+        """Delete one notification and adjust the counter (caller commits)"""
+        db.delete(notification)
+        if not notification.is_read and not _is_expired(notification.expires_at):
+            NotificationManager._adjust_unread_count(db, notification.user_id, -1)
+            notify_unread_count_changed(db, notification.user_id)
+    
+    @staticmethod
+    def delete_notifications(db: Session, user_id: UUID, notification_ids: List[UUID]) -> int:
+        """Delete several of the user's notifications and recount (caller commits)"""
+        deleted_count = db.query(Notification).filter(
+            and_(
+                Notification.id.in_(notification_ids),
+                Notification.user_id == user_id
+            )
+        ).delete(synchronize_session=False)
+        if deleted_count:
+            NotificationManager.rebuild_unread_counter(db, user_id)
+            notify_unread_count_changed(db, user_id)
+        return deleted_count
+    
+    @staticmethod
+    def get_unread_count(db: Session, user_id: UUID) -> int:
+        """
+        Unread, unexpired notification count from the counter row. The row is
+        rebuilt when missing or when a counted notification has expired since
+        the last count (caller commits).
+        """
+        counter = db.query(UserNotificationCounter).filter(
+            UserNotificationCounter.user_id == user_id
+        ).first()
+        if counter is None or _is_expired(counter.next_expiry_at):
+            counter = NotificationManager.rebuild_unread_counter(db, user_id)
+        return counter.unread_count
+    
+    @staticmethod
+    def rebuild_unread_counter(db: Session, user_id: UUID) -> UserNotificationCounter:
+        """Recount the user's unread, unexpired notifications (no commit)"""
+        counter = _lock_or_create_user_row(db, UserNotificationCounter, user_id)
+        
+        unread_count, next_expiry_at = db.query(
+            func.count(Notification.id),
+            func.min(Notification.expires_at)
+        ).filter(
+            and_(
+                Notification.user_id == user_id,
+                Notification.is_read == False,
+                (Notification.expires_at.is_(None)) | (Notification.expires_at > func.now())
+            )
+        ).one()
+        counter.unread_count = unread_count
+        counter.next_expiry_at = next_expiry_at
+        return counter
+    
+    @staticmethod
+    def _lock_counter(db: Session, user_id: UUID) -> Optional[UserNotificationCounter]:
+        """
+        Flush pending writes and lock the user's counter row for an incremental
+        update. Returns None when the row had to be built from scratch, since the
+        rebuild already includes the pending change.
+        """
+        db.flush()
+        counter = db.query(UserNotificationCounter).filter(
+            UserNotificationCounter.user_id == user_id
+        ).with_for_update().first()
+        if not counter:
+            NotificationManager.rebuild_unread_counter(db, user_id)
+            return None
+        return counter
+    
+    @staticmethod
+    def _adjust_unread_count(
+        db: Session,
+        user_id: UUID,
+        delta: int,
+        expires_at: Optional[datetime] = None
+    ) -> None:
+        """Apply an unread delta to the counter row (caller commits)"""
+        counter = NotificationManager._lock_counter(db, user_id)
+        if counter is None:
+            return
+        counter.unread_count = max((counter.unread_count or 0) + delta, 0)
+        if delta > 0 and expires_at is not None and (
+            counter.next_expiry_at is None or expires_at < counter.next_expiry_at
+        ):
+            counter.next_expiry_at = expires_at
+
+
+def _lock_or_create_user_row(db: Session, model, user_id: UUID):
+    """
+    Lock the user's row of a per-user summary table (user_id primary key),
+    inserting an empty one first when missing. INSERT ... ON CONFLICT DO NOTHING
+    waits for a concurrent insert instead of failing on the primary key.
+    """
+    row = db.query(model).filter(model.user_id == user_id).with_for_update().first()
+    if row is None:
+        db.execute(pg_insert(model).values(user_id=user_id).on_conflict_do_nothing(index_elements=["user_id"]))
+        row = db.query(model).filter(model.user_id == user_id).with_for_update().one()
+    return row
+
+
+def _is_expired(expires_at: Optional[datetime]) -> bool:
+    if expires_at is None:
+        return False
+    if expires_at.tzinfo is None:
+        return expires_at <= datetime.now()
+    return expires_at <= datetime.now(timezone.utc)
+
+
+# Users per fan-out transaction
+BROADCAST_CHUNK_SIZE = 50000
+
+
+class NotificationBroadcastManager:
+    """Fans admin announcements out to user segments with set-based inserts"""
+    
+    @staticmethod
+    def start_broadcast(
+        db: Session,
+        data: Dict[str, Any],
+        created_by: Optional[UUID] = None
+    ) -> Tuple[NotificationBroadcast, bool]:
+        """
+        Create the broadcast row (committed) and count its audience.
+        Returns (broadcast, created); an existing broadcast id is returned as is.
+        """
+        broadcast_id = data.get("broadcast_id")
+        if broadcast_id:
+            existing = db.query(NotificationBroadcast).filter(
+                NotificationBroadcast.id == broadcast_id
+            ).first()
+            if existing:
+                return existing, False
+        
+        segment = data.get("segment") or {}
+        broadcast = NotificationBroadcast(
+            notification_type=data.get("notification_type", "system"),
+            title=data["title"],
+            message=data["message"],
+            priority=data.get("priority", "normal"),
+            expires_at=data.get("expires_at"),
+            segment=segment,
+            status="pending",
+            created_by=created_by
+        )
+        if broadcast_id:
+            broadcast.id = broadcast_id
+        broadcast.total_recipients = db.query(func.count(User.id)).filter(
+            *NotificationBroadcastManager.segment_filters(segment)
+        ).scalar()
+        db.add(broadcast)
+        try:
+            db.commit()
+        except IntegrityError:
+            if not broadcast_id:
+                raise
+            # Concurrent submission of the same broadcast id created it first
+            db.rollback()
+            existing = db.query(NotificationBroadcast).filter(
+                NotificationBroadcast.id == broadcast_id
+            ).first()
+            if existing is None:
+                raise
+            return existing, False
+        db.refresh(broadcast)
+        return broadcast, True
+    
+    @staticmethod
+    def segment_filters(segment: Dict[str, Any]) -> list:
+        """WHERE clauses on users for a BroadcastSegment dict"""
+        filters = [User.is_active == True]
+        
+        temperatures = segment.get("lead_temperatures")
+        if temperatures:
+            filters.append(User.id.in_(
+                select(UserLeadScore.user_id).where(UserLeadScore.lead_temperature.in_(temperatures))
+            ))
+        
+        onboarding_completed = segment.get("onboarding_completed")
+        if onboarding_completed is not None:
+            completed = select(UserOnboarding.user_id).where(UserOnboarding.completed_at.isnot(None))
+            filters.append(User.id.in_(completed) if onboarding_completed else User.id.notin_(completed))
+        
+        module_id = segment.get("module_id")
+        module_status = segment.get("module_status")
+        if bool(module_id) != bool(module_status):
+            # Never widen a module-targeted broadcast to every active user
+            raise ValueError("Broadcast segment needs both module_id and module_status")
+        if module_id and module_status:
+            module_id = UUID(str(module_id))
+            if module_status == "not_started":
+                started = select(UserModuleProgress.user_id).where(
+                    and_(
+                        UserModuleProgress.module_id == module_id,
+                        UserModuleProgress.status != "not_started"
+                    )
+                )
+                filters.append(User.id.notin_(started))
+            else:
+                filters.append(User.id.in_(
+                    select(UserModuleProgress.user_id).where(
+                        and_(
+                            UserModuleProgress.module_id == module_id,
+                            UserModuleProgress.status == module_status
+                        )
+                    )
+                ))
+        return filters
+    
+    @staticmethod
+    def run_broadcast(db: Session, broadcast_id: UUID, chunk_size: int = BROADCAST_CHUNK_SIZE) -> Optional[NotificationBroadcast]:
+        """
+        Insert the broadcast's notifications chunk by chunk, resuming after
+        last_user_id. Each chunk locks the broadcast row and commits its
+        notifications, counter updates and progress together, so concurrent or
+        repeated runs never insert a user twice. On error the broadcast is
+        marked failed and can be resumed by running it again.
+        """
+        broadcast = db.query(NotificationBroadcast).filter(NotificationBroadcast.id == broadcast_id).first()
+        if broadcast is None or broadcast.status == "completed":
+            return broadcast
+        
+        broadcast.status = "running"
+        broadcast.error = None
+        broadcast.started_at = broadcast.started_at or datetime.now(timezone.utc)
+        db.commit()
+        
+        segment_filters = NotificationBroadcastManager.segment_filters(broadcast.segment or {})
+        try:
+            while True:
+                db.refresh(broadcast, with_for_update=True)
+                if broadcast.status == "completed":
+                    db.commit()
+                    break
+                
+                audience = [*segment_filters]
+                if broadcast.last_user_id is not None:
+                    audience.append(User.id > broadcast.last_user_id)
+                
+                # Keyset chunk bound: the chunk_size-th remaining user, or the last one
+                upper = db.query(User.id).filter(*audience).order_by(User.id).offset(chunk_size - 1).limit(1).scalar()
+                if upper is None:
+                    upper = db.query(func.max(User.id)).filter(*audience).scalar()
+                if upper is None:
+                    broadcast.status = "completed"
+                    broadcast.completed_at = datetime.now(timezone.utc)
+                    db.commit()
+                    break
+                audience.append(User.id <= upper)
+                
+                processed, delivered = NotificationBroadcastManager._fan_out_chunk(db, broadcast, audience)
+                broadcast.processed_users += processed
+                broadcast.delivered_count += delivered
+                broadcast.last_user_id = upper
+                notify_broadcast(db)
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            broadcast.status = "failed"
+            broadcast.error = str(e)[:2000]
+            db.commit()
+            raise
+        return broadcast
+    
+    @staticmethod
+    def _fan_out_chunk(db: Session, broadcast: NotificationBroadcast, audience: list) -> Tuple[int, int]:
+        """
+        One INSERT ... SELECT for the chunk's users, plus the matching unread
+        counter increments, in a single statement. Returns (users, inserted).
+        """
+        recipients = select(User.id).where(*audience).cte("recipients")
+        inserted = pg_insert(Notification).from_select(
+            ["id", "user_id", "notification_type", "title", "message", "is_read",
+             "priority", "expires_at", "broadcast_id", "created_at"],
+            select(
+                func.uuid_generate_v4(),
+                recipients.c.id,
+                literal(broadcast.notification_type),
+                literal(broadcast.title),
+                literal(broadcast.message),
+                false(),
+                literal(broadcast.priority),
+                literal(broadcast.expires_at, type_=Notification.expires_at.type),
+                literal(broadcast.id, type_=Notification.broadcast_id.type),
+                func.now()
+            )
+        ).on_conflict_do_nothing(
+            index_elements=["broadcast_id", "user_id"],
+            index_where=Notification.broadcast_id.isnot(None)
+        ).returning(Notification.user_id).cte("inserted")
+        
+        # Users without a counter row get one built on their next unread-count read
+        counter_values = {"unread_count": UserNotificationCounter.unread_count + 1}
+        if broadcast.expires_at is not None:
+            counter_values["next_expiry_at"] = func.least(
+                func.coalesce(UserNotificationCounter.next_expiry_at, broadcast.expires_at),
+                broadcast.expires_at
+            )
+        bumped = update(UserNotificationCounter).where(
+            UserNotificationCounter.user_id.in_(select(inserted.c.user_id))
+        ).values(counter_values).returning(UserNotificationCounter.user_id).cte("bumped")
+        
+        processed, delivered = db.execute(
+            select(
+                select(func.count()).select_from(recipients).scalar_subquery(),
+                select(func.count()).select_from(inserted).scalar_subquery()
+            ).add_cte(bumped)
+        ).one()
+        return processed, delivered
+
+
+# Notification compaction (AnalyticsScheduler.compact_notifications)
+NOTIFICATION_COMPACTION_BATCH_SIZE = 5000
+NOTIFICATION_COMPACTION_USER_BATCH = 500
+# Read coin notifications older than this are rolled up into monthly digests
+NOTIFICATION_DIGEST_AFTER_DAYS = 30
+NOTIFICATION_DIGEST_TYPES = ("coins_earned", "coins_spent")
+# Read notifications beyond each user's newest N are deleted (unread are kept)
+NOTIFICATION_MAX_PER_USER = 500
+
+
+class NotificationCompactionManager:
+    """
+    Bounded clean-up of the notifications table. Every step works in batches
+    and commits per batch, and stops once the deadline (time.monotonic()) has
+    passed; the next run picks up where it left off. Only expired or read
+    notifications are removed, so unread counters stay correct.
+    """
+    
+    @staticmethod
+    def delete_expired(db: Session, deadline: float, batch_size: int = NOTIFICATION_COMPACTION_BATCH_SIZE) -> int:
+        """Delete expired notifications; returns rows deleted"""
+        deleted = 0
+        while time.monotonic() < deadline:
+            batch = select(Notification.id).where(
+                and_(Notification.expires_at.isnot(None), Notification.expires_at <= func.now())
+            ).limit(batch_size)
+            count = db.execute(
+                delete(Notification).where(Notification.id.in_(batch)).execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            deleted += count
+            if count < batch_size:
+                break
+        return deleted
+    
+    @staticmethod
+    def roll_up_coin_notifications(
+        db: Session,
+        deadline: float,
+        older_than_days: int = NOTIFICATION_DIGEST_AFTER_DAYS,
+        user_batch: int = NOTIFICATION_COMPACTION_USER_BATCH
+    ) -> Tuple[int, int]:
+        """
+        Replace old read coin notifications with one read digest per user, verb
+        and calendar month. Only months that ended older_than_days ago are
+        rolled up; a notification read after its month was digested is merged
+        into the existing digest, which is deleted and written again with the
+        new totals. Rows are deleted and summarised by the same statement.
+        Returns (rows deleted, digests written).
+        """
+        cutoff = func.date_trunc("month", func.now() - timedelta(days=older_than_days))
+        eligible = and_(
+            Notification.notification_type.in_(NOTIFICATION_DIGEST_TYPES),
+            Notification.is_read == True,
+            Notification.created_at < cutoff
+        )
+        deleted = 0
+        digests = 0
+        while time.monotonic() < deadline:
+            users = select(Notification.user_id).where(eligible).distinct().limit(user_batch).cte("users")
+            months = select(
+                Notification.user_id, func.date_trunc("month", Notification.created_at)
+            ).where(and_(eligible, Notification.user_id.in_(select(users.c.user_id)))).distinct()
+            # Digests already written for the months being rolled up
+            existing_digests = and_(
+                Notification.notification_type == "coins_digest",
+                tuple_(Notification.user_id, func.date_trunc("month", Notification.created_at)).in_(months)
+            )
+            rolled_up = delete(Notification).where(
+                and_(Notification.user_id.in_(select(users.c.user_id)), or_(eligible, existing_digests))
+            ).returning(
+                Notification.user_id, Notification.notification_type,
+                Notification.message, Notification.created_at
+            ).cte("rolled_up")
+            
+            # Verb, amount and count from the "You earned/spent N coins" message
+            # written by CoinManager, or from the digest's own message
+            parts = select(
+                rolled_up.c.user_id,
+                case(
+                    (rolled_up.c.notification_type == "coins_earned", "earned"),
+                    (rolled_up.c.notification_type == "coins_spent", "spent"),
+                    else_=func.substring(rolled_up.c.message, r"^You (earned|spent) ")
+                ).label("verb"),
+                func.date_trunc("month", rolled_up.c.created_at).label("period"),
+                func.cast(func.substring(rolled_up.c.message, r"([0-9]+) coins"), Integer).label("amount"),
+                case(
+                    (
+                        rolled_up.c.notification_type == "coins_digest",
+                        func.cast(func.substring(rolled_up.c.message, r"across ([0-9]+) transactions"), Integer)
+                    ),
+                    else_=1
+                ).label("transactions"),
+                rolled_up.c.created_at
+            ).cte("parts")
+            
+            amount = func.coalesce(func.sum(parts.c.amount), 0)
+            transactions = func.coalesce(func.sum(parts.c.transactions), 0)
+            digest_rows = select(
+                func.uuid_generate_v4(),
+                parts.c.user_id,
+                literal("coins_digest"),
+                func.concat("Coins ", parts.c.verb, " in ", func.to_char(parts.c.period, "FMMonth YYYY")),
+                func.concat("You ", parts.c.verb, " ", amount, " coins across ", transactions, " transactions."),
+                true(),
+                literal("normal"),
+                func.max(parts.c.created_at)
+            ).group_by(parts.c.user_id, parts.c.verb, parts.c.period)
+            
+            digest_ids = insert(Notification).from_select(
+                ["id", "user_id", "notification_type", "title", "message", "is_read", "priority", "created_at"],
+                digest_rows
+            ).returning(Notification.id).cte("digests")
+            
+            batch_deleted, batch_digests = db.execute(
+                select(
+                    select(func.count()).select_from(rolled_up).scalar_subquery(),
+                    select(func.count()).select_from(digest_ids).scalar_subquery()
+                )
+            ).one()
+            db.commit()
+            deleted += batch_deleted
+            digests += batch_digests
+            if batch_deleted == 0:
+                break
+        return deleted, digests
+    
+    @staticmethod
+    def cap_user_history(
+        db: Session,
+        deadline: float,
+        max_per_user: int = NOTIFICATION_MAX_PER_USER,
+        user_batch: int = NOTIFICATION_COMPACTION_USER_BATCH
+    ) -> int:
+        """Delete read notifications beyond each user's newest max_per_user; returns rows deleted"""
+        deleted = 0
+        # One scan of the table per run; the deletes then go user_batch users at a time
+        heavy_users = [
+            row[0] for row in db.query(Notification.user_id).group_by(Notification.user_id).having(
+                func.count(Notification.id) > max_per_user
+            ).order_by(Notification.user_id).all()
+        ]
+        for start in range(0, len(heavy_users), user_batch):
+            if time.monotonic() >= deadline:
+                break
+            user_ids = heavy_users[start:start + user_batch]
+            
+            ranked = select(
+                Notification.id,
+                func.row_number().over(
+                    partition_by=Notification.user_id,
+                    order_by=(Notification.created_at.desc(), Notification.id.desc())
+                ).label("position")
+            ).where(Notification.user_id.in_(user_ids)).subquery()
+            deleted += db.execute(
+                delete(Notification).where(
+                    and_(
+                        Notification.is_read == True,
+                        Notification.id.in_(select(ranked.c.id).where(ranked.c.position > max_per_user))
+                    )
+                ).execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        return deleted
+
+
+# User data wipe (POST /auth/wipe-data)
+WIPE_BATCH_SIZE = 2000
+WIPE_TIME_BUDGET_SECONDS = 120
+# (step, model, action): "delete" removes the user's rows, "detach" sets user_id
+# to NULL. Quiz answers go with their attempts (ON DELETE CASCADE).
+WIPE_STEPS = [
+    ("quiz_attempts", UserQuizAttempt, "delete"),
+    ("module_quiz_attempts", UserModuleQuizAttempt, "delete"),
+    ("lesson_progress", UserLessonProgress, "delete"),
+    ("module_progress", UserModuleProgress, "delete"),
+    ("coin_transactions", UserCoinTransaction, "delete"),
+    ("badges", UserBadge, "delete"),
+    ("coupon_redemptions", UserCouponRedemption, "delete"),
+    ("onboarding", UserOnboarding, "delete"),
+    ("notifications", Notification, "delete"),
+    ("behavior_events", UserBehaviorEvent, "delete"),
+    ("lead_score_history", LeadScoreHistory, "delete"),
+    ("lead_score", UserLeadScore, "delete"),
+    ("activity_logs", UserActivityLog, "detach"),
+    ("calculator_usage", CalculatorUsage, "detach"),
+    ("material_downloads", MaterialDownload, "detach"),
+    ("support_tickets", SupportTicket, "detach"),
+]
+# A running wipe not updated for this long is treated as abandoned and resumed
+WIPE_STALE_AFTER = timedelta(minutes=10)
+# The resume job leaves a new pending wipe to its request's BackgroundTask this long
+WIPE_START_GRACE = timedelta(minutes=2)
+
+
+class UserDataWipeManager:
+    """
+    Resets a user to a fresh account in the background. Each batch is its own
+    short transaction, so no table is locked for the whole wipe. Derived rows
+    (coin balance, stats, unread counter) are reset together at the end.
+    """
+    
+    @staticmethod
+    def start_wipe(db: Session, user_id: UUID) -> Tuple[UserDataWipe, bool]:
+        """
+        Create the wipe row (committed). Returns (wipe, created); a wipe that
+        is already pending or running for the user is returned as is.
+        """
+        active = db.query(UserDataWipe).filter(
+            and_(UserDataWipe.user_id == user_id, UserDataWipe.status.in_(("pending", "running")))
+        ).first()
+        if active:
+            return active, False
+        
+        wipe = UserDataWipe(user_id=user_id, status="pending")
+        db.add(wipe)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Concurrent request created it first (ux_user_data_wipes_user_id_active)
+            db.rollback()
+            wipe, _ = UserDataWipeManager.start_wipe(db, user_id)
+            return wipe, False
+        db.refresh(wipe)
+        return wipe, True
+    
+    @staticmethod
+    def batch_statement(model, action: str, user_id: UUID, batch_size: int = WIPE_BATCH_SIZE):
+        """Delete (or detach) up to batch_size of the user's rows, by primary key"""
+        pk = inspect(model).primary_key[0]
+        batch = select(pk).where(model.user_id == user_id).limit(batch_size)
+        if action == "delete":
+            statement = delete(model).where(pk.in_(batch))
+        else:
+            statement = update(model).where(pk.in_(batch)).values({model.user_id: None})
+        return statement.execution_options(synchronize_session=False)
+    
+    @staticmethod
+    def run_wipe(
+        db: Session,
+        wipe_id: UUID,
+        time_budget_seconds: float = WIPE_TIME_BUDGET_SECONDS,
+        batch_size: int = WIPE_BATCH_SIZE
+    ) -> Optional[UserDataWipe]:
+        """
+        Work through WIPE_STEPS from current_step. When the time budget runs out
+        the wipe goes back to pending with its progress saved (resumed by
+        AnalyticsScheduler.resume_user_data_wipes). On error it is marked failed.
+        A wipe that another runner holds, or that has finished, is returned
+        untouched.
+        """
+        deadline = time.monotonic() + time_budget_seconds
+        # Claim the wipe in one statement: of two runners (the BackgroundTask and
+        # the resume job) only one gets it, and a finished wipe is never restarted
+        claimed = db.execute(
+            update(UserDataWipe).where(
+                and_(UserDataWipe.id == wipe_id, UserDataWipeManager._claimable())
+            ).values(
+                status="running",
+                error=None,
+                started_at=func.coalesce(UserDataWipe.started_at, func.now())
+            ).returning(UserDataWipe.id).execution_options(synchronize_session=False)
+        ).first()
+        db.commit()
+        wipe = db.query(UserDataWipe).filter(UserDataWipe.id == wipe_id).first()
+        if claimed is None or wipe is None:
+            return wipe
+        
+        step_names = [name for name, _, _ in WIPE_STEPS]
+        start = step_names.index(wipe.current_step) if wipe.current_step in step_names else 0
+        try:
+            for name, model, action in WIPE_STEPS[start:]:
+                while True:
+                    # Lock the job row so overlapping runs take turns
+                    db.refresh(wipe, with_for_update=True)
+                    if wipe.status != "running":
+                        db.commit()
+                        return wipe
+                    if time.monotonic() >= deadline:
+                        wipe.status = "pending"
+                        db.commit()
+                        return wipe
+                    
+                    count = db.execute(
+                        UserDataWipeManager.batch_statement(model, action, wipe.user_id, batch_size)
+                    ).rowcount
+                    wipe.current_step = name
+                    if action == "delete":
+                        wipe.rows_deleted += count
+                    else:
+                        wipe.rows_detached += count
+                    db.commit()
+                    if count < batch_size:
+                        break
+            
+            db.refresh(wipe, with_for_update=True)
+            UserDataWipeManager._reset_derived_rows(db, wipe.user_id)
+            wipe.status = "completed"
+            wipe.current_step = None
+            wipe.completed_at = datetime.now(timezone.utc)
+            db.commit()
+            return wipe
+        except Exception as e:
+            db.rollback()
+            wipe.status = "failed"
+            wipe.error = str(e)
+            db.commit()
+            raise
+    
+    @staticmethod
+    def _reset_derived_rows(db: Session, user_id: UUID) -> None:
+        """Fresh coin balance, stats and unread counter for the wiped user (caller commits)"""
+        for model in (UserCoinBalance, UserStats, UserNotificationCounter):
+            db.query(model).filter(model.user_id == user_id).delete(synchronize_session=False)
+        db.add(UserCoinBalance(user_id=user_id))
+        db.query(User).filter(User.id == user_id).update(
+            {User.updated_at: datetime.now(timezone.utc)}, synchronize_session=False
+        )
+    
+    @staticmethod
+    def _claimable():
+        """Pending wipes, and running wipes whose worker stopped updating them"""
+        stale = datetime.now(timezone.utc) - WIPE_STALE_AFTER
+        return (UserDataWipe.status == "pending") | and_(
+            UserDataWipe.status == "running", UserDataWipe.updated_at < stale
+        )
+    
+    @staticmethod
+    def resumable_wipe_ids(db: Session) -> List[UUID]:
+        """
+        Claimable wipes, except pending ones created within WIPE_START_GRACE
+        (their BackgroundTask from POST /auth/wipe-data is about to run them)
+        """
+        grace = datetime.now(timezone.utc) - WIPE_START_GRACE
+        rows = db.query(UserDataWipe.id).filter(
+            and_(
+                UserDataWipeManager._claimable(),
+                (UserDataWipe.status != "pending") | (UserDataWipe.created_at < grace)
+            )
+        ).order_by(UserDataWipe.created_at).all()
+        return [row[0] for row in rows]
 
 
 class CoinManager:
@@ -131,6 +815,8 @@ class CoinManager:
         balance.lifetime_earned += amount
         balance.updated_at = datetime.now()
         
+        StatsManager.record_coin_transaction(db, user_id, transaction, balance)
+        
         db.commit()
         db.refresh(transaction)
         
@@ -181,6 +867,8 @@ class CoinManager:
         balance.lifetime_spent += amount
         balance.updated_at = datetime.now()
         
+        StatsManager.record_coin_transaction(db, user_id, transaction, balance)
+        
         db.commit()
         db.refresh(transaction)
         
@@ -227,11 +915,14 @@ class BadgeManager:
             source_lesson_id=source_lesson_id
         )
         db.add(user_badge)
+        
+        # Get badge details for stats and notification
+        badge = db.query(Badge).filter(Badge.id == badge_id).first()
+        StatsManager.record_badge(db, user_id, user_badge, badge)
+        
         db.commit()
         db.refresh(user_badge)
         
-        # Get badge details for notification
-        badge = db.query(Badge).filter(Badge.id == badge_id).first()
         if badge:
             # Track badge earned event
             EventTracker = _get_event_tracker()
@@ -398,6 +1089,8 @@ class ProgressManager:
         module_progress.last_accessed_at = datetime.now()
         module_progress.updated_at = datetime.now()
         
+        StatsManager.refresh_progress(db, user_id)
+        
         db.commit()
         
         # Track module events
@@ -440,6 +1133,414 @@ class QuizManager:
             return base_reward
         else:
             return 0
+    
+    @staticmethod
+    def get_module_quiz_summary(db: Session, user_id: UUID) -> Dict[str, Any]:
+        """Aggregate a user's module quiz (mini-game) attempts in a single query"""
+        totals = db.query(
+            func.count(UserModuleQuizAttempt.id).label("total_attempts"),
+            func.count(UserModuleQuizAttempt.id).filter(
+                UserModuleQuizAttempt.passed == True
+            ).label("total_passed"),
+            func.avg(UserModuleQuizAttempt.score).label("average_score"),
+            func.max(UserModuleQuizAttempt.score).label("best_score"),
+            func.count(func.distinct(UserModuleQuizAttempt.module_id)).filter(
+                UserModuleQuizAttempt.passed == True
+            ).label("modules_completed")
+        ).filter(UserModuleQuizAttempt.user_id == user_id).one()
+        
+        if not totals.total_attempts:
+            return {
+                "total_attempts": 0,
+                "total_passed": 0,
+                "total_failed": 0,
+                "pass_rate": 0.0,
+                "average_score": 0.0,
+                "best_score": 0.0,
+                "modules_completed": 0
+            }
+        
+        total_attempts = totals.total_attempts
+        total_passed = totals.total_passed
+        pass_rate = (total_passed / total_attempts * 100) if total_attempts > 0 else 0
+        
+        return {
+            "total_attempts": total_attempts,
+            "total_passed": total_passed,
+            "total_failed": total_attempts - total_passed,
+            "pass_rate": round(pass_rate, 2),
+            "average_score": round(float(totals.average_score), 2),
+            "best_score": round(float(totals.best_score), 2),
+            "modules_completed": totals.modules_completed
+        }
+
+
+class LeaderboardManager:
+    """
+    Reads the quiz_leaderboard materialized view (see alembic add_quiz_leaderboard_view).
+    Ranks are unique and contiguous, so pages and windows are index range scans on rank.
+    """
+    
+    @staticmethod
+    def refresh(db: Session) -> None:
+        """Recompute the leaderboard without blocking readers"""
+        db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY quiz_leaderboard"))
+        db.commit()
+    
+    @staticmethod
+    def get_page(db: Session, offset: int = 0, limit: int = 20) -> List[Any]:
+        """Entries ranked offset+1 .. offset+limit"""
+        return LeaderboardManager.get_rank_range(db, offset + 1, offset + limit)
+    
+    @staticmethod
+    def get_rank_range(db: Session, first_rank: int, last_rank: int) -> List[Any]:
+        """Entries with first_rank <= rank <= last_rank, in rank order"""
+        return db.execute(
+            text(
+                "SELECT rank, user_id, first_name, last_name, average_score, "
+                "total_attempts, total_passed, refreshed_at "
+                "FROM quiz_leaderboard WHERE rank BETWEEN :first AND :last ORDER BY rank"
+            ),
+            {"first": max(first_rank, 1), "last": last_rank}
+        ).all()
+    
+    @staticmethod
+    def get_user_entry(db: Session, user_id: UUID) -> Optional[Any]:
+        """The user's leaderboard row, or None if they have no quiz attempts (as of the last refresh)"""
+        return db.execute(
+            text(
+                "SELECT rank, user_id, first_name, last_name, average_score, "
+                "total_attempts, total_passed, refreshed_at "
+                "FROM quiz_leaderboard WHERE user_id = :user_id"
+            ),
+            {"user_id": user_id}
+        ).first()
+    
+    @staticmethod
+    def get_total_ranked(db: Session) -> int:
+        """Number of ranked users (max rank, served from the rank index)"""
+        return db.execute(text("SELECT COALESCE(MAX(rank), 0) FROM quiz_leaderboard")).scalar()
+    
+    @staticmethod
+    def serialize_entry(entry: Any, current_user_id: UUID) -> Dict[str, Any]:
+        return {
+            "rank": entry.rank,
+            "user_id": entry.user_id,
+            "name": f"{entry.first_name} {entry.last_name}",
+            "average_score": round(float(entry.average_score), 2),
+            "total_attempts": entry.total_attempts,
+            "total_passed": entry.total_passed,
+            "is_current_user": entry.user_id == current_user_id
+        }
+
+
+# Rolling windows served from UserStats.daily_activity
+STATS_DAILY_RETENTION_DAYS = 30
+STATS_RECENT_ITEMS_PER_TYPE = 5
+
+
+def _stats_timestamp(value: Optional[datetime]) -> str:
+    """Normalize a timestamp to a local naive ISO string so feed items sort consistently"""
+    if value is None:
+        value = datetime.now()
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _bump_daily_activity(
+    daily: Optional[Dict[str, Dict[str, int]]],
+    day: date,
+    field: str,
+    amount: int,
+    today: Optional[date] = None
+) -> Dict[str, Dict[str, int]]:
+    """Return a copy of the daily buckets with `field` incremented for `day`, pruned to the retention window"""
+    today = today or date.today()
+    cutoff = (today - timedelta(days=STATS_DAILY_RETENTION_DAYS)).isoformat()
+    buckets = {k: dict(v) for k, v in (daily or {}).items() if k >= cutoff}
+    key = day.isoformat()
+    if key >= cutoff:
+        bucket = buckets.setdefault(key, {})
+        bucket[field] = bucket.get(field, 0) + amount
+    return buckets
+
+
+def _sum_daily_activity(
+    daily: Optional[Dict[str, Dict[str, int]]],
+    field: str,
+    days: int,
+    today: Optional[date] = None
+) -> int:
+    """Sum `field` over buckets dated on or after today - days"""
+    today = today or date.today()
+    cutoff = (today - timedelta(days=days)).isoformat()
+    return sum(v.get(field, 0) for k, v in (daily or {}).items() if k >= cutoff)
+
+
+def _merge_recent_activity(
+    feed: Optional[List[Dict[str, Any]]],
+    items: List[Dict[str, Any]],
+    activity_type: str,
+    replace: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Return a copy of the feed with `items` merged into the `activity_type` slot,
+    keeping only the newest STATS_RECENT_ITEMS_PER_TYPE of that type.
+    """
+    others = [a for a in (feed or []) if a["type"] != activity_type]
+    same = [] if replace else [a for a in (feed or []) if a["type"] == activity_type]
+    same = sorted(items + same, key=lambda a: a["timestamp"], reverse=True)
+    return others + same[:STATS_RECENT_ITEMS_PER_TYPE]
+
+
+class StatsManager:
+    """Maintains the per-user UserStats summary row read by the dashboard"""
+    
+    @staticmethod
+    def get_or_create_stats(db: Session, user_id: UUID) -> UserStats:
+        """Get the user's stats row, building it from the raw tables if missing (no commit)"""
+        stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+        if not stats:
+            stats = StatsManager.rebuild_user_stats(db, user_id)
+        return stats
+    
+    @staticmethod
+    def _lock_stats(db: Session, user_id: UUID) -> Optional[UserStats]:
+        """
+        Flush pending writes and lock the user's stats row for an incremental update.
+        Returns None when the row had to be built from scratch, since the rebuild
+        already includes the pending change.
+        """
+        db.flush()
+        stats = db.query(UserStats).filter(UserStats.user_id == user_id).with_for_update().first()
+        if not stats:
+            StatsManager.rebuild_user_stats(db, user_id)
+            return None
+        return stats
+    
+    @staticmethod
+    def record_coin_transaction(
+        db: Session,
+        user_id: UUID,
+        transaction: UserCoinTransaction,
+        balance: UserCoinBalance
+    ) -> None:
+        """Apply a coin transaction to the stats row (caller commits)"""
+        stats = StatsManager._lock_stats(db, user_id)
+        if stats is None:
+            return
+        stats.coins_current = balance.current_balance
+        stats.coins_lifetime_earned = balance.lifetime_earned
+        stats.coins_lifetime_spent = balance.lifetime_spent
+        
+        if transaction.transaction_type == "earned":
+            stats.daily_activity = _bump_daily_activity(
+                stats.daily_activity, date.today(), "coins_earned", transaction.amount
+            )
+        
+        stats.recent_activity = _merge_recent_activity(
+            stats.recent_activity,
+            [StatsManager._coin_activity(transaction)],
+            "coin_transaction"
+        )
+    
+    @staticmethod
+    def record_badge(db: Session, user_id: UUID, user_badge: UserBadge, badge: Optional[Badge]) -> None:
+        """Apply a newly earned badge to the stats row (caller commits)"""
+        stats = StatsManager._lock_stats(db, user_id)
+        if stats is None:
+            return
+        stats.badges_earned = (stats.badges_earned or 0) + 1
+        if badge:
+            stats.recent_activity = _merge_recent_activity(
+                stats.recent_activity,
+                [StatsManager._badge_activity(user_badge, badge)],
+                "badge_earned"
+            )
+    
+    @staticmethod
+    def record_quiz_attempt(db: Session, user_id: UUID, score: Decimal, passed: bool) -> None:
+        """Apply a lesson quiz attempt to the stats row (caller commits)"""
+        stats = StatsManager._lock_stats(db, user_id)
+        if stats is None:
+            return
+        stats.quizzes_taken = (stats.quizzes_taken or 0) + 1
+        if passed:
+            stats.quizzes_passed = (stats.quizzes_passed or 0) + 1
+        stats.quiz_score_total = Decimal(stats.quiz_score_total or 0) + Decimal(score)
+    
+    @staticmethod
+    def refresh_progress(db: Session, user_id: UUID) -> None:
+        """
+        Recompute lesson/module completion counts, recent lesson completions and
+        the per-day lesson buckets for one user (caller commits). Used by every
+        path that changes lesson or module status, including un-completion.
+        """
+        stats = StatsManager._lock_stats(db, user_id)
+        if stats is None:
+            return
+        StatsManager._apply_progress(db, user_id, stats)
+    
+    @staticmethod
+    def rebuild_user_stats(db: Session, user_id: UUID) -> UserStats:
+        """Reconstruct the user's stats row from the raw tables (no commit)"""
+        stats = _lock_or_create_user_row(db, UserStats, user_id)
+        
+        # Coins
+        balance = db.query(UserCoinBalance).filter(UserCoinBalance.user_id == user_id).first()
+        stats.coins_current = balance.current_balance if balance else 0
+        stats.coins_lifetime_earned = balance.lifetime_earned if balance else 0
+        stats.coins_lifetime_spent = balance.lifetime_spent if balance else 0
+        
+        # Badges
+        stats.badges_earned = db.query(UserBadge).filter(UserBadge.user_id == user_id).count()
+        
+        # Quizzes
+        quiz_totals = db.query(
+            func.count(UserQuizAttempt.id),
+            func.count(UserQuizAttempt.id).filter(UserQuizAttempt.passed == True),
+            func.coalesce(func.sum(UserQuizAttempt.score), 0)
+        ).filter(UserQuizAttempt.user_id == user_id).one()
+        stats.quizzes_taken = quiz_totals[0]
+        stats.quizzes_passed = quiz_totals[1]
+        stats.quiz_score_total = Decimal(quiz_totals[2])
+        
+        # Coins earned per day
+        today = date.today()
+        window_start = today - timedelta(days=STATS_DAILY_RETENTION_DAYS)
+        coin_day = func.date(UserCoinTransaction.created_at)
+        daily: Dict[str, Dict[str, int]] = {}
+        for day, amount in db.query(coin_day, func.sum(UserCoinTransaction.amount)).filter(
+            and_(
+                UserCoinTransaction.user_id == user_id,
+                UserCoinTransaction.transaction_type == "earned",
+                UserCoinTransaction.created_at >= window_start
+            )
+        ).group_by(coin_day).all():
+            daily = _bump_daily_activity(daily, day, "coins_earned", int(amount or 0), today)
+        stats.daily_activity = daily
+        
+        # Recent badges and coin transactions
+        recent_badges = db.query(UserBadge).join(Badge).filter(
+            UserBadge.user_id == user_id
+        ).order_by(UserBadge.earned_at.desc()).limit(STATS_RECENT_ITEMS_PER_TYPE).all()
+        recent_transactions = db.query(UserCoinTransaction).filter(
+            UserCoinTransaction.user_id == user_id
+        ).order_by(UserCoinTransaction.created_at.desc()).limit(STATS_RECENT_ITEMS_PER_TYPE).all()
+        
+        feed = _merge_recent_activity(
+            [], [StatsManager._badge_activity(ub, ub.badge) for ub in recent_badges], "badge_earned"
+        )
+        feed = _merge_recent_activity(
+            feed, [StatsManager._coin_activity(t) for t in recent_transactions], "coin_transaction"
+        )
+        stats.recent_activity = feed
+        
+        # Lessons and modules
+        StatsManager._apply_progress(db, user_id, stats)
+        
+        stats.rebuilt_at = datetime.now()
+        db.flush()
+        return stats
+    
+    @staticmethod
+    def get_window_total(stats: UserStats, field: str, days: int) -> int:
+        """Total of a daily bucket field ("lessons" or "coins_earned") over the last `days` days"""
+        return _sum_daily_activity(stats.daily_activity, field, days)
+    
+    @staticmethod
+    def get_recent_activity(stats: UserStats, limit: int = 10) -> List[Dict[str, Any]]:
+        """Recent activity feed from the stats row, newest first"""
+        activities = sorted(stats.recent_activity or [], key=lambda a: a["timestamp"], reverse=True)
+        return activities[:limit]
+    
+    @staticmethod
+    def _apply_progress(db: Session, user_id: UUID, stats: UserStats) -> None:
+        """Recompute lesson/module derived fields on an existing stats row"""
+        stats.lessons_completed = db.query(UserLessonProgress).join(Lesson).join(Module).filter(
+            and_(
+                UserLessonProgress.user_id == user_id,
+                UserLessonProgress.status == "completed",
+                Lesson.is_active == True,
+                Module.is_active == True
+            )
+        ).count()
+        stats.modules_completed = db.query(UserModuleProgress).filter(
+            and_(
+                UserModuleProgress.user_id == user_id,
+                UserModuleProgress.status == "completed"
+            )
+        ).count()
+        
+        # Lesson completions per day (replaces the lesson buckets wholesale so
+        # un-completed lessons drop out)
+        today = date.today()
+        window_start = today - timedelta(days=STATS_DAILY_RETENTION_DAYS)
+        lesson_day = func.date(UserLessonProgress.completed_at)
+        daily = {
+            k: {f: n for f, n in v.items() if f != "lessons"}
+            for k, v in (stats.daily_activity or {}).items()
+        }
+        for day, count in db.query(lesson_day, func.count(UserLessonProgress.id)).filter(
+            and_(
+                UserLessonProgress.user_id == user_id,
+                UserLessonProgress.status == "completed",
+                UserLessonProgress.completed_at >= window_start
+            )
+        ).group_by(lesson_day).all():
+            daily = _bump_daily_activity(daily, day, "lessons", count, today)
+        stats.daily_activity = {k: v for k, v in daily.items() if v}
+        
+        recent_lessons = db.query(UserLessonProgress).join(Lesson).filter(
+            and_(
+                UserLessonProgress.user_id == user_id,
+                UserLessonProgress.status == "completed",
+                UserLessonProgress.completed_at.isnot(None)
+            )
+        ).order_by(UserLessonProgress.completed_at.desc()).limit(STATS_RECENT_ITEMS_PER_TYPE).all()
+        stats.recent_activity = _merge_recent_activity(
+            stats.recent_activity,
+            [
+                {
+                    "type": "lesson_completed",
+                    "title": f"Completed lesson: {lp.lesson.title}",
+                    "timestamp": _stats_timestamp(lp.completed_at),
+                    "data": {
+                        "lesson_id": str(lp.lesson_id),
+                        "lesson_title": lp.lesson.title
+                    }
+                }
+                for lp in recent_lessons
+            ],
+            "lesson_completed",
+            replace=True
+        )
+    
+    @staticmethod
+    def _badge_activity(user_badge: UserBadge, badge: Badge) -> Dict[str, Any]:
+        return {
+            "type": "badge_earned",
+            "title": f"Earned badge: {badge.name}",
+            "timestamp": _stats_timestamp(user_badge.earned_at),
+            "data": {
+                "badge_id": str(user_badge.badge_id),
+                "badge_name": badge.name
+            }
+        }
+    
+    @staticmethod
+    def _coin_activity(transaction: UserCoinTransaction) -> Dict[str, Any]:
+        return {
+            "type": "coin_transaction",
+            "title": f"{'Earned' if transaction.amount > 0 else 'Spent'} {abs(transaction.amount)} coins",
+            "timestamp": _stats_timestamp(transaction.created_at),
+            "data": {
+                "amount": transaction.amount,
+                "source_type": transaction.source_type,
+                "description": transaction.description
+            }
+        }
 
 
 class DashboardManager: